@@ -4,9 +4,11 @@ __email__ = "uberfastman@uberfastman.dev"
 import math
 from collections import Counter
 from collections import defaultdict
-from typing import List, Dict, Set, Union
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Set, Tuple, Union
 
-from dao.base import BasePlayer, BaseLeague
+from dao.base import BasePlayer, BaseLeague, BaseTeam
 from utilities.constants import prohibited_statuses
 from utilities.logger import get_logger
 from utilities.utils import normalize_player_name
@@ -49,6 +51,124 @@ class RosterSlot(object):
         return self.assigned_count == self.max_allowed
 
 
+def get_optimal_slot_assignments(player_points: List[float], player_masks: List[int], slot_bits: List[int],
+                                 slot_counts: List[int], flex_slots_mask: int) -> List[Tuple[int, int]]:
+    """Assign players to the active roster slots that maximize total points with an exact min-cost max-flow solver.
+
+    Players and roster slot positions are modeled as a bipartite graph (source -> player -> slot position -> sink)
+    where each player can fill one slot, each slot position can be filled up to its roster count, and assigning a
+    player to an eligible slot position costs the negative of their points. Successive shortest augmenting paths
+    fill as many slots as possible (like the lineup a manager is expected to set) with the maximum total points,
+    moving players any number of positions away when needed (unlike greedy assignment) for complex
+    flex/superflex/IDP rosters. Primary positions are favored over flex positions only to break ties between
+    lineups with the same points.
+
+    :param player_points: points of each player
+    :param player_masks: eligible positions bitmask of each player from the league roster slot index
+    :param slot_bits: league roster slot index bit of each active roster slot position
+    :param slot_counts: number of slots of each active roster slot position
+    :param flex_slots_mask: bitmask of the flex roster slot positions
+    :return: list of (player index, slot position index) assignments of the optimal lineup
+    """
+    slot_positions_mask = 0
+    for slot_bit in slot_bits:
+        slot_positions_mask |= slot_bit
+    # scale points to integer costs with enough room below them for the primary position tiebreaker
+    tiebreaker_scale = sum(slot_counts) + 1
+
+    # graph nodes: source, players, slot positions, sink
+    num_players = len(player_points)
+    source = 0
+    sink = num_players + len(slot_bits) + 1
+    edge_heads: List[int] = []
+    edge_capacities: List[int] = []
+    edge_costs: List[int] = []
+    node_edges: List[List[int]] = [[] for _ in range(sink + 1)]
+
+    def add_edge(tail: int, head: int, capacity: int, cost: int) -> None:
+        # forward edge at an even index and its residual reverse edge at the following odd index
+        node_edges[tail].append(len(edge_heads))
+        edge_heads.append(head)
+        edge_capacities.append(capacity)
+        edge_costs.append(cost)
+        node_edges[head].append(len(edge_heads))
+        edge_heads.append(tail)
+        edge_capacities.append(0)
+        edge_costs.append(-cost)
+
+    player_slot_edges: List[Tuple[int, int, int]] = []
+    for player_ndx, (points, eligible_positions_mask) in enumerate(zip(player_points, player_masks)):
+        eligible_positions_mask &= slot_positions_mask
+        if not eligible_positions_mask:
+            continue
+        add_edge(source, player_ndx + 1, 1, 0)
+        player_cost = -round(points * 10000) * tiebreaker_scale
+        for slot_ndx, slot_bit in enumerate(slot_bits):
+            if eligible_positions_mask & slot_bit:
+                player_slot_edges.append((len(edge_heads), player_ndx, slot_ndx))
+                add_edge(
+                    player_ndx + 1,
+                    num_players + 1 + slot_ndx,
+                    1,
+                    player_cost + (1 if slot_bit & flex_slots_mask else 0)
+                )
+    for slot_ndx, slot_count in enumerate(slot_counts):
+        add_edge(num_players + 1 + slot_ndx, sink, slot_count, 0)
+
+    # augment one player at a time along the cheapest path found with a queue-based Bellman-Ford search, which
+    # handles the negative costs of the residual graph
+    while True:
+        path_costs: List[Union[int, float]] = [math.inf] * (sink + 1)
+        path_edges: List[int] = [-1] * (sink + 1)
+        in_queue = [False] * (sink + 1)
+        path_costs[source] = 0
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            in_queue[node] = False
+            for edge in node_edges[node]:
+                if edge_capacities[edge] > 0:
+                    head = edge_heads[edge]
+                    if path_costs[node] + edge_costs[edge] < path_costs[head]:
+                        path_costs[head] = path_costs[node] + edge_costs[edge]
+                        path_edges[head] = edge
+                        if not in_queue[head]:
+                            in_queue[head] = True
+                            queue.append(head)
+
+        if path_costs[sink] == math.inf:
+            break
+
+        node = sink
+        while node != source:
+            edge = path_edges[node]
+            edge_capacities[edge] -= 1
+            edge_capacities[edge ^ 1] += 1
+            node = edge_heads[edge ^ 1]
+
+    # player to slot position edges with flow (no remaining capacity) are the optimal lineup assignments
+    return [(player_ndx, slot_ndx) for edge, player_ndx, slot_ndx in player_slot_edges if edge_capacities[edge] == 0]
+
+
+def calculate_optimal_points(slot_model: Tuple[List[int], List[int], int],
+                             rosters: List[Tuple[str, List[Tuple[float, int]]]]) -> Dict[str, float]:
+    """Calculate the optimal points of team rosters (module level so it can run in worker processes).
+
+    :param slot_model: tuple of the active roster slot position bits, slot counts, and flex slots bitmask
+    :param rosters: list of (team ID, list of (player points, player eligible positions bitmask)) tuples
+    :return: dict of team ID -> optimal points
+    """
+    slot_bits, slot_counts, flex_slots_mask = slot_model
+    optimal_points = {}
+    for team_id, players in rosters:
+        player_points = [points for points, _ in players]
+        optimal_slot_assignments = get_optimal_slot_assignments(
+            player_points, [mask for _, mask in players], slot_bits, slot_counts, flex_slots_mask
+        )
+        optimal_points[team_id] = round(sum(player_points[player_ndx] for player_ndx, _ in optimal_slot_assignments), 2)
+    return optimal_points
+
+
 class CoachingEfficiency(object):
 
     def __init__(self, league):
@@ -65,7 +185,17 @@ class CoachingEfficiency(object):
         self.flex_positions_dict: Dict[str, List[str]] = self.league.get_flex_positions_dict()
         self.roster_primary_slots: Set[str] = set(self.roster_active_slots).difference(self.flex_positions_dict.keys())
         self.roster_flex_slots: Set[str] = set(self.roster_active_slots).intersection(self.flex_positions_dict.keys())
-        self.coaching_efficiency_dqs: Dict[str, int] = {}
+        self.roster_flex_slots_mask: int = self.league.get_positions_mask(self.roster_flex_slots)
+
+        # active roster slot positions (with their league slot index bits and counts) filled by the optimal lineup
+        self.slot_positions: List[str] = [
+            pos for pos, slots in self.roster_slot_counts.items() if pos not in self.roster_bench_slots and slots > 0
+        ]
+        self.slot_position_bits: List[int] = [self.league.get_position_bit(pos) for pos in self.slot_positions]
+        self.slot_counts: List[int] = [self.roster_slot_counts[pos] for pos in self.slot_positions]
+
+        self.season_coaching_efficiency: Dict[str, Dict[str, Tuple[float, float]]] = {}
+        self.coaching_efficiency_dqs_by_week: Dict[int, Dict[str, int]] = defaultdict(dict)
 
     def _is_player_ineligible(self, player: BasePlayer, week, inactives):
         if player.points != 0.0:
@@ -77,166 +207,106 @@ class CoachingEfficiency(object):
                 or normalize_player_name(player.full_name) in inactives
             )
 
-    def _get_player_open_positions(self, player: BasePlayer, optimal_lineup: Dict[str, RosterSlot]):
+    def _get_eligible_positions_mask(self, player: BasePlayer) -> int:
+        # fall back to indexing the eligible positions of players that were not mapped with an eligibility mask
+        if not player.eligible_positions_mask and player.eligible_positions:
+            player.eligible_positions_mask = self.league.get_positions_mask(player.eligible_positions)
+        return player.eligible_positions_mask
 
-        eligible_positions = list(player.eligible_positions.intersection(set(self.roster_active_slots)))
-        optimal_lineup_open_positions = {
-            pos: roster_slot for pos, roster_slot in optimal_lineup.items() if pos in eligible_positions
+    def _get_optimal_lineup(self, players: List[BasePlayer]) -> Dict[str, RosterSlot]:
+        """Assign players to the active roster slots that maximize total points (see get_optimal_slot_assignments).
+        """
+        # create empty team optimal lineup
+        optimal_lineup: Dict[str, RosterSlot] = {
+            pos: RosterSlot(pos, max_allowed=slots) for pos, slots in zip(self.slot_positions, self.slot_counts)
         }
 
-        # retrieve list of player eligible positions that still have open slots
-        open_positions = [
-            pos for pos, roster_slot in optimal_lineup_open_positions.items() if not roster_slot.is_full()
-        ]
-
-        return open_positions
-
-        # TODO: support reassigning players more than one position away
-        # assigned_eligible_positions = {
-        #     k for k, v in optimal_lineup_eligible_positions.items() if (v.get("slots") - v.get("count")) == 0
-        # }
-        #
-        # if open_positions:
-        #     return open_positions
-        # else:
-        #     if assigned_eligible_positions.issubset(assigned_positions):
-        #         return []
-        #     else:
-        #         assigned_positions.update(assigned_eligible_positions)
-        #
-        #         next_player_tier_unassigned_positions = []
-        #         for pos in assigned_eligible_positions:
-        #             for p in optimal_lineup.get(pos).get("players"):
-        #                 next_player_tier_unassigned_positions += self._get_player_open_positions(
-        #                     p, optimal_lineup, pos, assigned_positions
-        #                 )
-        #         return next_player_tier_unassigned_positions
-
-    @staticmethod
-    def _create_open_slot_if_possible(unassigned_player: BasePlayer,
-                                      players_with_open_slots: Dict[str, List[Dict[str, Union[BasePlayer, List[str]]]]],
-                                      optimal_lineup: Dict[str, RosterSlot]):
-
-        for pos, assigned_players_info in players_with_open_slots.items():
-            for assigned_player in assigned_players_info:
-                open_positions = assigned_player["open_positions"]
-                if len(open_positions) > 0:
-                    player: BasePlayer
-                    for player_ndx, player in enumerate(optimal_lineup.get(pos).assigned_players):
-                        # check if any players in position match the potentially replaceable player
-                        if assigned_player["assigned_player"].player_id == player.player_id:
-                            # remove the replaceable player from their current optimal lineup position
-                            movable_player = optimal_lineup.get(pos).remove_player(player_ndx)
-                            # replace the replaceable player with the unassigned player
-                            optimal_lineup.get(pos).add_player(unassigned_player)
-                            # add the removed replaceable player to a different open optimal lineup position
-                            optimal_lineup.get(open_positions[0]).add_player(movable_player)
-
-                            return pos
-        return None
-
-    def _assign_player_to_optimal_slot(self, player: BasePlayer, optimal_lineup: Dict[str, RosterSlot]):
-
-        # get player eligible positions based on league roster
-        eligible_positions = list(player.eligible_positions.intersection(set(self.roster_active_slots)))
-
-        # separate primary positions from flex positions in order to fill primary positions first
-        eligible_primary_positions = list(
-            player.eligible_positions.intersection(eligible_positions).intersection(self.roster_primary_slots)
+        optimal_slot_assignments = get_optimal_slot_assignments(
+            [player.points for player in players],
+            [self._get_eligible_positions_mask(player) for player in players],
+            self.slot_position_bits,
+            self.slot_counts,
+            self.roster_flex_slots_mask
         )
-        eligible_flex_positions = list(
-            player.eligible_positions.intersection(eligible_positions).intersection(self.roster_flex_slots)
-        )
-
-        assigned_pos = None
-        point_diffs: Dict[str, float] = {}
-        players_with_eligible_open_slots: Dict[str, List[Dict[str, Union[BasePlayer, List[str]]]]] = defaultdict(list)
-        for eligible_pos in eligible_primary_positions + eligible_flex_positions:
+        for player_ndx, slot_ndx in optimal_slot_assignments:
+            optimal_lineup[self.slot_positions[slot_ndx]].add_player(players[player_ndx])
+
+        return optimal_lineup
+
+    def _get_lineup_players(self, team_roster: List[BasePlayer]) -> List[BasePlayer]:
+        # sort roster by points from highest to lowest (excluding IR players)
+        return sorted([p for p in team_roster if p.selected_position != "IR"], key=lambda p: p.points, reverse=True)
+
+    def execute_season_coaching_efficiency(self, teams_by_week: Dict[str, Dict[str, BaseTeam]],
+                                           workers: int = 1) -> Dict[str, Dict[str, Tuple[float, float]]]:
+        """Calculate the optimal points and coaching efficiency (before disqualifications) of every team for every
+        week in one pass that shares the league roster slot model, optionally split by week across processes.
+
+        :return: dict of week -> team ID -> (coaching efficiency, optimal points) that is also kept for lookup by
+            execute_coaching_efficiency
+        """
+        logger.debug(f"Calculating season coaching efficiency for {len(teams_by_week)} week(s).")
+
+        slot_model = (self.slot_position_bits, self.slot_counts, self.roster_flex_slots_mask)
+        weeks = list(teams_by_week.keys())
+        weekly_rosters = [
+            [
+                (
+                    team_id,
+                    [
+                        (player.points, self._get_eligible_positions_mask(player))
+                        for player in self._get_lineup_players(team.roster)
+                    ]
+                ) for team_id, team in teams_by_week[week].items()
+            ] for week in weeks
+        ]
 
-            if not optimal_lineup.get(eligible_pos).is_full():
-                # assign player to optimal lineup if eligible position has open slot
-                assigned_pos = optimal_lineup.get(eligible_pos).add_player(player)
-                break
-            else:
-                # collect point differences between player and all players they could potentially replace
-                point_diffs[eligible_pos] = player.points - optimal_lineup.get(eligible_pos).assigned_players[-1].points
-                for assigned_player in optimal_lineup.get(eligible_pos).assigned_players:
-                    players_with_eligible_open_slots[eligible_pos].append(
-                        {
-                            "assigned_player": assigned_player,
-                            "open_positions": self._get_player_open_positions(assigned_player, optimal_lineup),
-                        }
-                    )
-
-        if assigned_pos:
-            return assigned_pos
+        if workers > 1 and len(weeks) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(weeks))) as executor:
+                weekly_optimal_points = list(executor.map(
+                    calculate_optimal_points, [slot_model] * len(weeks), weekly_rosters
+                ))
         else:
-            # if no open positions get the highest point difference between player and potentially replaceable players
-            try:
-                max_point_diff = max(point_diffs.values())
-            except ValueError:
-                # handle when a team roster contains a player without any eligible league roster positions
-                return None
-            if max_point_diff <= 0:
-                # if no positive point difference check if any potentially replaceable players
-                return self._create_open_slot_if_possible(player, players_with_eligible_open_slots, optimal_lineup)
-
-            # collect all positions that share the max point difference with the player
-            max_point_diff_positions = [
-                pos for pos, point_diff in point_diffs.items() if point_diff == max_point_diff
-            ]
-            if len(max_point_diff_positions) == 1:
-                max_point_diff_position = max_point_diff_positions[0]
-            else:
-                # favor selection of primary position over flex position max point different position
-                max_point_diff_primary_positions = list(
-                    set(max_point_diff_positions).intersection(eligible_primary_positions)
-                )
-                if len(max_point_diff_primary_positions) > 0:
-                    max_point_diff_position = max_point_diff_primary_positions[0]
-                else:
-                    max_point_diff_position = max_point_diff_positions[0]
+            weekly_optimal_points = [calculate_optimal_points(slot_model, rosters) for rosters in weekly_rosters]
+
+        for week, optimal_points_by_team in zip(weeks, weekly_optimal_points):
+            self.season_coaching_efficiency[str(week)] = {}
+            for team_id, optimal_score in optimal_points_by_team.items():
+                team_points = teams_by_week[week][team_id].points
+                try:
+                    coaching_efficiency = (team_points / optimal_score) * 100
+                except ZeroDivisionError:
+                    coaching_efficiency = 0.0
+                self.season_coaching_efficiency[str(week)][team_id] = (coaching_efficiency, optimal_score)
 
-            # remove replaceable player from their slot and replace them with eligible player
-            replaced_player = optimal_lineup.get(max_point_diff_position).remove_player()
-            optimal_lineup.get(max_point_diff_position).add_player(player)
+        return self.season_coaching_efficiency
 
-        # assign replaced player to new optimal lineup position
-        return self._assign_player_to_optimal_slot(replaced_player, optimal_lineup)
+    def get_coaching_efficiency_dqs(self, week: int) -> Dict[str, int]:
+        return self.coaching_efficiency_dqs_by_week.get(int(week), {})
 
     def execute_coaching_efficiency(self, team_name, team_roster, team_points, positions_filled_active, week,
-                                    inactive_players, dq_eligible=False):
+                                    inactive_players, dq_eligible=False, team_id=None):
         logger.debug(f"Calculating week {week} coaching efficiency for team \"{team_name}\".")
 
-        # create empty team optimal lineup
-        optimal_lineup: Dict[str, RosterSlot] = {}
-        for pos, slots in self.roster_slot_counts.items():
-            if pos not in self.roster_bench_slots and slots > 0:
-                # pos_info = {"slots": slots, "count": 0, "players": []}
-                # optimal_lineup[pos] = pos_info
-                optimal_lineup[pos] = RosterSlot(pos, max_allowed=slots)
-
-        # sort roster by points from highest to lowest
-        team_roster_by_points: List[BasePlayer] = sorted(
-            [p for p in team_roster if p.selected_position != "IR"],
-            key=lambda p: p.points,
-            reverse=True
-        )
-
-        # assign each player from highest-scoring to lowest to maximize points
-        for player in team_roster_by_points:
-            self._assign_player_to_optimal_slot(player, optimal_lineup)
+        season_results = self.season_coaching_efficiency.get(str(week), {})
+        if team_id is not None and team_id in season_results:
+            # look up the coaching efficiency and optimal score already calculated by the season batch
+            coaching_efficiency, optimal_score = season_results[team_id]
+            optimal_lineup = {}
+        else:
+            # assign players to the optimal lineup that maximizes points
+            optimal_lineup = self._get_optimal_lineup(self._get_lineup_players(team_roster))
 
-        # calculate optimal score
-        optimal_score = round(
-            sum([p.points for roster_slot in optimal_lineup.values() for p in roster_slot.assigned_players]), 2
-        )
+            # calculate optimal score
+            optimal_score = round(
+                sum([p.points for roster_slot in optimal_lineup.values() for p in roster_slot.assigned_players]), 2
+            )
 
-        # calculate coaching efficiency
-        try:
-            coaching_efficiency = (team_points / optimal_score) * 100
-        except ZeroDivisionError:
-            coaching_efficiency = 0.0
+            # calculate coaching efficiency
+            try:
+                coaching_efficiency = (team_points / optimal_score) * 100
+            except ZeroDivisionError:
+                coaching_efficiency = 0.0
 
         logger.debug(
             f"\n"
@@ -275,10 +345,10 @@ class CoachingEfficiency(object):
                     efficiency_disqualification = False
                 else:
                     efficiency_disqualification = True
-                    self.coaching_efficiency_dqs[team_name] = ineligible_efficiency_player_count
+                    self.coaching_efficiency_dqs_by_week[int(week)][team_name] = ineligible_efficiency_player_count
             else:
                 efficiency_disqualification = True
-                self.coaching_efficiency_dqs[team_name] = -1
+                self.coaching_efficiency_dqs_by_week[int(week)][team_name] = -1
 
             if efficiency_disqualification:
                 coaching_efficiency = "DQ"
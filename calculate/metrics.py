@@ -2,18 +2,65 @@ __author__ = "Wren J. R. (uberfastman)"
 __email__ = "uberfastman@uberfastman.dev"
 
 import itertools
-from collections import defaultdict, OrderedDict
+import math
+from collections import defaultdict
 from statistics import mean
-from typing import Union, List, Dict, Any
+from pathlib import Path
+from typing import Union, List, Dict, Any, Tuple, Optional
 
 import numpy as np
 
+from calculate.records import RecordsEngine
 from dao.base import BaseLeague, BaseTeam, BaseRecord, BasePlayer
 from utilities.logger import get_logger
+from utilities.settings import settings
 
 logger = get_logger(__name__, propagate=False)
 
 
+class ZScoreAccumulator(object):
+    """Running per-team mean and sum of squared differences from the mean (M2) of weekly scores updated with Welford's
+    algorithm, so weekly z-scores only need the new week of scores instead of every previous week.
+    """
+
+    def __init__(self):
+        self.num_weeks: int = 0
+        self.counts: Dict[str, int] = defaultdict(int)
+        self.means: Dict[str, float] = defaultdict(float)
+        self.m2s: Dict[str, float] = defaultdict(float)
+
+    def add_week(self, teams_results: Dict[str, BaseTeam]) -> None:
+        self.num_weeks += 1
+        for team_id, team in teams_results.items():
+            score = float(team.points)
+            self.counts[team_id] += 1
+            delta = score - self.means[team_id]
+            self.means[team_id] += delta / self.counts[team_id]
+            self.m2s[team_id] += delta * (score - self.means[team_id])
+
+    def get_z_scores(self, teams_results: Dict[str, BaseTeam]) -> Dict[str, Optional[float]]:
+        """Calculate the z-score of every team's score for a week against the scores of all previously added weeks.
+        """
+        results = {}
+
+        # can only determine z_score with at least two previous weeks of scores
+        can_calculate = self.num_weeks > 1
+
+        for team_id, team in teams_results.items():
+            z_score = None
+
+            if can_calculate:
+                # population standard deviation (like np.std)
+                standard_deviation = math.sqrt(self.m2s[team_id] / self.counts[team_id])
+                z_score = (
+                    (float(team.points) - self.means[team_id]) / standard_deviation if standard_deviation != 0 else 0
+                )
+
+            results[team_id] = z_score
+
+        return results
+
+
 class CalculateMetrics(object):
     def __init__(self, league_id: Union[str, None], playoff_slots: Union[int, None],
                  playoff_simulations: Union[int, None]):
@@ -222,6 +269,11 @@ class CalculateMetrics(object):
                                  ] + team_playoff_stats
             # ] + summed_stats
 
+            # add odds of reaching each playoff round after the first (the last of which is winning the championship)
+            # when the playoff bracket was simulated
+            if len(team_with_playoff_probs) > 6 and team_with_playoff_probs[6]:
+                team_playoffs_data.extend(team_with_playoff_probs[6][1:])
+
             if team.record.division or team.record.division == 0:
                 has_divisions = True
                 team_playoffs_data.insert(
@@ -523,6 +575,19 @@ class CalculateMetrics(object):
 
             season_average_points_by_player_dict = defaultdict(list)
             if break_ties and ties_for_coaching_efficiency > 0 and week == int(week_for_report):
+                # retrieve the weekly points of the starters of every tied team up front in batched concurrent requests
+                tied_team_names = [ce_result[1] for ce_result in data_for_coaching_efficiency if ce_result[0] == "1*"]
+                league.prefetch_player_points_by_week(
+                    [
+                        (str(player.player_id), week_counter)
+                        for team_result in teams_results.values() if team_result.name in tied_team_names
+                        for player in team_result.roster if player.selected_position not in bench_positions
+                        for week_counter in range(1, int(week) + 1)
+                    ],
+                    workers=settings.player_points_prefetch_workers,
+                    cache=settings.player_points_cache_bool
+                )
+
                 for ce_result in data_for_coaching_efficiency:
                     if ce_result[0] == "1*":
                         players = []
@@ -537,12 +602,9 @@ class CalculateMetrics(object):
                             if player.selected_position not in bench_positions:
                                 week_counter = 1
                                 while week_counter <= int(week):
-                                    players_by_week = league.players_by_week[str(week_counter)]
-                                    if str(player.player_id) in players_by_week.keys():
-                                        weekly_player_points = players_by_week[str(player.player_id)].points
-                                    else:
-                                        weekly_player_points = league.get_player_data_by_week(
-                                            str(player.player_id), week_counter)
+                                    weekly_player_points = league.get_player_points_by_week(
+                                        str(player.player_id), week_counter, cache=settings.player_points_cache_bool
+                                    )
 
                                     season_average_points_by_player_dict[player.player_id].append(weekly_player_points)
                                     week_counter += 1
@@ -696,6 +758,22 @@ class CalculateMetrics(object):
             # # # uncomment to test power ranking ties
             # team.power_rank = test_power_rank
 
+    @staticmethod
+    def get_records_engine(league: BaseLeague) -> RecordsEngine:
+        if not league.records_engine:
+            team_ids = []
+            for week, teams in sorted(league.teams_by_week.items(), key=lambda x: int(x[0])):
+                team_ids.extend(str(team_id) for team_id in teams.keys() if str(team_id) not in team_ids)
+
+            league.records_engine = RecordsEngine(
+                team_ids,
+                league.start_week,
+                state_file_path=(
+                    Path(league.data_dir) / str(league.season) / str(league.league_id) / "records_state.json"
+                ) if settings.records_state_cache_bool else None
+            )
+        return league.records_engine
+
     @staticmethod
     def calculate_records(week: int, league: BaseLeague,
                           custom_weekly_matchups: List[Dict[str, Dict[str, Any]]]) -> Dict[str, BaseRecord]:
@@ -703,123 +781,115 @@ class CalculateMetrics(object):
 
         standings = league.standings if league.standings else league.current_standings
 
-        records = defaultdict(BaseRecord)
+        # apply the matchup results of the week to the cumulative records (reusing the persisted records of weeks
+        # that were already calculated with the same matchups)
+        records_engine = CalculateMetrics.get_records_engine(league)
+        records_engine.update(week, custom_weekly_matchups)
+        records = records_engine.get_records(week, standings)
+
         team: BaseTeam
         for team in standings:
-            if week == league.start_week:
-                record = BaseRecord(week, team_id=team.team_id, team_name=team.name, division=team.division)
-            else:
-                previous_week_record: BaseRecord = league.records_by_week[str(week - 1)][team.team_id]
-                record = BaseRecord(
-                    week,
-                    wins=previous_week_record.get_wins(),
-                    ties=previous_week_record.get_ties(),
-                    losses=previous_week_record.get_losses(),
-                    points_for=previous_week_record.get_points_for(),
-                    points_against=previous_week_record.get_points_against(),
-                    streak_type=previous_week_record.get_streak_type(),
-                    streak_len=previous_week_record.get_streak_length(),
-                    team_id=team.team_id,
-                    team_name=team.name,
-                    division=team.division,
-                    division_wins=previous_week_record.get_division_wins(),
-                    division_ties=previous_week_record.get_division_ties(),
-                    division_losses=previous_week_record.get_division_losses(),
-                    division_points_for=previous_week_record.get_division_points_for(),
-                    division_points_against=previous_week_record.get_division_points_against(),
-                    division_streak_type=previous_week_record.get_division_streak_type(),
-                    division_streak_len=previous_week_record.get_division_streak_length()
-                )
+            if team.team_id in records:
+                team.record = records[team.team_id]
 
-            # league.matchups_by_week[str(week)]
-
-            for matchup in custom_weekly_matchups:
-                for team_id, matchup_result in matchup.items():
-                    if str(team_id) == str(team.team_id):
-                        outcome = matchup_result["result"]
-                        if outcome == "W":
-                            record.add_win()
-                            if matchup_result["division"]:
-                                record.add_division_win()
-                        elif outcome == "L":
-                            record.add_loss()
-                            if matchup_result["division"]:
-                                record.add_division_loss()
-                        else:
-                            record.add_tie()
-                            if matchup_result["division"]:
-                                record.add_division_tie()
-                        record.add_points_for(matchup_result["points_for"])
-                        record.add_points_against(matchup_result["points_against"])
-                        if matchup_result["division"]:
-                            record.add_division_points_for(matchup_result["points_for"])
-                            record.add_division_points_against(matchup_result["points_against"])
-                        records[team.team_id] = record
-
-            team.record = record
-
-        ordered_records = OrderedDict()
-        standings_rank = 1
-        for ordered_record in sorted(
-                records.items(),
-                key=lambda x: (-x[1].get_wins(), -x[1].get_losses(), -x[1].get_ties(), -x[1].get_points_for())):
-            ordered_record[1].rank = standings_rank
-            ordered_records[ordered_record[0]] = ordered_record[1]
-            standings_rank += 1
-
-        league.records_by_week[str(week)] = ordered_records
+        league.records_by_week[str(week)] = records
         return records
 
     @staticmethod
-    def calculate_luck(week: int, league: BaseLeague, custom_weekly_matchups: List[Dict[str, Dict[str, Any]]]) -> Dict[
-        str, Dict[str, BaseRecord]]:
-        logger.debug(f"Calculating luck for week \"{week}\".")
-
-        luck_results = defaultdict(defaultdict)
-
-        teams = league.teams_by_week.get(str(week))
-
-        matchups = {
-            str(team_id): value[
-                "result"] for pair in custom_weekly_matchups for team_id, value in list(pair.items())
-        }
-
-        team_1: BaseTeam
-        for team_1 in teams.values():
-            luck_record = BaseRecord()
-
-            for team_2 in teams.values():
-                if team_1.team_id == team_2.team_id:
-                    continue
-                score_1 = team_1.points
-                score_2 = team_2.points
-
-                if float(score_1) > float(score_2):
-                    luck_record.add_win()
-                elif float(score_1) < float(score_2):
-                    luck_record.add_loss()
-                else:
-                    luck_record.add_tie()
-
-            luck_results[team_1.team_id]["luck_record"] = luck_record
+    def get_weekly_overall_records_and_luck(scores: np.ndarray, matchup_wins_or_ties: np.ndarray) -> Tuple[
+            np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Calculate the weekly overall records (each team against every other team) and luck of a (weeks x teams)
+        matrix of scores by ranking the scores of each week once instead of comparing every pair of teams.
+
+        :param scores: (weeks x teams) matrix of team scores
+        :param matchup_wins_or_ties: (weeks x teams) boolean matrix of whether each team won or tied its matchup
+        :return: (weeks x teams) matrices of overall wins, ties, losses, and luck percentages
+        """
+        num_weeks, num_teams = scores.shape
+
+        # sort the scores of each week, after which each group of tied scores spans a contiguous range of positions
+        # where the number of lower scores is the group start and the number of higher scores follows the group end
+        sort_ndxs = np.argsort(scores, axis=1, kind="stable")
+        sorted_scores = np.take_along_axis(scores, sort_ndxs, axis=1)
+        positions = np.broadcast_to(np.arange(num_teams), (num_weeks, num_teams))
+        is_group_start = np.ones((num_weeks, num_teams), dtype=bool)
+        is_group_start[:, 1:] = sorted_scores[:, 1:] != sorted_scores[:, :-1]
+        is_group_end = np.ones((num_weeks, num_teams), dtype=bool)
+        is_group_end[:, :-1] = is_group_start[:, 1:]
+        group_starts = np.maximum.accumulate(np.where(is_group_start, positions, 0), axis=1)
+        group_ends = np.minimum.accumulate(
+            np.where(is_group_end, positions, num_teams - 1)[:, ::-1], axis=1
+        )[:, ::-1]
+
+        wins = np.empty((num_weeks, num_teams), dtype=np.int64)
+        losses = np.empty((num_weeks, num_teams), dtype=np.int64)
+        np.put_along_axis(wins, sort_ndxs, group_starts, axis=1)
+        np.put_along_axis(losses, sort_ndxs, num_teams - 1 - group_ends, axis=1)
+        ties = num_teams - 1 - wins - losses
+
+        # luck is the share of other teams a team would have lost to (or tied) when it won or tied its matchup, or the
+        # negative share of other teams it would have beaten (or tied) when it lost, and is zero when a team had the
+        # highest or lowest score of the week
+        # TODO: assuming no ties...  how are tiebreakers handled?
+        with np.errstate(divide="ignore", invalid="ignore"):
+            luck = np.where(
+                matchup_wins_or_ties,
+                (losses + ties) / (num_teams - 1),
+                -(wins + ties) / (num_teams - 1)
+            ) * 100
+        luck = np.where((wins != 0) & (losses != 0), luck, 0.0)
+
+        return wins, ties, losses, luck
 
-            # calc luck %
-            # TODO: assuming no ties...  how are tiebreakers handled?
-            luck = 0.0
-            # number of teams excluding current team
-            num_teams = float(len(teams)) - 1
+    @staticmethod
+    def calculate_season_luck(weeks: List[int], league: BaseLeague,
+                              custom_weekly_matchups_by_week: Dict[str, List[Dict[str, Dict[str, Any]]]]) -> Dict[
+            str, Dict[str, Dict[str, Union[BaseRecord, float]]]]:
+        """Calculate luck for all weeks at once from a (weeks x teams) score matrix.
 
-            if luck_record.get_wins() != 0 and luck_record.get_losses() != 0:
-                matchup_result = matchups[str(team_1.team_id)]
-                if matchup_result == "W" or matchup_result == "T":
-                    luck = (luck_record.get_losses() + luck_record.get_ties()) / num_teams
-                else:
-                    luck = 0 - (luck_record.get_wins() + luck_record.get_ties()) / num_teams
+        :return: dict of week -> team ID -> dict with the "luck_record" and "luck" of the team
+        """
+        logger.debug(f"Calculating luck for weeks {weeks[0] if weeks else ''}-{weeks[-1] if weeks else ''}.")
+
+        season_luck_results = {}
+        # teams are matched up by ID across weeks, so weeks with different teams are calculated separately
+        weeks_by_team_ids = defaultdict(list)
+        for week in weeks:
+            weeks_by_team_ids[tuple(league.teams_by_week.get(str(week)).keys())].append(week)
+
+        for team_ids, team_ids_weeks in weeks_by_team_ids.items():
+            scores = np.array(
+                [
+                    [float(league.teams_by_week.get(str(week))[team_id].points) for team_id in team_ids]
+                    for week in team_ids_weeks
+                ],
+                dtype=np.float64
+            ).reshape(len(team_ids_weeks), len(team_ids))
+            matchup_wins_or_ties = np.zeros(scores.shape, dtype=bool)
+            for week_ndx, week in enumerate(team_ids_weeks):
+                matchups = {
+                    str(team_id): value["result"]
+                    for pair in custom_weekly_matchups_by_week[str(week)] for team_id, value in list(pair.items())
+                }
+                for team_ndx, team_id in enumerate(team_ids):
+                    matchup_wins_or_ties[week_ndx, team_ndx] = matchups.get(str(team_id)) in ("W", "T")
+
+            wins, ties, losses, luck = CalculateMetrics.get_weekly_overall_records_and_luck(
+                scores, matchup_wins_or_ties
+            )
 
-            # noinspection PyTypeChecker
-            luck_results[team_1.team_id]["luck"] = luck * 100
+            for week_ndx, week in enumerate(team_ids_weeks):
+                luck_results = defaultdict(defaultdict)
+                for team_ndx, team_id in enumerate(team_ids):
+                    luck_results[team_id]["luck_record"] = BaseRecord(
+                        wins=int(wins[week_ndx, team_ndx]),
+                        ties=int(ties[week_ndx, team_ndx]),
+                        losses=int(losses[week_ndx, team_ndx])
+                    )
+                    luck_results[team_id]["luck"] = float(luck[week_ndx, team_ndx])
+                season_luck_results[str(week)] = luck_results
 
-        return luck_results
+        return season_luck_results
 
     @staticmethod
     def get_ranks_for_metric(data_for_metric: List[List[Any]], power_ranked_teams: Dict[str, Dict[str, Any]],
@@ -854,31 +924,3 @@ class CalculateMetrics(object):
                                               team_rankings["coaching_efficiency_ranking"] +
                                               team_rankings["luck_ranking"]) // 3.0
         return power_ranked_teams
-
-    @staticmethod
-    def calculate_z_scores(weekly_teams_results: List[Dict[str, BaseTeam]]) -> Dict[str, float]:
-        logger.debug("Calculating z-scores.")
-
-        results = {}
-
-        # can only determine z_score
-        can_calculate = len(weekly_teams_results) > 2
-
-        # iterates through team ids of first week since team ids remain unchanged
-        for team_id in weekly_teams_results[0].keys():
-            z_score = None
-
-            if can_calculate:
-                scores = [week[team_id].points for week in weekly_teams_results]
-
-                scores_excluding_current = scores[:-1]
-                current_score = scores[-1]
-
-                standard_deviation = np.std(scores_excluding_current)
-                mean_score = np.mean(scores_excluding_current)
-                z_score = (float(current_score) - float(mean_score)) / float(
-                    standard_deviation) if standard_deviation != 0 else 0
-
-            results[team_id] = z_score
-
-        return results
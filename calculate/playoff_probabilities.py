@@ -6,25 +6,43 @@ __email__ = "uberfastman@uberfastman.dev"
 # code snippets: https://github.com/cdtdev/ff_monte_carlo (originally written by https://github.com/cdtdev)
 
 import datetime
+import hashlib
 import itertools
 import json
-import os
 import random
 import traceback
+from concurrent.futures import ProcessPoolExecutor
 from copy import deepcopy
 from pathlib import Path
-from typing import Dict, List, Tuple, Any, Union, TYPE_CHECKING
+from typing import Dict, List, Tuple, Any, Union, Optional, TYPE_CHECKING
 
 import numpy as np
 
 from utilities.logger import get_logger
 from utilities.settings import settings
+from utilities.utils import open_for_atomic_write
 
 if TYPE_CHECKING:
     from dao.base import BaseTeam, BaseMatchup
 
 logger = get_logger(__name__, propagate=False)
 
+# number of simulations drawn at once by the vectorized engine to bound memory use for large simulation counts
+VECTORIZED_SIMULATION_BATCH_SIZE = 10000
+
+# confidence level (and its corresponding z-score) used to decide when playoff simulations have converged
+CONVERGENCE_CONFIDENCE_LEVEL = 95
+CONVERGENCE_CONFIDENCE_Z_SCORE = 1.96
+
+# version of the playoff simulation cache key format, which must be incremented whenever a change to the simulations
+# would produce different results from the same inputs so that stale cached playoff probabilities are not reused
+# (2: score model simulations, 3: playoff bracket odds added to the cached playoff probabilities data, 4: playoff bracket
+# drawn from its own seed in every batch of simulations)
+PLAYOFF_SIMULATION_CACHE_VERSION = 4
+
+# name of the what-if playoff scenario without any forced matchup outcomes
+PLAYOFF_SCENARIO_BASELINE = "Baseline"
+
 
 class TeamWithPlayoffProbs(object):
 
@@ -52,6 +70,7 @@ class TeamWithPlayoffProbs(object):
         self.is_predicted_division_qualifier = False
         self.playoff_tally = 0
         self.playoff_stats = [0] * int(playoff_slots)
+        self.bracket_stats = []
         self.simulations = int(simulations)
 
     def __str__(self):
@@ -60,30 +79,6 @@ class TeamWithPlayoffProbs(object):
     def __repr__(self):
         return str(self.__dict__)
 
-    def add_win(self):
-        self.wins += 1
-
-    def add_division_win(self):
-        self.division_wins += 1
-
-    def add_loss(self):
-        self.losses += 1
-
-    def add_division_loss(self):
-        self.division_losses += 1
-
-    def add_division_leader_tally(self):
-        self.division_leader_tally += 1
-
-    def add_division_qualifier_tally(self):
-        self.division_qualifier_tally += 1
-
-    def add_playoff_tally(self):
-        self.playoff_tally += 1
-
-    def add_playoff_stats(self, place):
-        self.playoff_stats[place - 1] += 1
-
     def get_wins_with_points(self):
         return self.wins + (self.points_for / 1000000)
 
@@ -96,20 +91,504 @@ class TeamWithPlayoffProbs(object):
     def get_playoff_stats(self):
         return [round((stat / self.simulations) * 100.0, 2) for stat in self.playoff_stats]
 
-    def reset_to_base_record(self):
-        self.wins = self.base_wins
-        self.losses = self.base_losses
-        self.division_wins = self.base_division_wins
-        self.division_losses = self.base_division_losses
+    def get_bracket_stats(self):
+        return [round((stat / self.simulations) * 100.0, 2) for stat in self.bracket_stats]
+
+
+class PlayoffSimulationTeamState(object):
+    # rows of the record arrays
+    WINS = 0
+    LOSSES = 1
+    DIVISION_WINS = 2
+    DIVISION_LOSSES = 3
+
+    def __init__(self, teams: List[TeamWithPlayoffProbs], matchups: List[Tuple[str, str]], num_divisions: int = 0):
+        """Structure-of-arrays team state for simulating one season at a time.
+
+        Records are stored as a (4 x teams) int array indexed by team ordinal (the position of the team in the list of
+        teams) so resetting every team to its base record is a single array copy, and division membership is
+        precomputed as arrays of team ordinals in the same order used by PlayoffProbabilities.group_by_division.
+        """
+        self.num_teams: int = len(teams)
+        team_ndx_by_id = {team.team_id: ndx for ndx, team in enumerate(teams)}
+
+        self.base_record: np.ndarray = np.array([
+            [team.base_wins for team in teams],
+            [team.base_losses for team in teams],
+            [team.base_division_wins for team in teams],
+            [team.base_division_losses for team in teams]
+        ], dtype=np.int64).reshape(4, self.num_teams)
+        self.record: np.ndarray = self.base_record.copy()
+
+        self.ties: np.ndarray = np.array([team.ties for team in teams], dtype=np.int64)
+        self.division_ties: np.ndarray = np.array([team.division_ties for team in teams], dtype=np.int64)
+        self.points_for: np.ndarray = np.array([team.points_for for team in teams], dtype=np.float64)
+        self.division_points_for: np.ndarray = np.array(
+            [team.division_points_for for team in teams], dtype=np.float64
+        )
+
+        # team ordinals of the first and second team in each matchup, and whether each matchup is a division matchup
+        self.matchup_team_ndxs: np.ndarray = np.array(
+            [[team_ndx_by_id[matchup[0]], team_ndx_by_id[matchup[1]]] for matchup in matchups], dtype=np.intp
+        ).reshape(len(matchups), 2)
+        self.division_matchups: np.ndarray = np.array([
+            num_divisions > 0 and bool(teams[team_1_ndx].division) and bool(teams[team_2_ndx].division)
+            and teams[team_1_ndx].division == teams[team_2_ndx].division
+            for team_1_ndx, team_2_ndx in self.matchup_team_ndxs
+        ], dtype=bool)
+
+        # (4 x teams x matchups) incidence of the record rows changed by the first team winning each matchup, along with
+        # the (4 x teams) record changes if the second team won every matchup, so that adding the results of a season
+        # is a single product with the matchup results
+        self.result_incidence: np.ndarray = np.zeros((4, self.num_teams, len(matchups)), dtype=np.int64)
+        self.result_offsets: np.ndarray = np.zeros((4, self.num_teams), dtype=np.int64)
+        for matchup_ndx, (team_1_ndx, team_2_ndx) in enumerate(self.matchup_team_ndxs):
+            record_rows = [(self.WINS, self.LOSSES)]
+            if self.division_matchups[matchup_ndx]:
+                record_rows.append((self.DIVISION_WINS, self.DIVISION_LOSSES))
+            for wins_row, losses_row in record_rows:
+                self.result_incidence[wins_row, team_1_ndx, matchup_ndx] += 1
+                self.result_incidence[losses_row, team_1_ndx, matchup_ndx] -= 1
+                self.result_incidence[wins_row, team_2_ndx, matchup_ndx] -= 1
+                self.result_incidence[losses_row, team_2_ndx, matchup_ndx] += 1
+                self.result_offsets[losses_row, team_1_ndx] += 1
+                self.result_offsets[wins_row, team_2_ndx] += 1
+        self.result_incidence = self.result_incidence.reshape(4 * self.num_teams, len(matchups))
+
+        self.division_ndxs: List[List[int]] = []
+        if num_divisions > 0:
+            self.division_ndxs = [
+                [team_ndx_by_id[team.team_id] for team in group]
+                for key, group in itertools.groupby(sorted(teams, key=lambda x: x.division), lambda x: str(x.division))
+            ][:num_divisions]
+
+    def reset(self) -> None:
+        np.copyto(self.record, self.base_record)
+
+    def add_results(self, team_1_wins: np.ndarray) -> None:
+        """Add the results of every matchup given an array of 1 if the first team in each matchup won or 0 if not.
+        """
+        self.record += (self.result_incidence @ team_1_wins).reshape(4, self.num_teams) + self.result_offsets
+
+    def get_wins_with_points(self) -> np.ndarray:
+        return self.record[self.WINS] + (self.points_for / 1000000)
+
+    def get_division_wins_with_points(self) -> np.ndarray:
+        return self.record[self.DIVISION_WINS] + (self.division_points_for / 1000000)
+
+
+class PlayoffSimulationTallies(object):
+
+    def __init__(self, num_teams: int, num_playoff_slots: int, num_bracket_rounds: int = 0):
+        self.simulations: int = 0
+        self.playoff_stats: np.ndarray = np.zeros((num_teams, num_playoff_slots), dtype=np.int64)
+        # number of times each team reached each playoff round, where the last column counts championships
+        self.bracket_stats: np.ndarray = np.zeros(
+            (num_teams, num_bracket_rounds + 1 if num_bracket_rounds > 0 else 0), dtype=np.int64
+        )
+        self.division_leader_tally: np.ndarray = np.zeros(num_teams, dtype=np.int64)
+        self.division_qualifier_tally: np.ndarray = np.zeros(num_teams, dtype=np.int64)
+        self.avg_wins: np.ndarray = np.zeros(num_playoff_slots, dtype=np.float64)
+
+    def merge(self, other: PlayoffSimulationTallies) -> PlayoffSimulationTallies:
+        self.simulations += other.simulations
+        self.playoff_stats += other.playoff_stats
+        self.bracket_stats += other.bracket_stats
+        self.division_leader_tally += other.division_leader_tally
+        self.division_qualifier_tally += other.division_qualifier_tally
+        self.avg_wins += other.avg_wins
+        return self
+
+    def get_max_playoff_confidence_interval_width(self) -> float:
+        """Get the widest Wilson score confidence interval (in percentage points) of any team's playoff chance.
+        """
+        z = CONVERGENCE_CONFIDENCE_Z_SCORE
+        playoff_chances = self.playoff_stats.sum(axis=1) / self.simulations
+        half_widths = (z / (1 + (z ** 2) / self.simulations)) * np.sqrt(
+            (playoff_chances * (1 - playoff_chances) / self.simulations) + ((z ** 2) / (4 * (self.simulations ** 2)))
+        )
+        return float(2 * half_widths.max() * 100.0)
+
+    def apply_to_teams(self, teams: List[TeamWithPlayoffProbs]) -> List[float]:
+        team: TeamWithPlayoffProbs
+        for ndx, team in enumerate(teams):
+            team.simulations = self.simulations
+            team.playoff_stats = self.playoff_stats[ndx].tolist()
+            team.bracket_stats = self.bracket_stats[ndx].tolist()
+            team.playoff_tally = int(self.playoff_stats[ndx].sum())
+            team.division_leader_tally = int(self.division_leader_tally[ndx])
+            team.division_qualifier_tally = int(self.division_qualifier_tally[ndx])
+
+        return self.avg_wins.tolist()
+
+
+class VectorizedPlayoffSimulator(object):
+
+    def __init__(self, teams: List[TeamWithPlayoffProbs], matchups: List[Tuple[str, str]], num_playoff_slots: int,
+                 num_divisions: int = 0, num_playoff_slots_per_division: int = 1,
+                 team_weekly_points: Optional[List[List[float]]] = None, simulate_bracket: bool = False):
+        """Batched NumPy playoff simulator.
+
+        Every remaining matchup outcome for a batch of simulations is drawn at once as a (simulations x matchups)
+        array, wins are accumulated with a single product against a team/matchup incidence matrix, and teams are ranked
+        with stable argsort/lexsort so the resulting tallies match those produced by the loop-based engine.
+
+        When the weekly points of each team (in the same order as the teams) are provided, matchups are decided by
+        scores resampled from each team's own weekly points instead of by coin flips, and the sampled scores are added
+        to points for (and division points for) so the points for tiebreaker changes from simulation to simulation.
+
+        When the bracket is simulated, the playoff seeds of every simulation in the batch are placed into a standard
+        single elimination bracket (sized to the next power of two, with byes going to the top seeds) and every playoff
+        round is decided with the same matchup model as the regular season.
+        """
+        self.num_teams: int = len(teams)
+        self.num_matchups: int = len(matchups)
+        self.num_playoff_slots: int = num_playoff_slots
+        self.num_divisions: int = num_divisions
+        self.num_division_qualifiers: int = max(num_playoff_slots_per_division - 1, 0)
+
+        team_ndx_by_id = {team.team_id: ndx for ndx, team in enumerate(teams)}
+
+        # signed team/matchup incidence matrix: +1 for the first team in the matchup and -1 for the second team, so
+        # that (outcomes @ incidence) + (games as second team) gives the wins added to each team in each simulation
+        self.incidence: np.ndarray = np.zeros((self.num_matchups, self.num_teams), dtype=np.float64)
+        self.division_incidence: np.ndarray = np.zeros((self.num_matchups, self.num_teams), dtype=np.float64)
+        for matchup_ndx, matchup in enumerate(matchups):
+            team_1 = teams[team_ndx_by_id[matchup[0]]]
+            team_2 = teams[team_ndx_by_id[matchup[1]]]
+            self.incidence[matchup_ndx, team_ndx_by_id[team_1.team_id]] = 1
+            self.incidence[matchup_ndx, team_ndx_by_id[team_2.team_id]] = -1
+            if self.num_divisions > 0:
+                if team_1.division and team_2.division and team_1.division == team_2.division:
+                    self.division_incidence[matchup_ndx] = self.incidence[matchup_ndx]
+
+        self.games: np.ndarray = np.abs(self.incidence).sum(axis=0)
+        self.games_as_team_2: np.ndarray = (self.incidence < 0).sum(axis=0)
+        self.division_games: np.ndarray = np.abs(self.division_incidence).sum(axis=0)
+        self.division_games_as_team_2: np.ndarray = (self.division_incidence < 0).sum(axis=0)
+
+        self.base_wins: np.ndarray = np.array([team.base_wins for team in teams], dtype=np.float64)
+        self.base_losses: np.ndarray = np.array([team.base_losses for team in teams], dtype=np.float64)
+        self.ties: np.ndarray = np.array([team.ties for team in teams], dtype=np.float64)
+        self.points_for: np.ndarray = np.array([team.points_for for team in teams], dtype=np.float64)
+        self.base_division_wins: np.ndarray = np.array([team.base_division_wins for team in teams], dtype=np.float64)
+        self.base_division_losses: np.ndarray = np.array(
+            [team.base_division_losses for team in teams], dtype=np.float64
+        )
+        self.division_ties: np.ndarray = np.array([team.division_ties for team in teams], dtype=np.float64)
+        self.division_points_for: np.ndarray = np.array(
+            [team.division_points_for for team in teams], dtype=np.float64
+        )
+
+        # weekly points of every team padded into a (teams x weeks) array for resampling scores, along with the team
+        # indices of the first and second team in each matchup
+        self.score_model: bool = team_weekly_points is not None
+        if self.score_model:
+            self.num_weekly_points: np.ndarray = np.array(
+                [len(points) for points in team_weekly_points], dtype=np.int64
+            )
+            if self.num_teams > 0 and self.num_weekly_points.min() < 1:
+                raise ValueError("Every team must have at least one week of points to simulate matchups by score.")
+
+            self.weekly_points: np.ndarray = np.zeros(
+                (self.num_teams, self.num_weekly_points.max(initial=0)), dtype=np.float64
+            )
+            for team_ndx, points in enumerate(team_weekly_points):
+                self.weekly_points[team_ndx, :len(points)] = points
+
+            self.matchup_team_ndxs: np.ndarray = np.array(
+                [[team_ndx_by_id[matchup[0]], team_ndx_by_id[matchup[1]]] for matchup in matchups], dtype=np.intp
+            ).reshape(self.num_matchups, 2)
+            self.team_1_incidence: np.ndarray = (self.incidence > 0).astype(np.float64)
+            self.team_2_incidence: np.ndarray = (self.incidence < 0).astype(np.float64)
+            self.division_team_1_incidence: np.ndarray = (self.division_incidence > 0).astype(np.float64)
+            self.division_team_2_incidence: np.ndarray = (self.division_incidence < 0).astype(np.float64)
+
+        # playoff seeds (0-based, with -1 for a bye) in standard bracket order so that each adjacent pair of bracket
+        # positions meet in the first round, e.g. 1v8, 4v5, 2v7, 3v6 for an eight team bracket
+        self.num_bracket_rounds: int = 0
+        self.bracket_seed_ndxs: Optional[np.ndarray] = None
+        if simulate_bracket and self.num_playoff_slots > 1:
+            self.num_bracket_rounds = int(np.ceil(np.log2(self.num_playoff_slots)))
+            bracket_seeds = [1]
+            for bracket_round in range(self.num_bracket_rounds):
+                bracket_size = 2 ** (bracket_round + 1)
+                bracket_seeds = [seed for top_seed in bracket_seeds for seed in (top_seed, bracket_size + 1 - top_seed)]
+            self.bracket_seed_ndxs = np.array(
+                [seed - 1 if seed <= self.num_playoff_slots else -1 for seed in bracket_seeds], dtype=np.intp
+            )
+
+        # group team indices by division in the same order used by PlayoffProbabilities.group_by_division
+        self.division_groups: List[np.ndarray] = []
+        if self.num_divisions > 0:
+            self.division_groups = [
+                np.array([team_ndx_by_id[team.team_id] for team in group], dtype=np.intp)
+                for key, group in itertools.groupby(sorted(teams, key=lambda x: x.division), lambda x: str(x.division))
+            ][:self.num_divisions]
+
+    def simulate(self, rng: np.random.Generator, simulations: int) -> PlayoffSimulationTallies:
+        tallies = PlayoffSimulationTallies(self.num_teams, self.num_playoff_slots, self.num_bracket_rounds)
+
+        sims_remaining = simulations
+        while sims_remaining > 0:
+            batch_size = min(sims_remaining, VECTORIZED_SIMULATION_BATCH_SIZE)
+            self._simulate_batch(rng, batch_size, tallies)
+            sims_remaining -= batch_size
+
+        return tallies
+
+    def simulate_scenarios(self, rng: np.random.Generator, simulations: int,
+                           forced_outcomes: np.ndarray) -> List[PlayoffSimulationTallies]:
+        """Simulate every scenario of a (scenarios x matchups) array of forced matchup outcomes (1 if the first team in
+        the matchup is forced to win, 0 if the second team is forced to win, and -1 if the matchup is not forced).
+
+        All scenarios share the same random draws (common random numbers) so that differences between scenarios come
+        from the forced outcomes instead of from simulation noise.
+        """
+        scenario_tallies = [
+            PlayoffSimulationTallies(self.num_teams, self.num_playoff_slots, self.num_bracket_rounds)
+            for _ in range(len(forced_outcomes))
+        ]
+
+        sims_remaining = simulations
+        while sims_remaining > 0:
+            batch_size = min(sims_remaining, VECTORIZED_SIMULATION_BATCH_SIZE)
+            matchup_draws = self._draw_matchups(rng, batch_size)
+            # reuse the same playoff bracket draws for every scenario
+            bracket_seed = int(rng.integers(0, np.iinfo(np.int64).max))
+            for scenario_forced_outcomes, tallies in zip(forced_outcomes, scenario_tallies):
+                self._tally_batch(
+                    np.random.default_rng(bracket_seed),
+                    self._force_matchups(matchup_draws, scenario_forced_outcomes),
+                    tallies
+                )
+            sims_remaining -= batch_size
+
+        return scenario_tallies
+
+    def _simulate_batch(self, rng: np.random.Generator, batch_size: int, tallies: PlayoffSimulationTallies) -> None:
+        matchup_draws = self._draw_matchups(rng, batch_size)
+        # draw the playoff bracket from its own seed like simulate_scenarios so that the random number stream of every
+        # batch (and therefore the baseline what-if scenario) matches these simulations for the same seed
+        bracket_seed = int(rng.integers(0, np.iinfo(np.int64).max))
+        self._tally_batch(np.random.default_rng(bracket_seed), matchup_draws, tallies)
+
+    def _draw_matchups(self, rng: np.random.Generator, batch_size: int) -> np.ndarray:
+        if self.score_model:
+            # resample a score for both teams in every matchup from their own weekly points
+            point_ndxs = rng.integers(
+                0, self.num_weekly_points[self.matchup_team_ndxs], size=(batch_size, self.num_matchups, 2)
+            )
+            return self.weekly_points[self.matchup_team_ndxs, point_ndxs]
+        else:
+            # 1 if the first team in the matchup wins, 0 if the second team wins
+            return rng.integers(0, 2, size=(batch_size, self.num_matchups)).astype(np.float64)
+
+    def _force_matchups(self, matchup_draws: np.ndarray, forced_outcomes: np.ndarray) -> np.ndarray:
+        forced_team_1_wins = forced_outcomes == 1
+        forced_team_2_wins = forced_outcomes == 0
+        if self.score_model:
+            # swap the sampled scores of forced matchups won by the wrong team so the forced winner has the higher
+            # score, and nudge tied scores so the forced winner wins instead of tying
+            scores = matchup_draws.copy()
+            team_1_scores = scores[:, :, 0]
+            team_2_scores = scores[:, :, 1]
+            swap = (forced_team_1_wins & (team_1_scores < team_2_scores)) | (
+                forced_team_2_wins & (team_2_scores < team_1_scores)
+            )
+            scores[swap] = scores[swap][:, ::-1]
+            tied = team_1_scores == team_2_scores
+            team_1_scores[tied & forced_team_1_wins] += 0.01
+            team_2_scores[tied & forced_team_2_wins] += 0.01
+            return scores
+        else:
+            return np.where(forced_outcomes >= 0, forced_outcomes, matchup_draws)
+
+    def _tally_batch(self, rng: np.random.Generator, matchup_draws: np.ndarray,
+                     tallies: PlayoffSimulationTallies) -> None:
+        batch_size = matchup_draws.shape[0]
+
+        if self.score_model:
+            scores = matchup_draws
+            team_1_scores = scores[:, :, 0]
+            team_2_scores = scores[:, :, 1]
+            team_1_wins = (team_1_scores > team_2_scores).astype(np.float64)
+            team_2_wins = (team_2_scores > team_1_scores).astype(np.float64)
+            matchup_ties = (team_1_scores == team_2_scores).astype(np.float64)
+
+            wins = self.base_wins + team_1_wins @ self.team_1_incidence + team_2_wins @ self.team_2_incidence
+            losses = self.base_losses + team_2_wins @ self.team_1_incidence + team_1_wins @ self.team_2_incidence
+            ties = self.ties + matchup_ties @ np.abs(self.incidence)
+            points_for = self.points_for + team_1_scores @ self.team_1_incidence + team_2_scores @ self.team_2_incidence
+        else:
+            outcomes = matchup_draws
+
+            added_wins = outcomes @ self.incidence + self.games_as_team_2
+            wins = self.base_wins + added_wins
+            losses = self.base_losses + (self.games - added_wins)
+            ties = self.ties
+            points_for = self.points_for
+        wins_with_points = wins + (points_for / 1000000)
+
+        if self.num_divisions > 0:
+            if self.score_model:
+                division_wins = (
+                    self.base_division_wins
+                    + team_1_wins @ self.division_team_1_incidence
+                    + team_2_wins @ self.division_team_2_incidence
+                )
+                division_losses = (
+                    self.base_division_losses
+                    + team_2_wins @ self.division_team_1_incidence
+                    + team_1_wins @ self.division_team_2_incidence
+                )
+                division_ties = self.division_ties + matchup_ties @ np.abs(self.division_incidence)
+                division_points_for = (
+                    self.division_points_for
+                    + team_1_scores @ self.division_team_1_incidence
+                    + team_2_scores @ self.division_team_2_incidence
+                )
+            else:
+                added_division_wins = outcomes @ self.division_incidence + self.division_games_as_team_2
+                division_wins = self.base_division_wins + added_division_wins
+                division_losses = self.base_division_losses + (self.division_games - added_division_wins)
+                division_ties = self.division_ties
+                division_points_for = self.division_points_for
+            division_wins_with_points = division_wins + (division_points_for / 1000000)
+
+            division_winners = []
+            division_qualifiers = []
+            remaining_teams = []
+            for division_group in self.division_groups:
+                # np.lexsort sorts by the last key first, so the keys are the reverse of the group_by_division sort
+                # tuple and are negated to sort in descending order while preserving the original team order
+                sorted_division = division_group[np.lexsort((
+                    np.broadcast_to(-division_ties[..., division_group], (batch_size, len(division_group))),
+                    division_losses[:, division_group],
+                    -division_wins_with_points[:, division_group],
+                    np.broadcast_to(-ties[..., division_group], (batch_size, len(division_group))),
+                    losses[:, division_group],
+                    -wins_with_points[:, division_group]
+                ))]
+                division_winners.append(sorted_division[:, :1])
+                division_qualifiers.append(sorted_division[:, 1:self.num_division_qualifiers + 1])
+                remaining_teams.append(sorted_division[:, self.num_division_qualifiers + 1:])
+
+            division_winners = self._sort_by_wins_with_points(np.hstack(division_winners), wins_with_points)
+            division_qualifiers = self._sort_by_wins_with_points(np.hstack(division_qualifiers), wins_with_points)
+            remaining_teams = self._sort_by_wins_with_points(np.hstack(remaining_teams), wins_with_points)
+
+            num_division_winners = division_winners.shape[1]
+            seeded_teams = [division_winners]
+            if (num_division_winners < self.num_playoff_slots) and (division_qualifiers.shape[1] > 0):
+                if division_qualifiers.shape[1] <= (self.num_playoff_slots - num_division_winners):
+                    seeded_teams.append(division_qualifiers)
+                    tallies.division_qualifier_tally += np.bincount(
+                        division_qualifiers.ravel(), minlength=self.num_teams
+                    )
+                else:
+                    raise ValueError(
+                        f"Specified number of playoff qualifiers per division "
+                        f"({self.num_division_qualifiers + 1}) exceeds available "
+                        f"league playoff spots. Please correct the value of "
+                        f"\"NUM_PLAYOFF_SLOTS_PER_DIVISION\" in \".env\" file."
+                    )
+            seeded_teams.append(remaining_teams)
+            seeds = np.hstack(seeded_teams)[:, :self.num_playoff_slots]
+
+            tallies.division_leader_tally += np.bincount(division_winners.ravel(), minlength=self.num_teams)
+
+        else:
+            seeds = np.argsort(-wins_with_points, axis=1, kind="stable")[:, :self.num_playoff_slots]
+
+        # count how many times each team lands in each playoff seed
+        tallies.playoff_stats += np.bincount(
+            (seeds + (np.arange(seeds.shape[1]) * self.num_teams)).ravel(),
+            minlength=self.num_teams * self.num_playoff_slots
+        ).reshape(self.num_playoff_slots, self.num_teams).T
+        tallies.avg_wins[:seeds.shape[1]] += np.rint(np.take_along_axis(wins_with_points, seeds, axis=1)).sum(axis=0)
+
+        if self.num_bracket_rounds > 0 and seeds.shape[1] == self.num_playoff_slots:
+            self._simulate_bracket_batch(rng, seeds, tallies)
+
+        tallies.simulations += batch_size
+
+    def _simulate_bracket_batch(self, rng: np.random.Generator, seeds: np.ndarray,
+                                tallies: PlayoffSimulationTallies) -> None:
+        # (simulations x bracket positions) array of team indices, with -1 for a bye
+        bracket = np.where(
+            self.bracket_seed_ndxs >= 0, seeds[:, np.maximum(self.bracket_seed_ndxs, 0)], -1
+        )
+        tallies.bracket_stats[:, 0] += np.bincount(seeds.ravel(), minlength=self.num_teams)
+
+        for bracket_round in range(self.num_bracket_rounds):
+            team_1_ndxs = bracket[:, 0::2]
+            team_2_ndxs = bracket[:, 1::2]
+
+            # coin flips decide every playoff matchup unless the matchups are decided by resampled scores, in which case
+            # the coin flips only break tied scores
+            team_1_wins = rng.integers(0, 2, size=team_1_ndxs.shape).astype(bool)
+            if self.score_model:
+                team_1_scores = self._sample_scores(rng, np.maximum(team_1_ndxs, 0))
+                team_2_scores = self._sample_scores(rng, np.maximum(team_2_ndxs, 0))
+                team_1_wins = (team_1_scores > team_2_scores) | ((team_1_scores == team_2_scores) & team_1_wins)
+
+            # teams with a bye (no opponent) advance automatically
+            bracket = np.where(
+                team_2_ndxs < 0, team_1_ndxs, np.where(team_1_ndxs < 0, team_2_ndxs,
+                                                       np.where(team_1_wins, team_1_ndxs, team_2_ndxs))
+            )
+
+            advanced = bracket[bracket >= 0]
+            tallies.bracket_stats[:, bracket_round + 1] += np.bincount(advanced, minlength=self.num_teams)
+
+    def _sample_scores(self, rng: np.random.Generator, team_ndxs: np.ndarray) -> np.ndarray:
+        return self.weekly_points[team_ndxs, rng.integers(0, self.num_weekly_points[team_ndxs])]
+
+    @staticmethod
+    def _sort_by_wins_with_points(team_ndxs: np.ndarray, wins_with_points: np.ndarray) -> np.ndarray:
+        # stable descending sort of each simulation's candidate teams by wins (with points for as the tiebreaker)
+        candidate_wins_with_points = np.take_along_axis(wins_with_points, team_ndxs, axis=1)
+        return np.take_along_axis(team_ndxs, np.argsort(-candidate_wins_with_points, axis=1, kind="stable"), axis=1)
+
+
+def simulate_playoff_shard(simulator: VectorizedPlayoffSimulator, seed_sequence: np.random.SeedSequence,
+                           simulations: int) -> PlayoffSimulationTallies:
+    """Run one shard of the playoff simulations with its own independent random number generator stream. Defined at
+    module level so it can be pickled and sent to worker processes.
+    """
+    return simulator.simulate(np.random.default_rng(seed_sequence), simulations)
+
+
+def simulate_playoff_scenarios_shard(simulator: VectorizedPlayoffSimulator, seed_sequence: np.random.SeedSequence,
+                                     simulations: int, forced_outcomes: np.ndarray) -> List[PlayoffSimulationTallies]:
+    """Run one shard of the what-if playoff scenario simulations. Defined at module level so it can be pickled and sent
+    to worker processes.
+    """
+    return simulator.simulate_scenarios(np.random.default_rng(seed_sequence), simulations, forced_outcomes)
 
 
 class PlayoffProbabilities(object):
 
     def __init__(self, simulations: int, num_weeks: int, num_playoff_slots: int, data_dir: Path, num_divisions: int = 0,
-                 save_data: bool = False, recalculate: bool = False, offline: bool = False):
+                 save_data: bool = False, recalculate: bool = False, offline: bool = False, engine: str = None,
+                 seed: int = None, workers: int = None, convergence: bool = None, model: str = None,
+                 bracket: bool = None):
         logger.debug("Initializing playoff probabilities.")
 
         self.simulations: int = simulations or settings.num_playoff_simulations
+        self.engine: str = engine or settings.playoff_simulation_engine
+        self.model: str = model or settings.playoff_simulation_model
+        self.seed: Optional[int] = seed if seed is not None else settings.playoff_simulation_seed
+        self.workers: int = workers or settings.playoff_simulation_workers
+        self.convergence: bool = (
+            convergence if convergence is not None else settings.playoff_simulation_convergence_bool
+        )
+        self.bracket: bool = bracket if bracket is not None else settings.playoff_simulation_bracket_bool
+        self.convergence_tolerance: float = settings.playoff_simulation_convergence_tolerance
+        self.min_simulations: int = min(settings.playoff_simulation_convergence_min_simulations, self.simulations)
+        self.simulations_run: int = 0
+        self.confidence_interval_width: Optional[float] = None
 
         self.num_weeks: int = num_weeks
         self.num_playoff_slots: int = int(num_playoff_slots)
@@ -118,168 +597,65 @@ class PlayoffProbabilities(object):
         self.save_data: bool = save_data
         self.recalculate: bool = recalculate
         self.offline: bool = offline
+        self.cache: bool = settings.playoff_simulation_cache_bool
+        self.cache_dir: Path = Path(self.data_dir) / "playoff_probs_cache"
         self.playoff_probs_data: Dict[str, List[Any]] = {}
 
     def calculate(self, week: int, week_for_report: int, standings: List[BaseTeam],
-                  remaining_matchups: Dict[str, List[Tuple[BaseMatchup]]]) -> Union[None, Dict[str, List[Any]]]:
+                  remaining_matchups: Dict[str, List[Tuple[BaseMatchup]]],
+                  team_weekly_points: Dict[str, List[float]] = None) -> Union[None, Dict[str, List[Any]]]:
         logger.debug("Calculating playoff probabilities.")
 
+        if self.bracket and self.engine != "vectorized":
+            logger.warning(
+                "Playoff bracket simulations are only supported by the vectorized playoff simulation engine. "
+                "Skipping playoff bracket simulations."
+            )
+
+        team_weekly_points = self._get_team_weekly_points_for_model(standings, team_weekly_points, self.engine)
+
         # with open("playoff_prob_standings.json", "w") as pps:
         #     json.dump(standings, pps, indent=2)
         #
         # with open("playoff_prob_remaining_matchups.json", "w") as pprm:
         #     json.dump(remaining_matchups, pprm, indent=2)
 
-        teams_for_playoff_probs = {}
-        for team in standings:
-            # noinspection PyTypeChecker,PyUnresolvedReferences
-            teams_for_playoff_probs[team.team_id] = TeamWithPlayoffProbs(
-                team.team_id,
-                team.name,
-                team.manager_str,
-                int(team.record.get_wins()),
-                int(team.record.get_losses()),
-                int(team.record.get_ties()),
-                float(team.record.get_points_for()),
-                self.num_playoff_slots,
-                self.simulations,
-                team.division,
-                int(team.record.get_division_wins()),
-                int(team.record.get_division_losses()),
-                int(team.record.get_division_ties()),
-                float(team.record.get_division_points_for())
-            )
+        teams_for_playoff_probs = self._get_teams_for_playoff_probs(standings)
 
         try:
             if week == week_for_report:
-                if self.recalculate:
+                cache_file_path = None
+                if self.cache:
+                    cache_key = self.get_cache_key(teams_for_playoff_probs, remaining_matchups, team_weekly_points)
+                    cache_file_path = self.cache_dir / f"{cache_key}.json"
+                    logger.debug(f"Playoff simulation cache key: {cache_key}")
+
+                if cache_file_path and cache_file_path.exists():
                     logger.info(
-                        f"Running {self.simulations:,} Monte Carlo playoff "
-                        f"simulation{'s' if self.simulations > 1 else ''}..."
+                        "Using cached Monte Carlo playoff simulations for playoff probabilities (standings, remaining "
+                        "schedule, and playoff simulation settings are unchanged)."
                     )
 
-                    begin = datetime.datetime.now()
-                    avg_wins = [0.0] * self.num_playoff_slots
-                    sim_count = 1
-                    while sim_count <= self.simulations:
-                        # create random binary results representing the rest of the season matchups and add them to the
-                        # existing wins
-                        for wk, matchups in remaining_matchups.items():
-                            for matchup in matchups:
-                                team_1 = teams_for_playoff_probs[matchup[0]]
-                                team_2 = teams_for_playoff_probs[matchup[1]]
-                                result = int(random.getrandbits(1))
-                                if result == 1:
-                                    team_1.add_win()
-                                    team_2.add_loss()
-                                    if self.num_divisions > 0:
-                                        if team_1.division and team_2.division and team_1.division == team_2.division:
-                                            team_1.add_division_win()
-                                            team_2.add_division_loss()
-                                else:
-                                    team_2.add_win()
-                                    team_1.add_loss()
-                                    if self.num_divisions > 0:
-                                        if team_1.division and team_2.division and team_1.division == team_2.division:
-                                            team_2.add_division_win()
-                                            team_1.add_division_loss()
-
-                        if self.num_divisions > 0:
-                            sorted_divisions = self.group_by_division(teams_for_playoff_probs)
-
-                            num_playoff_slots_per_division_without_leader = settings.num_playoff_slots_per_division - 1
-
-                            # pick the teams making the playoffs
-                            division_winners = []
-                            division_qualifiers = []
-                            remaining_teams = []
-                            for division in sorted_divisions.values():
-                                division_winners.append(division[0])
-
-                                div_qualifiers_count = deepcopy(num_playoff_slots_per_division_without_leader)
-                                for remaining_team in division[1:]:
-                                    if div_qualifiers_count > 0:
-                                        division_qualifiers.append(remaining_team)
-                                    else:
-                                        remaining_teams.append(remaining_team)
-                                    div_qualifiers_count -= 1
-
-                            division_winners = sorted(
-                                division_winners, key=lambda x: x.get_wins_with_points(), reverse=True)
-                            division_qualifiers = sorted(
-                                division_qualifiers, key=lambda x: x.get_wins_with_points(), reverse=True)
-                            remaining_teams = sorted(
-                                remaining_teams, key=lambda x: x.get_wins_with_points(), reverse=True)
-
-                            playoff_count = 1
-                            for team in division_winners:
-                                teams_for_playoff_probs[division_winners[playoff_count - 1].team_id].add_playoff_tally()
-                                avg_wins[playoff_count - 1] += \
-                                    round(division_winners[playoff_count - 1].get_wins_with_points(), 0)
-                                teams_for_playoff_probs[team.team_id].add_playoff_stats(playoff_count)
-                                teams_for_playoff_probs[team.team_id].add_division_leader_tally()
-                                playoff_count += 1
-
-                            if (len(division_winners) < self.num_playoff_slots) and (len(division_qualifiers) > 0):
-                                if len(division_qualifiers) <= (self.num_playoff_slots - len(division_winners)):
-                                    remaining_playoff_count = 1
-                                    for division_qualifier_count in range(1, len(division_qualifiers) + 1):
-                                        teams_for_playoff_probs[division_qualifiers[
-                                            remaining_playoff_count - 1].team_id].add_playoff_tally()
-                                        avg_wins[
-                                            len(division_winners) + remaining_playoff_count - 1] += \
-                                            round(division_qualifiers[
-                                                      remaining_playoff_count - 1].get_wins_with_points(), 0)
-                                        teams_for_playoff_probs[
-                                            division_qualifiers[remaining_playoff_count - 1].team_id].add_playoff_stats(
-                                            len(division_winners) + remaining_playoff_count)
-                                        teams_for_playoff_probs[
-                                            division_qualifiers[
-                                                remaining_playoff_count - 1].team_id].add_division_qualifier_tally()
-                                        remaining_playoff_count += 1
-                                else:
-                                    raise ValueError(
-                                        f"Specified number of playoff qualifiers per division "
-                                        f"({num_playoff_slots_per_division_without_leader + 1}) exceeds available "
-                                        f"league playoff spots. Please correct the value of "
-                                        f"\"NUM_PLAYOFF_SLOTS_PER_DIVISION\" in \".env\" file."
-                                    )
-
-                            if (len(division_winners) + len(division_qualifiers)) < self.num_playoff_slots:
-                                remaining_playoff_count = 1
-                                while remaining_playoff_count <= \
-                                        (self.num_playoff_slots - len(division_winners) - len(division_qualifiers)):
-                                    teams_for_playoff_probs[remaining_teams[
-                                        remaining_playoff_count - 1].team_id].add_playoff_tally()
-                                    avg_wins[len(division_winners) + len(division_qualifiers) +
-                                             remaining_playoff_count - 1] += \
-                                        round(remaining_teams[remaining_playoff_count - 1].get_wins_with_points(), 0)
-                                    teams_for_playoff_probs[
-                                        remaining_teams[remaining_playoff_count - 1].team_id].add_playoff_stats(
-                                        len(division_winners) + len(division_qualifiers) + remaining_playoff_count)
-                                    remaining_playoff_count += 1
-
-                        else:
-                            # sort the teams
-                            sorted_teams = sorted(
-                                teams_for_playoff_probs.values(), key=lambda x: x.get_wins_with_points(), reverse=True
-                            )
+                    with open(cache_file_path, "r") as pp_cache_in:
+                        self.playoff_probs_data = json.load(pp_cache_in)
 
-                            # pick the teams making the playoffs
-                            playoff_count = 1
-                            while playoff_count <= self.num_playoff_slots:
-                                teams_for_playoff_probs[sorted_teams[playoff_count - 1].team_id].add_playoff_tally()
-                                avg_wins[playoff_count - 1] += \
-                                    round(sorted_teams[playoff_count - 1].get_wins_with_points(), 0)
-                                teams_for_playoff_probs[sorted_teams[playoff_count - 1].team_id].add_playoff_stats(
-                                    playoff_count)
-                                playoff_count += 1
+                    if self.save_data:
+                        self._save_playoff_probs_data(week_for_report)
 
-                        team: TeamWithPlayoffProbs
-                        for team in teams_for_playoff_probs.values():
-                            team.reset_to_base_record()
+                elif self.recalculate:
+                    logger.info(
+                        f"Running {'up to ' if self.convergence and self.engine == 'vectorized' else ''}"
+                        f"{self.simulations:,} Monte Carlo playoff simulation{'s' if self.simulations > 1 else ''}..."
+                    )
 
-                        sim_count += 1
+                    begin = datetime.datetime.now()
+                    if self.engine == "vectorized":
+                        avg_wins = self._run_vectorized_simulations(
+                            teams_for_playoff_probs, remaining_matchups, team_weekly_points
+                        )
+                    else:
+                        avg_wins = self._run_simulations(teams_for_playoff_probs, remaining_matchups)
+                        self.simulations_run = self.simulations
 
                     modified_team_names = {team_id: "" for team_id in teams_for_playoff_probs.keys()}
                     if self.num_divisions > 0:
@@ -310,7 +686,7 @@ class PlayoffProbabilities(object):
 
                     team: TeamWithPlayoffProbs
                     for team in teams_for_playoff_probs.values():
-                        playoff_min_wins = round((avg_wins[self.num_playoff_slots - 1]) / self.simulations, 2)
+                        playoff_min_wins = round((avg_wins[self.num_playoff_slots - 1]) / self.simulations_run, 2)
                         if playoff_min_wins > team.wins:
                             needed_wins = np.rint(playoff_min_wins - team.wins)
                         else:
@@ -324,22 +700,38 @@ class PlayoffProbabilities(object):
                             # add value for if team was predicted division winner to pass to the later sort function
                             team.is_predicted_division_leader,
                             # add value for if team was predicted division qualifier to pass to the later sort function
-                            team.is_predicted_division_qualifier
+                            team.is_predicted_division_qualifier,
+                            # add odds of reaching each playoff round (the last of which is winning the championship)
+                            team.get_bracket_stats()
                         ]
 
+                        if team.bracket_stats:
+                            logger.debug(
+                                f"{team.name} playoff round odds: {team.get_bracket_stats()[:-1]}, "
+                                f"championship odds: {team.get_bracket_stats()[-1]:.2f}%"
+                            )
+
+                    precision_str = ""
+                    if self.confidence_interval_width is not None:
+                        precision_str = (
+                            f" with a maximum playoff chance {CONVERGENCE_CONFIDENCE_LEVEL}% confidence interval width "
+                            f"of {self.confidence_interval_width:.2f}% (tolerance: {self.convergence_tolerance:.2f}%)"
+                        )
+
                     delta = datetime.datetime.now() - begin
                     logger.info(
-                        f"...ran {self.simulations:,} playoff simulation{'s' if self.simulations > 1 else ''} "
-                        f"in {str(delta)}"
+                        f"...ran {self.simulations_run:,} playoff simulation{'s' if self.simulations_run > 1 else ''} "
+                        f"in {str(delta)}{precision_str}"
                     )
 
                     if self.save_data:
-                        save_dir = Path(self.data_dir) / f"week_{week_for_report}"
-                        if not Path(save_dir).exists():
-                            os.makedirs(save_dir)
+                        self._save_playoff_probs_data(week_for_report)
 
-                        with open(Path(save_dir) / "playoff_probs_data.json", "w") as pp_out:
-                            json.dump(self.playoff_probs_data, pp_out, ensure_ascii=False, indent=2)
+                    if cache_file_path:
+                        # cached playoff probabilities are written atomically so that concurrent or interrupted runs
+                        # never leave a partially written cache file to be loaded as a cache hit
+                        with open_for_atomic_write(cache_file_path) as pp_cache_out:
+                            json.dump(self.playoff_probs_data, pp_cache_out, ensure_ascii=False, indent=2)
 
                 else:
                     logger.info("Using saved Monte Carlo playoff simulations for playoff probabilities.")
@@ -367,6 +759,415 @@ class PlayoffProbabilities(object):
             logger.error(f"COULDN'T CALCULATE PLAYOFF PROBS WITH EXCEPTION: {e}\n{traceback.format_exc()}")
             return None
 
+    def calculate_scenarios(self, standings: List[BaseTeam], remaining_matchups: Dict[str, List[Tuple[str, str]]],
+                            scenarios: Dict[str, List[Tuple[str, str, Optional[int]]]],
+                            team_weekly_points: Dict[str, List[float]] = None) -> Dict[str, Dict[str, float]]:
+        """Calculate the playoff chances of every team for a batch of "what-if" scenarios in one simulation pass.
+
+        Each scenario is a list of (team ID or team name, "W" or "L", week) constraints forcing the outcome of that
+        team's remaining matchup in the given week, or in every remaining week when the week is None (e.g. a team
+        winning out). A baseline scenario without any forced outcomes is always included first. Scenarios are always
+        simulated with the vectorized playoff simulation engine.
+
+        Returns:
+            dict[str, dict[str, float]]: dictionary of scenario names to dictionaries of team IDs to playoff chances
+        """
+        logger.debug("Calculating playoff probabilities for what-if scenarios.")
+
+        team_weekly_points = self._get_team_weekly_points_for_model(standings, team_weekly_points, "vectorized")
+        teams: List[TeamWithPlayoffProbs] = list(self._get_teams_for_playoff_probs(standings).values())
+        matchups_with_weeks = [
+            (int(week), matchup) for week, matchups in remaining_matchups.items() for matchup in matchups
+        ]
+
+        scenario_names = [PLAYOFF_SCENARIO_BASELINE] + list(scenarios.keys())
+        forced_outcomes = np.full((len(scenario_names), len(matchups_with_weeks)), -1, dtype=np.int64)
+        for scenario_ndx, scenario_constraints in enumerate(scenarios.values(), start=1):
+            forced_outcomes[scenario_ndx] = self._get_forced_outcomes(teams, matchups_with_weeks, scenario_constraints)
+
+        simulator = VectorizedPlayoffSimulator(
+            teams,
+            [matchup for _, matchup in matchups_with_weeks],
+            self.num_playoff_slots,
+            num_divisions=self.num_divisions,
+            num_playoff_slots_per_division=settings.num_playoff_slots_per_division,
+            team_weekly_points=(
+                [team_weekly_points[team.team_id] for team in teams] if team_weekly_points else None
+            ),
+            simulate_bracket=self.bracket
+        )
+
+        logger.info(
+            f"Running {self.simulations:,} Monte Carlo playoff simulation{'s' if self.simulations > 1 else ''} for "
+            f"{len(scenario_names):,} what-if scenarios..."
+        )
+        begin = datetime.datetime.now()
+
+        num_shards = max(min(self.workers, self.simulations), 1)
+        shard_seed_sequences = np.random.SeedSequence(self.seed).spawn(num_shards)
+        shard_simulations = [
+            (self.simulations // num_shards) + (1 if shard_ndx < (self.simulations % num_shards) else 0)
+            for shard_ndx in range(num_shards)
+        ]
+        if num_shards > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                shard_scenario_tallies = list(executor.map(
+                    simulate_playoff_scenarios_shard,
+                    [simulator] * num_shards,
+                    shard_seed_sequences,
+                    shard_simulations,
+                    [forced_outcomes] * num_shards
+                ))
+        else:
+            shard_scenario_tallies = [simulate_playoff_scenarios_shard(
+                simulator, shard_seed_sequences[0], shard_simulations[0], forced_outcomes
+            )]
+
+        scenario_playoff_chances = {}
+        for scenario_ndx, scenario_name in enumerate(scenario_names):
+            tallies = PlayoffSimulationTallies(len(teams), self.num_playoff_slots, simulator.num_bracket_rounds)
+            for scenario_tallies in shard_scenario_tallies:
+                tallies.merge(scenario_tallies[scenario_ndx])
+            tallies.apply_to_teams(teams)
+            scenario_playoff_chances[scenario_name] = {
+                team.team_id: team.get_playoff_chance_percentage() for team in teams
+            }
+
+        delta = datetime.datetime.now() - begin
+        logger.info(f"...ran what-if playoff scenario simulations in {str(delta)}")
+
+        return scenario_playoff_chances
+
+    @staticmethod
+    def parse_scenario(scenario_str: str) -> Tuple[str, List[Tuple[str, str, Optional[int]]]]:
+        """Parse a what-if scenario string formatted as "[NAME=]TEAM:W|L[:WEEK][,TEAM:W|L[:WEEK]...]", where TEAM is a
+        team ID or team name and omitting WEEK applies the outcome to every remaining week.
+        """
+        if "=" in scenario_str:
+            scenario_name, constraints_str = scenario_str.split("=", 1)
+        else:
+            scenario_name, constraints_str = scenario_str, scenario_str
+
+        scenario_constraints = []
+        for constraint_str in constraints_str.split(","):
+            constraint_parts = [part.strip() for part in constraint_str.split(":")]
+            if len(constraint_parts) not in (2, 3) or constraint_parts[1].upper() not in ("W", "L"):
+                raise ValueError(
+                    f"Invalid what-if playoff scenario constraint \"{constraint_str}\". Constraints must be formatted "
+                    f"as TEAM:W or TEAM:L with an optional :WEEK suffix."
+                )
+            scenario_constraints.append((
+                constraint_parts[0],
+                constraint_parts[1].upper(),
+                int(constraint_parts[2]) if len(constraint_parts) == 3 else None
+            ))
+
+        return scenario_name.strip(), scenario_constraints
+
+    @staticmethod
+    def _get_forced_outcomes(teams: List[TeamWithPlayoffProbs], matchups_with_weeks: List[Tuple[int, Tuple[str, str]]],
+                             scenario_constraints: List[Tuple[str, str, Optional[int]]]) -> np.ndarray:
+        forced_outcomes = np.full(len(matchups_with_weeks), -1, dtype=np.int64)
+        for team_key, result, week in scenario_constraints:
+            team_id = next(
+                (team.team_id for team in teams
+                 if str(team.team_id) == str(team_key) or str(team.name).lower() == str(team_key).lower()),
+                None
+            )
+            if team_id is None:
+                raise ValueError(f"What-if playoff scenario team \"{team_key}\" does not exist in the league.")
+
+            constrained_matchup_count = 0
+            for matchup_ndx, (matchup_week, matchup) in enumerate(matchups_with_weeks):
+                if team_id in matchup and (week is None or matchup_week == week):
+                    team_1_wins = int((matchup[0] == team_id) == (result == "W"))
+                    if forced_outcomes[matchup_ndx] not in (-1, team_1_wins):
+                        raise ValueError(
+                            f"What-if playoff scenario constraints conflict for the week {matchup_week} matchup "
+                            f"between teams {matchup[0]} and {matchup[1]}."
+                        )
+                    forced_outcomes[matchup_ndx] = team_1_wins
+                    constrained_matchup_count += 1
+
+            if constrained_matchup_count == 0:
+                raise ValueError(
+                    f"What-if playoff scenario team \"{team_key}\" has no remaining matchup"
+                    f"{f' in week {week}' if week is not None else 's'}."
+                )
+
+        return forced_outcomes
+
+    def _get_teams_for_playoff_probs(self, standings: List[BaseTeam]) -> Dict[str, TeamWithPlayoffProbs]:
+        teams_for_playoff_probs = {}
+        for team in standings:
+            # noinspection PyTypeChecker,PyUnresolvedReferences
+            teams_for_playoff_probs[team.team_id] = TeamWithPlayoffProbs(
+                team.team_id,
+                team.name,
+                team.manager_str,
+                int(team.record.get_wins()),
+                int(team.record.get_losses()),
+                int(team.record.get_ties()),
+                float(team.record.get_points_for()),
+                self.num_playoff_slots,
+                self.simulations,
+                team.division,
+                int(team.record.get_division_wins()),
+                int(team.record.get_division_losses()),
+                int(team.record.get_division_ties()),
+                float(team.record.get_division_points_for())
+            )
+
+        return teams_for_playoff_probs
+
+    def _get_team_weekly_points_for_model(self, standings: List[BaseTeam], team_weekly_points: Dict[str, List[float]],
+                                          engine: str) -> Optional[Dict[str, List[float]]]:
+        if self.model == "scores":
+            if engine != "vectorized":
+                logger.warning(
+                    "The scores playoff simulation model is only supported by the vectorized playoff simulation "
+                    "engine. Defaulting to coin flip playoff simulations."
+                )
+                return None
+            elif not team_weekly_points or not all(team_weekly_points.get(team.team_id) for team in standings):
+                logger.warning(
+                    "Weekly points are not available for every team. Defaulting to coin flip playoff simulations."
+                )
+                return None
+            return team_weekly_points
+        else:
+            return None
+
+    def get_cache_key(self, teams_for_playoff_probs: Dict[str, TeamWithPlayoffProbs],
+                      remaining_matchups: Dict[str, List[Tuple[str, str]]],
+                      team_weekly_points: Dict[str, List[float]] = None) -> str:
+        """Create a stable hash of every input that affects the calculated playoff probabilities.
+        """
+        cache_key_inputs = {
+            "version": PLAYOFF_SIMULATION_CACHE_VERSION,
+            "teams": [
+                [
+                    str(team.team_id),
+                    team.name,
+                    team.wins,
+                    team.losses,
+                    team.ties,
+                    round(team.points_for, 2),
+                    str(team.division),
+                    team.division_wins,
+                    team.division_losses,
+                    team.division_ties,
+                    round(team.division_points_for, 2)
+                ] for team in sorted(teams_for_playoff_probs.values(), key=lambda x: str(x.team_id))
+            ],
+            # matchup order is preserved because it determines the random draws used by seeded simulations
+            "remaining_matchups": [
+                [str(week), [[str(team_id) for team_id in matchup] for matchup in matchups]]
+                for week, matchups in remaining_matchups.items()
+            ],
+            "num_playoff_slots": self.num_playoff_slots,
+            "num_divisions": self.num_divisions,
+            "num_playoff_slots_per_division": settings.num_playoff_slots_per_division,
+            "simulations": self.simulations,
+            "engine": self.engine,
+            "seed": self.seed,
+            "workers": self.workers,
+            "convergence": self.convergence,
+            "convergence_tolerance": self.convergence_tolerance,
+            "convergence_min_simulations": self.min_simulations,
+            "bracket": self.bracket and self.engine == "vectorized",
+            "team_weekly_points": [
+                [str(team_id), [round(points, 2) for points in team_weekly_points[team_id]]]
+                for team_id in sorted(team_weekly_points.keys(), key=str)
+            ] if team_weekly_points else None
+        }
+
+        return hashlib.sha256(
+            json.dumps(cache_key_inputs, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        ).hexdigest()
+
+    def _save_playoff_probs_data(self, week_for_report: int) -> None:
+        save_dir = Path(self.data_dir) / f"week_{week_for_report}"
+
+        with open_for_atomic_write(Path(save_dir) / "playoff_probs_data.json") as pp_out:
+            json.dump(self.playoff_probs_data, pp_out, ensure_ascii=False, indent=2)
+
+    def _run_simulations(self, teams_for_playoff_probs: Dict[str, TeamWithPlayoffProbs],
+                         remaining_matchups: Dict[str, List[Tuple[str, str]]]) -> List[float]:
+        teams: List[TeamWithPlayoffProbs] = list(teams_for_playoff_probs.values())
+        team_state = PlayoffSimulationTeamState(
+            teams,
+            [matchup for matchups in remaining_matchups.values() for matchup in matchups],
+            num_divisions=self.num_divisions
+        )
+        tallies = PlayoffSimulationTallies(len(teams), self.num_playoff_slots)
+
+        num_matchups = len(team_state.matchup_team_ndxs)
+        num_playoff_slots_per_division_without_leader = settings.num_playoff_slots_per_division - 1
+        sim_count = 1
+        while sim_count <= self.simulations:
+            # create random binary results representing the rest of the season matchups and add them to the
+            # existing wins
+            results = random.getrandbits(num_matchups)
+            team_1_wins = np.unpackbits(
+                np.frombuffer(results.to_bytes((num_matchups + 7) // 8, "little"), dtype=np.uint8),
+                count=num_matchups,
+                bitorder="little"
+            ).astype(np.int64)
+            team_state.add_results(team_1_wins)
+
+            wins_with_points = team_state.get_wins_with_points()
+
+            if self.num_divisions > 0:
+                # sort keys of every team in the same order as the group_by_division sort tuple, converted to lists
+                # once per simulation because sorting the small divisions in Python is faster than with NumPy
+                sort_keys = list(zip(
+                    wins_with_points.tolist(),
+                    (-team_state.record[team_state.LOSSES]).tolist(),
+                    team_state.ties.tolist(),
+                    team_state.get_division_wins_with_points().tolist(),
+                    (-team_state.record[team_state.DIVISION_LOSSES]).tolist(),
+                    team_state.division_ties.tolist()
+                ))
+
+                # pick the teams making the playoffs
+                division_winners = []
+                division_qualifiers = []
+                remaining_teams = []
+                for division_ndxs in team_state.division_ndxs:
+                    sorted_division = sorted(division_ndxs, key=sort_keys.__getitem__, reverse=True)
+                    division_winners.extend(sorted_division[:1])
+                    division_qualifiers.extend(sorted_division[1:num_playoff_slots_per_division_without_leader + 1])
+                    remaining_teams.extend(sorted_division[num_playoff_slots_per_division_without_leader + 1:])
+
+                division_winners = self._sort_by_wins_with_points(division_winners, sort_keys)
+                division_qualifiers = self._sort_by_wins_with_points(division_qualifiers, sort_keys)
+                remaining_teams = self._sort_by_wins_with_points(remaining_teams, sort_keys)
+
+                seeded_teams = [division_winners]
+                tallies.division_leader_tally[division_winners] += 1
+
+                if (len(division_winners) < self.num_playoff_slots) and (len(division_qualifiers) > 0):
+                    if len(division_qualifiers) <= (self.num_playoff_slots - len(division_winners)):
+                        seeded_teams.append(division_qualifiers)
+                        tallies.division_qualifier_tally[division_qualifiers] += 1
+                    else:
+                        raise ValueError(
+                            f"Specified number of playoff qualifiers per division "
+                            f"({num_playoff_slots_per_division_without_leader + 1}) exceeds available "
+                            f"league playoff spots. Please correct the value of "
+                            f"\"NUM_PLAYOFF_SLOTS_PER_DIVISION\" in \".env\" file."
+                        )
+                seeded_teams.append(remaining_teams)
+                seeds = np.array(
+                    list(itertools.chain.from_iterable(seeded_teams))[:self.num_playoff_slots], dtype=np.intp
+                )
+
+            else:
+                # sort the teams
+                seeds = np.argsort(-wins_with_points, kind="stable")[:self.num_playoff_slots]
+
+            # tally the teams making the playoffs
+            tallies.playoff_stats[seeds, np.arange(len(seeds))] += 1
+            tallies.avg_wins[:len(seeds)] += np.rint(wins_with_points[seeds])
+            tallies.simulations += 1
+
+            team_state.reset()
+
+            sim_count += 1
+
+        return tallies.apply_to_teams(teams)
+
+    @staticmethod
+    def _sort_by_wins_with_points(team_ndxs: List[int], sort_keys: List[Tuple[float, ...]]) -> List[int]:
+        # stable descending sort of the candidate teams by wins (with points for as the tiebreaker)
+        return sorted(team_ndxs, key=lambda x: sort_keys[x][0], reverse=True)
+
+    def _run_vectorized_simulations(self, teams_for_playoff_probs: Dict[str, TeamWithPlayoffProbs],
+                                    remaining_matchups: Dict[str, List[Tuple[str, str]]],
+                                    team_weekly_points: Dict[str, List[float]] = None) -> List[float]:
+        teams: List[TeamWithPlayoffProbs] = list(teams_for_playoff_probs.values())
+
+        simulator = VectorizedPlayoffSimulator(
+            teams,
+            [matchup for matchups in remaining_matchups.values() for matchup in matchups],
+            self.num_playoff_slots,
+            num_divisions=self.num_divisions,
+            num_playoff_slots_per_division=settings.num_playoff_slots_per_division,
+            team_weekly_points=(
+                [team_weekly_points[team.team_id] for team in teams] if team_weekly_points else None
+            ),
+            simulate_bracket=self.bracket
+        )
+
+        # derive one independent random number generator stream per shard from the configured seed so that results are
+        # reproducible for a given seed and number of workers
+        seed_sequence = np.random.SeedSequence(self.seed)
+        logger.debug(f"Running playoff simulations with seed: {seed_sequence.entropy}")
+
+        executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        try:
+            tallies = PlayoffSimulationTallies(len(teams), self.num_playoff_slots, simulator.num_bracket_rounds)
+            while tallies.simulations < self.simulations:
+                if self.convergence:
+                    # run the simulations in batches of the minimum simulation count until every team's playoff chance
+                    # is precise enough or the maximum simulation count is reached
+                    batch_simulations = min(self.min_simulations, self.simulations - tallies.simulations)
+                else:
+                    batch_simulations = self.simulations
+
+                tallies.merge(self._run_simulation_shards(simulator, seed_sequence, batch_simulations, executor))
+
+                if self.convergence:
+                    self.confidence_interval_width = tallies.get_max_playoff_confidence_interval_width()
+                    logger.debug(
+                        f"Ran {tallies.simulations:,} playoff simulations with a maximum playoff chance confidence "
+                        f"interval width of {self.confidence_interval_width:.2f}%."
+                    )
+                    if (tallies.simulations >= self.min_simulations
+                            and self.confidence_interval_width <= self.convergence_tolerance):
+                        break
+        finally:
+            if executor:
+                executor.shutdown()
+
+        self.simulations_run = tallies.simulations
+
+        return tallies.apply_to_teams(teams)
+
+    def _run_simulation_shards(self, simulator: VectorizedPlayoffSimulator, seed_sequence: np.random.SeedSequence,
+                               simulations: int, executor: Optional[ProcessPoolExecutor]) -> PlayoffSimulationTallies:
+
+        num_shards = max(min(self.workers, simulations), 1)
+        shard_seed_sequences = seed_sequence.spawn(num_shards)
+        shard_simulations = [
+            (simulations // num_shards) + (1 if shard_ndx < (simulations % num_shards) else 0)
+            for shard_ndx in range(num_shards)
+        ]
+
+        if executor and num_shards > 1:
+            logger.debug(f"Splitting playoff simulations into {num_shards} shards: {shard_simulations}")
+            shard_tallies = list(executor.map(
+                simulate_playoff_shard,
+                [simulator] * num_shards,
+                shard_seed_sequences,
+                shard_simulations
+            ))
+        else:
+            shard_tallies = [
+                simulate_playoff_shard(simulator, shard_seed_sequence, shard_sims)
+                for shard_seed_sequence, shard_sims in zip(shard_seed_sequences, shard_simulations)
+            ]
+
+        # merge shard tallies in shard order so results are identical regardless of shard completion order
+        tallies = PlayoffSimulationTallies(
+            simulator.num_teams, simulator.num_playoff_slots, simulator.num_bracket_rounds
+        )
+        for shard_tally in shard_tallies:
+            tallies.merge(shard_tally)
+
+        return tallies
+
     def group_by_division(
             self, teams_for_playoff_probs: Dict[str, TeamWithPlayoffProbs]
     ) -> Dict[str, List[TeamWithPlayoffProbs]]:
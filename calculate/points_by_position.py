@@ -14,11 +14,15 @@ class PointsByPosition(object):
     def __init__(self, league: BaseLeague, week_for_report: int):
         logger.debug("Initializing points by position.")
 
+        self.league: BaseLeague = league
         self.week_for_report: int = week_for_report
         self.roster_slot_counts: Dict[str, int] = {k: v for k, v in league.roster_position_counts.items() if v != 0}
         self.bench_positions: List[str] = league.bench_positions
         self.flex_positions_dict: Dict[str, List[str]] = league.get_flex_positions_dict()
         self.flex_types: List[str] = list(self.flex_positions_dict.keys())
+        self.bench_positions_mask: int = league.get_positions_mask(self.bench_positions)
+        # bitmask of the primary positions counted towards each roster slot position (the position and its flex members)
+        self.position_masks: Dict[str, int] = {}
 
     @staticmethod
     def calculate_points_by_position_season_averages(
@@ -44,13 +48,23 @@ class PointsByPosition(object):
 
         return season_average_points_by_position_dict
 
+    def _get_position_mask(self, position: str) -> int:
+        position_mask = self.position_masks.get(position)
+        if position_mask is None:
+            position_mask = self.league.get_positions_mask([position] + self.flex_positions_dict.get(position, []))
+            self.position_masks[position] = position_mask
+        return position_mask
+
+    def _is_starter(self, player: BasePlayer) -> bool:
+        return not self.league.roster_slot_bits.get(player.selected_position, 0) & self.bench_positions_mask
+
     def _get_points_for_position(self, players: List[BasePlayer], position: str) -> float:
+        position_mask = self._get_position_mask(position)
         total_points_by_position = 0
         player: BasePlayer
         for player in players:
-            if ((position == player.primary_position
-                 or (player.primary_position in self.flex_positions_dict.get(position, [])))
-                    and player.selected_position not in self.bench_positions):
+            primary_position_bit = self.league.roster_slot_bits.get(player.primary_position, 0)
+            if primary_position_bit & position_mask and self._is_starter(player):
                 total_points_by_position += float(player.points)
 
         return total_points_by_position
@@ -59,7 +73,7 @@ class PointsByPosition(object):
         logger.debug(f"Calculating points by position for team \"{team_name}\".")
 
         player_points_by_position = []
-        starting_players = [p for p in roster if p.selected_position not in self.bench_positions]
+        starting_players = [p for p in roster if self._is_starter(p)]
         for slot in list(self.roster_slot_counts.keys()):
             if slot not in self.bench_positions and slot not in self.flex_types:
                 player_points_by_position.append([slot, self._get_points_for_position(starting_players, slot)])
@@ -0,0 +1,233 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "uberfastman@uberfastman.dev"
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+from dao.base import BaseRecord, BaseTeam
+from utilities.logger import get_logger
+from utilities.utils import open_for_atomic_write
+
+logger = get_logger(__name__, propagate=False)
+
+# version of the persisted records state format, which must be incremented whenever a change to the records engine
+# would produce different records from the same matchups so that stale persisted records are not reused
+RECORDS_STATE_VERSION = 1
+
+# streak type codes of the records engine arrays
+STREAK_TYPES = [None, "W", "L", "T"]
+
+
+class RecordsEngine(object):
+    """Cumulative league records kept as arrays indexed by team ordinal and updated one week of matchups at a time.
+
+    A snapshot of the arrays is kept for every applied week (along with a hash of the matchups that produced it) so
+    records for any week can be rebuilt without replaying the season, and the snapshots can be persisted to the data
+    directory so later runs resume from the last calculated week instead of from the start week.
+    """
+
+    int_fields = [
+        "wins", "ties", "losses", "streak_type", "streak_len",
+        "division_wins", "division_ties", "division_losses", "division_streak_type", "division_streak_len"
+    ]
+    float_fields = ["points_for", "points_against", "division_points_for", "division_points_against"]
+
+    def __init__(self, team_ids: List[str], start_week: int, state_file_path: Optional[Path] = None):
+        logger.debug("Initializing records engine.")
+
+        self.team_ids: List[str] = [str(team_id) for team_id in team_ids]
+        self.team_ordinals: Dict[str, int] = {team_id: ndx for ndx, team_id in enumerate(self.team_ids)}
+        self.start_week: int = start_week
+        self.state_file_path: Optional[Path] = state_file_path
+
+        self.snapshots_by_week: Dict[str, Dict[str, np.ndarray]] = {}
+        self.matchups_hashes_by_week: Dict[str, str] = {}
+        # ordinals of the teams with a matchup result in each week (only they get a record for that week)
+        self.team_ndxs_by_week: Dict[str, List[int]] = {}
+
+        if self.state_file_path:
+            self._load()
+
+    def _get_empty_state(self) -> Dict[str, np.ndarray]:
+        num_teams = len(self.team_ids)
+        state = {field: np.zeros(num_teams, dtype=np.int64) for field in self.int_fields}
+        state.update({field: np.zeros(num_teams, dtype=np.float64) for field in self.float_fields})
+        return state
+
+    @staticmethod
+    def get_matchups_hash(custom_weekly_matchups: List[Dict[str, Dict[str, Any]]]) -> str:
+        return hashlib.sha256(
+            json.dumps(
+                [RECORDS_STATE_VERSION, custom_weekly_matchups], ensure_ascii=False, sort_keys=True, default=str
+            ).encode("utf-8")
+        ).hexdigest()
+
+    def update(self, week: int, custom_weekly_matchups: List[Dict[str, Dict[str, Any]]]) -> None:
+        """Apply the matchup results of a week to the records of the previous week, skipping weeks already applied with
+        the same matchups and discarding later weeks when the matchups of a week have changed.
+        """
+        matchups_hash = self.get_matchups_hash(custom_weekly_matchups)
+        if self.matchups_hashes_by_week.get(str(week)) == matchups_hash:
+            logger.debug(f"Using existing league records for week \"{week}\".")
+            return
+
+        if week == self.start_week:
+            state = self._get_empty_state()
+        elif str(week - 1) in self.snapshots_by_week:
+            state = {field: values.copy() for field, values in self.snapshots_by_week[str(week - 1)].items()}
+        else:
+            raise ValueError(f"League records for week {week - 1} must be calculated before week {week}.")
+
+        # discard the records of this week and any later weeks since they were built on different matchups
+        for snapshot_week in [wk for wk in self.snapshots_by_week.keys() if int(wk) >= week]:
+            del self.snapshots_by_week[snapshot_week]
+            del self.matchups_hashes_by_week[snapshot_week]
+            del self.team_ndxs_by_week[snapshot_week]
+
+        self.snapshots_by_week[str(week)] = self._apply_matchups(state, custom_weekly_matchups, week)
+        self.matchups_hashes_by_week[str(week)] = matchups_hash
+
+        if self.state_file_path:
+            self._save()
+
+    def _apply_matchups(self, state: Dict[str, np.ndarray], custom_weekly_matchups: List[Dict[str, Dict[str, Any]]],
+                        week: int) -> Dict[str, np.ndarray]:
+        # flatten the matchup results of the week into arrays with one entry per team with a matchup
+        team_ndxs = []
+        outcomes = []
+        points_for = []
+        points_against = []
+        division = []
+        for matchup in custom_weekly_matchups:
+            for team_id, matchup_result in matchup.items():
+                team_ndxs.append(self.team_ordinals[str(team_id)])
+                # anything other than a win or loss is a tie
+                outcomes.append({"W": 1, "L": 2}.get(matchup_result["result"], 3))
+                points_for.append(matchup_result["points_for"])
+                points_against.append(matchup_result["points_against"])
+                division.append(bool(matchup_result["division"]))
+        self.team_ndxs_by_week[str(week)] = team_ndxs
+
+        team_ndxs = np.array(team_ndxs, dtype=np.int64)
+        outcomes = np.array(outcomes, dtype=np.int64)
+        points_for = np.array(points_for, dtype=np.float64)
+        points_against = np.array(points_against, dtype=np.float64)
+        division = np.array(division, dtype=bool)
+
+        state["wins"][team_ndxs] += outcomes == 1
+        state["losses"][team_ndxs] += outcomes == 2
+        state["ties"][team_ndxs] += outcomes == 3
+        state["points_for"][team_ndxs] += points_for
+        state["points_against"][team_ndxs] += points_against
+        state["streak_len"][team_ndxs] = np.where(
+            state["streak_type"][team_ndxs] == outcomes, state["streak_len"][team_ndxs] + 1, 1
+        )
+        state["streak_type"][team_ndxs] = outcomes
+
+        division_team_ndxs = team_ndxs[division]
+        division_outcomes = outcomes[division]
+        state["division_wins"][division_team_ndxs] += division_outcomes == 1
+        state["division_losses"][division_team_ndxs] += division_outcomes == 2
+        state["division_ties"][division_team_ndxs] += division_outcomes == 3
+        state["division_points_for"][division_team_ndxs] += points_for[division]
+        state["division_points_against"][division_team_ndxs] += points_against[division]
+        state["division_streak_len"][division_team_ndxs] = np.where(
+            state["division_streak_type"][division_team_ndxs] == division_outcomes,
+            state["division_streak_len"][division_team_ndxs] + 1,
+            1
+        )
+        state["division_streak_type"][division_team_ndxs] = division_outcomes
+
+        return state
+
+    def get_records(self, week: int, standings: List[BaseTeam]) -> Dict[str, BaseRecord]:
+        """Build the records of a week for the teams with a matchup result that week, ordered and ranked by wins,
+        losses, ties, and points for (with ties in all of them kept in standings order).
+        """
+        state = self.snapshots_by_week[str(week)]
+        week_team_ndxs = set(self.team_ndxs_by_week[str(week)])
+
+        teams = [team for team in standings if self.team_ordinals.get(str(team.team_id)) in week_team_ndxs]
+        team_ndxs = np.array([self.team_ordinals[str(team.team_id)] for team in teams], dtype=np.int64)
+        if len(team_ndxs) > 0:
+            # lexsort is stable and sorts by the last key first
+            ordered_ndxs = np.lexsort((
+                -state["points_for"][team_ndxs],
+                -state["ties"][team_ndxs],
+                -state["losses"][team_ndxs],
+                -state["wins"][team_ndxs]
+            ))
+        else:
+            ordered_ndxs = []
+
+        records = {}
+        for rank, ordered_ndx in enumerate(ordered_ndxs, start=1):
+            team = teams[ordered_ndx]
+            team_ndx = team_ndxs[ordered_ndx]
+            division_streak_type = STREAK_TYPES[state["division_streak_type"][team_ndx]]
+            records[team.team_id] = BaseRecord(
+                week,
+                wins=int(state["wins"][team_ndx]),
+                ties=int(state["ties"][team_ndx]),
+                losses=int(state["losses"][team_ndx]),
+                points_for=float(state["points_for"][team_ndx]),
+                points_against=float(state["points_against"][team_ndx]),
+                streak_type=STREAK_TYPES[state["streak_type"][team_ndx]],
+                streak_len=int(state["streak_len"][team_ndx]),
+                team_id=team.team_id,
+                team_name=team.name,
+                rank=rank,
+                division=team.division,
+                division_wins=int(state["division_wins"][team_ndx]),
+                division_ties=int(state["division_ties"][team_ndx]),
+                division_losses=int(state["division_losses"][team_ndx]),
+                division_points_for=float(state["division_points_for"][team_ndx]),
+                division_points_against=float(state["division_points_against"][team_ndx]),
+                division_streak_type=division_streak_type,
+                division_streak_len=int(state["division_streak_len"][team_ndx]) if division_streak_type else None
+            )
+
+        return records
+
+    def _load(self) -> None:
+        if not self.state_file_path.exists():
+            return
+
+        with open(self.state_file_path, "r", encoding="utf-8") as records_state_in:
+            records_state = json.load(records_state_in)
+
+        if records_state.get("version") != RECORDS_STATE_VERSION or records_state.get("team_ids") != self.team_ids:
+            logger.debug("Discarding persisted league records state from a different version or set of teams.")
+            return
+
+        for week, week_state in records_state.get("weeks", {}).items():
+            self.snapshots_by_week[week] = {
+                field: np.array(week_state["state"][field], dtype=np.int64 if field in self.int_fields else np.float64)
+                for field in self.int_fields + self.float_fields
+            }
+            self.matchups_hashes_by_week[week] = week_state["matchups_hash"]
+            self.team_ndxs_by_week[week] = week_state["team_ndxs"]
+
+        logger.debug(f"Loaded persisted league records state for weeks: {list(self.snapshots_by_week.keys())}")
+
+    def _save(self) -> None:
+        with open_for_atomic_write(self.state_file_path) as records_state_out:
+            json.dump(
+                {
+                    "version": RECORDS_STATE_VERSION,
+                    "team_ids": self.team_ids,
+                    "weeks": {
+                        week: {
+                            "matchups_hash": self.matchups_hashes_by_week[week],
+                            "team_ndxs": self.team_ndxs_by_week[week],
+                            "state": {field: values.tolist() for field, values in state.items()}
+                        } for week, state in self.snapshots_by_week.items()
+                    }
+                },
+                records_state_out,
+                ensure_ascii=False
+            )
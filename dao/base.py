@@ -5,13 +5,18 @@ __email__ = "uberfastman@uberfastman.dev"
 
 import json
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Set, Union, List, Dict, Any, Callable, Optional
+from typing import Set, Union, List, Dict, Any, Callable, Optional, Tuple, Iterable, TYPE_CHECKING
 
 from calculate.playoff_probabilities import PlayoffProbabilities
 from features.bad_boy import BadBoyFeature
 from features.beef import BeefFeature
 from features.high_roller import HighRollerFeature
+from utilities.utils import open_for_atomic_write
+
+if TYPE_CHECKING:
+    from calculate.records import RecordsEngine
 
 
 # noinspection GrazieInspection
@@ -130,11 +135,13 @@ class BaseLeague(FantasyFootballReportObject):
         self.offensive_positions: List[str] = []
         self.defensive_positions: List[str] = []
         self.bench_positions: List[str] = []
+        self.roster_slot_bits: Dict[str, int] = {}
 
         self.matchups_by_week: Dict[str, List[BaseMatchup]] = {}
         self.teams_by_week: Dict[str, Dict[str, BaseTeam]] = {}
         self.players_by_week: Dict[str, Dict[str, BasePlayer]] = {}
         self.records_by_week: Dict[str, Dict] = {}
+        self.records_engine: Optional[RecordsEngine] = None
 
         self.standings: List[BaseTeam] = []
         self.current_standings: List[BaseTeam] = []
@@ -143,10 +150,96 @@ class BaseLeague(FantasyFootballReportObject):
 
         self.player_data_by_week_function: Optional[Callable] = None
         self.player_data_by_week_key: Optional[str] = None
+        # optional platform function retrieving the points of multiple players for a week in as few requests as the
+        # platform allows: (list of player IDs, week) -> dict of player ID -> points
+        self.player_points_by_week_batch_function: Optional[Callable] = None
+        self.player_points_by_week_batch_size: int = 1
+
+        # points of players not on a roster in the league data for a week keyed by week and player ID
+        self.player_points_by_week: Optional[Dict[str, Dict[str, float]]] = None
 
     def get_player_data_by_week(self, player_id: str, week: int = None) -> Any:
         return getattr(self.player_data_by_week_function(player_id, week), self.player_data_by_week_key)
 
+    def _get_player_points_cache_file_path(self) -> Path:
+        return Path(self.data_dir) / str(self.season) / str(self.league_id) / "player_points_by_week.json"
+
+    def _load_player_points_by_week(self, cache: bool) -> Dict[str, Dict[str, float]]:
+        if self.player_points_by_week is None:
+            self.player_points_by_week = defaultdict(dict)
+            cache_file_path = self._get_player_points_cache_file_path()
+            if cache and cache_file_path.exists():
+                with open(cache_file_path, "r", encoding="utf-8") as player_points_in:
+                    for week, player_points in json.load(player_points_in).items():
+                        self.player_points_by_week[week].update(player_points)
+        return self.player_points_by_week
+
+    def prefetch_player_points_by_week(self, player_weeks: Iterable[Tuple[str, int]], workers: int = 1,
+                                       cache: bool = True) -> None:
+        """Retrieve the weekly points of every given (player ID, week) pair that is not already available from the
+        league data or the persistent player points cache, batching the players of each week into as few platform
+        requests as possible and running the requests concurrently.
+        """
+        player_points_by_week = self._load_player_points_by_week(cache)
+
+        missing_player_ids_by_week: Dict[str, List[str]] = defaultdict(list)
+        for player_id, week in player_weeks:
+            player_id = str(player_id)
+            if (player_id not in self.players_by_week.get(str(week), {})
+                    and player_id not in player_points_by_week[str(week)]
+                    and player_id not in missing_player_ids_by_week[str(week)]):
+                missing_player_ids_by_week[str(week)].append(player_id)
+
+        player_requests = []
+        for week, player_ids in missing_player_ids_by_week.items():
+            if self.player_points_by_week_batch_function and not self.offline:
+                batch_size = max(self.player_points_by_week_batch_size, 1)
+                player_requests.extend(
+                    (week, player_ids[ndx:ndx + batch_size]) for ndx in range(0, len(player_ids), batch_size)
+                )
+            elif self.player_data_by_week_function:
+                player_requests.extend((week, [player_id]) for player_id in player_ids)
+
+        if not player_requests:
+            return
+
+        def fetch(week_player_ids: Tuple[str, List[str]]) -> Tuple[str, Dict[str, float]]:
+            week_str, batch_player_ids = week_player_ids
+            if self.player_points_by_week_batch_function and not self.offline:
+                return week_str, self.player_points_by_week_batch_function(batch_player_ids, int(week_str))
+            else:
+                return week_str, {
+                    batch_player_ids[0]: self.get_player_data_by_week(batch_player_ids[0], int(week_str))
+                }
+
+        if workers > 1 and len(player_requests) > 1:
+            with ThreadPoolExecutor(max_workers=min(workers, len(player_requests))) as executor:
+                results = list(executor.map(fetch, player_requests))
+        else:
+            results = [fetch(player_request) for player_request in player_requests]
+
+        for (week, batch_player_ids), (_, player_points) in zip(player_requests, results):
+            for player_id, points in player_points.items():
+                player_points_by_week[week][str(player_id)] = float(points) if points else 0.0
+            # players missing from a response scored no points that week, and are recorded as such so that they are
+            # not requested again
+            for player_id in batch_player_ids:
+                player_points_by_week[week].setdefault(str(player_id), 0.0)
+
+        if cache:
+            with open_for_atomic_write(self._get_player_points_cache_file_path()) as player_points_out:
+                json.dump(player_points_by_week, player_points_out, ensure_ascii=False, indent=2)
+
+    def get_player_points_by_week(self, player_id: str, week: int, cache: bool = True) -> float:
+        """Get the points of a player for a week from the league data or the prefetched/cached player points (see
+        prefetch_player_points_by_week), with players that were not prefetched scoring no points.
+        """
+        players_by_week = self.players_by_week.get(str(week), {})
+        if str(player_id) in players_by_week:
+            return players_by_week[str(player_id)].points
+
+        return self._load_player_points_by_week(cache)[str(week)].get(str(player_id), 0.0)
+
     def get_custom_weekly_matchups(self, week_for_report: int) -> List[Dict[str, Dict[str, Any]]]:
         """
         get weekly matchup data
@@ -230,6 +323,50 @@ class BaseLeague(FantasyFootballReportObject):
             "FLEX_IDP": self.flex_positions_idp
         }
 
+    def get_position_bit(self, position: str) -> int:
+        """Get the bit assigned to a roster slot position in the league slot index, indexing the position if it is new.
+        """
+        position_bit = self.roster_slot_bits.get(position)
+        if position_bit is None:
+            position_bit = 1 << len(self.roster_slot_bits)
+            self.roster_slot_bits[position] = position_bit
+        return position_bit
+
+    def get_positions_mask(self, positions: Iterable[str]) -> int:
+        """Get the bitmask of roster slot positions for integer eligibility tests in place of set intersections.
+        """
+        positions_mask = 0
+        for position in positions:
+            positions_mask |= self.get_position_bit(position)
+        return positions_mask
+
+    def get_remaining_matchups(self, week_for_report: int) -> Dict[str, List[Tuple[str, ...]]]:
+        """Get the team IDs of every matchup after the week for the report for Monte Carlo playoff simulations.
+        """
+        remaining_matchups = {}
+        for week, matchups in self.matchups_by_week.items():
+            if int(week) > week_for_report:
+                remaining_matchups[str(week)] = []
+                matchup: BaseMatchup
+                for matchup in matchups:
+                    matchup_teams = []
+                    for team in matchup.teams:
+                        matchup_teams.append(team.team_id)
+                    remaining_matchups[str(week)].append(tuple(matchup_teams))
+
+        return remaining_matchups
+
+    def get_team_weekly_points(self, week: int) -> Dict[str, List[float]]:
+        """Get the weekly points of every team from the start of the season through the given week.
+        """
+        return {
+            team_id: [
+                float(self.teams_by_week[str(wk)][team_id].points)
+                for wk in range(1, week + 1)
+                if team_id in self.teams_by_week.get(str(wk), {})
+            ] for team_id in self.teams_by_week.get(str(week), {}).keys()
+        }
+
     def get_playoff_probs(self, save_data: bool = False, playoff_prob_sims: int = None, offline: bool = False,
                           recalculate: bool = True) -> PlayoffProbabilities:
         # TODO: UPDATE USAGE OF recalculate PARAM (could use self.offline)
@@ -654,6 +791,7 @@ class BasePlayer(FantasyFootballReportObject):
         self.selected_position_is_flex: bool = False
         self.status: Optional[str] = None
         self.eligible_positions: Set[str] = set()
+        self.eligible_positions_mask: int = 0
         self.stats: List[BaseStat] = []
 
         # - - - - - - - - - - - -
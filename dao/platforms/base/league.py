@@ -9,12 +9,12 @@ from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import Union, Dict, Callable, Any
 
-import requests
 from requests.exceptions import HTTPError
 
 from dao.base import BaseLeague
+from utilities.http_client import get_http_session
 from utilities.logger import get_logger
-from utilities.utils import format_platform_display
+from utilities.utils import format_platform_display, open_for_atomic_write
 
 logger = get_logger(__name__, propagate=False)
 
@@ -78,7 +78,7 @@ class BaseLeagueData(ABC):
 
         if not self.league.offline:
             logger.debug(f"Retrieving {self.platform_display} data from endpoint: {url}")
-            response = requests.get(url, headers=headers)
+            response = get_http_session().get(url, headers=headers)
 
             try:
                 response.raise_for_status()
@@ -104,10 +104,7 @@ class BaseLeagueData(ABC):
             logger.debug(f"Saving {self.platform_display} data retrieved from endpoint: {url}")
 
             if save_file:
-                if not Path(save_file.parent).exists():
-                    os.makedirs(save_file.parent)
-
-                with open(save_file, "w", encoding="utf-8") as data_out:
+                with open_for_atomic_write(save_file) as data_out:
                     json.dump(response_json, data_out, ensure_ascii=False, indent=2)
             else:
                 logger.debug(f"No save file provided. Response will not be saved.")
@@ -1,15 +1,16 @@
 import json
 import logging
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from statistics import median
 from typing import Callable, Dict, Any
 
-import requests
 from colorama import Fore, Style
 
 from dao.base import BaseLeague, BaseMatchup, BaseTeam, BaseManager, BaseRecord, BasePlayer, BaseStat
 from dao.platforms.base.league import BaseLeagueData
+from utilities.http_client import get_http_session
 from utilities.logger import get_logger
 from utilities.settings import settings
 
@@ -102,7 +103,7 @@ class LeagueData(BaseLeagueData):
 
         auth_url = f"{self.auth_base_url}/general/oauth/mobile/login?response_format=json"
 
-        response_json = requests.post(auth_url, headers=auth_query_headers, data=auth_query_data).json()
+        response_json = get_http_session().post(auth_url, headers=auth_query_headers, data=auth_query_data).json()
 
         return response_json.get("body").get("access_token")
 
@@ -120,6 +121,18 @@ class LeagueData(BaseLeagueData):
         # noinspection PyTypeChecker
         return int("".join(filter(str.isdigit, str(input_with_embedded_int))))
 
+    def _get_player_weekly_scoring(self, player_id: str) -> Dict[str, Any]:
+        return {
+            str(p.get("id")): p for p in self.query(
+                self.build_api_url(
+                    "/league/fantasy-points/weekly-scoring", additional_parameters={"player_id": player_id}
+                ),
+                (Path(self.league.data_dir) / str(self.league.season) / self.league.league_id / "players"
+                 / f"player_{player_id}-weekly_scoring.json"),
+                self.query_headers
+            ).get("body").get("weekly_scoring").get("players")
+        }.get(player_id)
+
     def map_data_to_base(self) -> BaseLeague:
         logger.debug(f"Retrieving {self.platform_display} league data and mapping it to base objects.")
 
@@ -489,6 +502,19 @@ class LeagueData(BaseLeagueData):
                 # add matchup to league matchups by week
                 self.league.matchups_by_week[str(week)].append(base_matchup)
 
+        # players who are no longer rostered are missing from the league weekly scoring, so retrieve the weekly scoring
+        # of each of them once for the season (concurrently) instead of once for every week they were rostered
+        unrostered_player_ids = sorted({
+            str(player.get("id")) for rosters in rosters_by_week.values() for roster in rosters.values()
+            for player in roster.get("players") if not player.get("weekly_scoring")
+        })
+        if unrostered_player_ids:
+            logger.debug(f"Getting CBS weekly scoring of {len(unrostered_player_ids)} unrostered players.")
+            with ThreadPoolExecutor(max_workers=settings.platform_settings.cbs_fetch_workers) as executor:
+                league_team_rosters_weekly_scoring.update(
+                    zip(unrostered_player_ids, executor.map(self._get_player_weekly_scoring, unrostered_player_ids))
+                )
+
         for week, rosters in rosters_by_week.items():
             self.league.players_by_week[str(week)] = {}
             for team_id, roster in rosters.items():
@@ -521,18 +547,7 @@ class LeagueData(BaseLeagueData):
                     base_player.percent_owned = self.extract_integer(player.get("percentowned", "0"))
 
                     if not player.get("weekly_scoring"):
-                        player["weekly_scoring"] = {
-                            str(p.get("id")): p for p in self.query(
-                                self.build_api_url(
-                                    "/league/fantasy-points/weekly-scoring",
-                                    additional_parameters={"player_id": base_player.player_id}
-                                ),
-                                (Path(self.league.data_dir) / str(self.league.season) / self.league.league_id
-                                 / f"team_{league_team.team_id}"
-                                 / f"player_{base_player.player_id}-weekly_scoring.json"),
-                                self.query_headers
-                            ).get("body").get("weekly_scoring").get("players")
-                        }.get(base_player.player_id)
+                        player["weekly_scoring"] = league_team_rosters_weekly_scoring.get(str(base_player.player_id))
 
                     for weekly_points in player.get("weekly_scoring").get("periods"):
                         if int(weekly_points.get("period")) == int(week):
@@ -544,6 +559,7 @@ class LeagueData(BaseLeagueData):
 
                     for position in player.get("weekly_scoring").get("player").get("eligible_positions"):
                         base_player.eligible_positions.add(self.get_mapped_position(position))
+                    base_player.eligible_positions_mask = self.league.get_positions_mask(base_player.eligible_positions)
 
                     base_player.primary_position = self.get_mapped_position(player.get("position"))
                     base_player.position_type = (
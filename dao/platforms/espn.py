@@ -5,11 +5,15 @@ import json
 import logging
 import os
 import re
+import sys
+import threading
 import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from getpass import getpass
 from pathlib import Path
 from statistics import median
-from typing import List, Callable
+from typing import List, Callable, Dict, Any
 
 import colorama
 from colorama import Fore, Style
@@ -18,6 +22,7 @@ from espn_api.football.box_score import BoxScore
 from espn_api.football.constant import POSITION_MAP
 from espn_api.football.league import League, Team
 from espn_api.football.settings import Settings
+from espn_api.requests.espn_requests import EspnFantasyRequests, checkRequestStatus
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver import Chrome
 from selenium.webdriver.chrome.options import Options as ChromeOptions
@@ -29,8 +34,10 @@ from selenium.webdriver.support.ui import WebDriverWait
 
 from dao.base import BaseMatchup, BaseTeam, BaseRecord, BaseManager, BasePlayer, BaseStat
 from dao.platforms.base.league import BaseLeagueData
+from utilities.http_client import get_http_session
 from utilities.logger import get_logger
 from utilities.settings import settings
+from utilities.utils import open_for_atomic_write
 
 colorama.init()
 
@@ -68,7 +75,9 @@ class LeagueData(BaseLeagueData):
             offline
         )
 
-        self._authenticate()
+        # offline reports only load saved ESPN data, so they do not need ESPN session cookies
+        if not self.league.offline:
+            self._authenticate()
 
     def _authenticate(self) -> None:
 
@@ -205,51 +214,18 @@ class LeagueData(BaseLeagueData):
 
         return espn_session_cookies
 
-    def _save_and_load_data(self, file_dir, filename, data=None):
-        file_path = Path(file_dir) / filename
-
-        # TODO: get data loading working
-        # if self.offline:
-        #     logger.debug("Loading saved ESPN league data.")
-        #     try:
-        #         with open(file_path, "r", encoding="utf-8") as data_in:
-        #             data = json.load(data_in)
-        #     except FileNotFoundError:
-        #         logger.error(
-        #             f"FILE {file_path} DOES NOT EXIST. CANNOT LOAD DATA LOCALLY WITHOUT HAVING PREVIOUSLY SAVED DATA!"
-        #         )
-        #         sys.exit(1)
-
-        if self.league.save_data:
-            logger.debug("Saving ESPN league data.")
-            if not Path(file_dir).exists():
-                os.makedirs(file_dir)
-
-            with open(file_path, "w", encoding="utf-8") as data_out:
-                json.dump(data, data_out, ensure_ascii=False, indent=2)
-
-        return data
-
     def map_data_to_base(self):
         logger.debug(f"Retrieving {self.platform_display} league data and mapping it to base objects.")
 
-        # TODO: GET SAVE/LOAD WORKING FOR ALL ESPN DATA!
+        # all ESPN API responses are saved to (or loaded from when offline) the league data directory
         espn_league: LeagueWrapper = LeagueWrapper(
             league_id=int(self.league.league_id),
             year=self.league.season,
             espn_s2=settings.platform_settings.espn_cookie_espn_s2,
-            swid=settings.platform_settings.espn_cookie_swid
-        )
-
-        self._save_and_load_data(
-            Path(self.league.data_dir) / str(self.league.season) / self.league.league_id,
-            f"{self.league.league_id}-league_info.json",
-            data=espn_league.league_json
-        )
-        self._save_and_load_data(
-            Path(self.league.data_dir) / str(self.league.season) / self.league.league_id,
-            f"{self.league.league_id}-box_info.json",
-            data=espn_league.box_data_json
+            swid=settings.platform_settings.espn_cookie_swid,
+            league_data_dir=Path(self.league.data_dir) / str(self.league.season) / self.league.league_id,
+            save_data=self.league.save_data,
+            offline=self.league.offline
         )
 
         # not currently needed
@@ -322,13 +298,20 @@ class LeagueData(BaseLeagueData):
         )
 
         logger.debug("Getting ESPN matchups by week data.")
-        matchups_by_week = {}
-        matchups_json_by_week = {}
-        median_score_by_week = {}
-        for week_for_matchups in range(self.start_week, int(espn_league.settings.reg_season_count) + 1):
-            matchups_by_week[str(week_for_matchups)] = espn_league.box_scores(week_for_matchups)
-            matchups_json_by_week[str(week_for_matchups)] = espn_league.box_data_json
+        # ESPN API QUERY: retrieve the box scores of every week of the regular season concurrently
+        weeks_for_matchups = list(range(self.start_week, int(espn_league.settings.reg_season_count) + 1))
+        with ThreadPoolExecutor(max_workers=settings.platform_settings.espn_fetch_workers) as executor:
+            matchups_by_week = {
+                str(week_for_matchups): week_box_scores for week_for_matchups, week_box_scores
+                in zip(weeks_for_matchups, executor.map(espn_league.box_scores, weeks_for_matchups))
+            }
+        matchups_json_by_week = {
+            str(week_for_matchups): espn_league.box_data_json_by_week[week_for_matchups]
+            for week_for_matchups in weeks_for_matchups
+        }
 
+        median_score_by_week = {}
+        for week_for_matchups in weeks_for_matchups:
             if int(week_for_matchups) <= self.league.week_for_report:
                 scores = []
                 matchup: BoxScore
@@ -578,6 +561,7 @@ class LeagueData(BaseLeagueData):
 
                     for position in player.eligibleSlots:
                         base_player.eligible_positions.add(self.get_mapped_position(position))
+                    base_player.eligible_positions_mask = self.league.get_positions_mask(base_player.eligible_positions)
 
                     base_player.primary_position = self.get_mapped_position(player.position)
                     base_player.position_type = (
@@ -625,12 +609,132 @@ class LeagueData(BaseLeagueData):
         return self.league
 
 
+# noinspection DuplicatedCode
+class EspnFantasyRequestsWrapper(EspnFantasyRequests):
+    """ESPN API requests sent with the shared HTTP session, with every response memoized for the lifetime of the league
+    and saved to (or loaded from when offline) the league data directory.
+    """
+
+    def __init__(self, sport: str, year: int, league_id: int, league_data_dir: Path, cookies: dict = None,
+                 espn_logger=None, save_data: bool = False, offline: bool = False):
+        super().__init__(sport, year, league_id, cookies=cookies, logger=espn_logger)
+
+        self.league_data_dir: Path = league_data_dir
+        self.save_data: bool = save_data
+        self.offline: bool = offline
+
+        # data file path -> response JSON
+        self.responses: Dict[Path, Any] = {}
+        # one lock per response so concurrent weeks wait for a response being retrieved instead of requesting it again
+        self.response_locks: Dict[Path, threading.Lock] = defaultdict(threading.Lock)
+        self.response_locks_lock: threading.Lock = threading.Lock()
+
+    def _retrieve(self, data_file_path: Path, request_data: Callable[[], Any]) -> Any:
+        with self.response_locks_lock:
+            response_lock = self.response_locks[data_file_path]
+
+        with response_lock:
+            if data_file_path not in self.responses:
+                if self.offline:
+                    logger.debug(f"Loading saved ESPN data from: {data_file_path}")
+                    try:
+                        with open(data_file_path, "r", encoding="utf-8") as data_in:
+                            response_json = json.load(data_in)
+                    except FileNotFoundError:
+                        logger.error(
+                            f"FILE {data_file_path} DOES NOT EXIST. CANNOT LOAD DATA LOCALLY WITHOUT HAVING "
+                            f"PREVIOUSLY SAVED DATA!"
+                        )
+                        sys.exit(1)
+                else:
+                    response_json = request_data()
+
+                    if self.save_data:
+                        logger.debug(f"Saving ESPN data to: {data_file_path}")
+                        with open_for_atomic_write(data_file_path) as data_out:
+                            json.dump(response_json, data_out, ensure_ascii=False, indent=2)
+
+                self.responses[data_file_path] = response_json
+
+            return self.responses[data_file_path]
+
+    def league_get(self, params: dict = None, headers: dict = None, extend: str = ""):
+        endpoint = self.LEAGUE_ENDPOINT + extend
+        r = get_http_session().get(endpoint, params=params, headers=headers, cookies=self.cookies)
+        checkRequestStatus(r.status_code, cookies=self.cookies, league_id=self.league_id)
+
+        if self.logger:
+            self.logger.log_request(endpoint=endpoint, params=params, headers=headers, response=r.json())
+        return r.json() if self.year > 2017 else r.json()[0]
+
+    def get(self, params: dict = None, headers: dict = None, extend: str = ""):
+        endpoint = self.ENDPOINT + extend
+        r = get_http_session().get(endpoint, params=params, headers=headers, cookies=self.cookies)
+        checkRequestStatus(r.status_code)
+
+        if self.logger:
+            self.logger.log_request(endpoint=endpoint, params=params, headers=headers, response=r.json())
+        return r.json()
+
+    def get_league(self):
+        return self._retrieve(self.league_data_dir / f"{self.league_id}-league_info.json", super().get_league)
+
+    def get_pro_schedule(self):
+        # the pro schedule covers every scoring period, so it is only requested once for all weeks
+        return self._retrieve(self.league_data_dir / f"{self.league_id}-pro_schedule.json", super().get_pro_schedule)
+
+    def get_pro_players(self):
+        return self._retrieve(self.league_data_dir / f"{self.league_id}-pro_players.json", super().get_pro_players)
+
+    def get_league_draft(self):
+        return self._retrieve(self.league_data_dir / f"{self.league_id}-draft_info.json", super().get_league_draft)
+
+    def get_box_scores(self, scoring_period: int, matchup_period: int):
+        params = {
+            "view": ["mMatchupScore", "mScoreboard"],
+            "scoringPeriodId": scoring_period,
+        }
+        filters = {"schedule": {"filterMatchupPeriodIds": {"value": [matchup_period]}}}
+        headers = {"x-fantasy-filter": json.dumps(filters)}
+
+        return self._retrieve(
+            self.league_data_dir / f"week_{scoring_period}" / f"{self.league_id}-box_info.json",
+            lambda: self.league_get(params=params, headers=headers)
+        )
+
+    def get_positional_ratings(self, scoring_period: int):
+        params = {
+            "view": "mPositionalRatings",
+            "scoringPeriodId": scoring_period,
+        }
+
+        return self._retrieve(
+            self.league_data_dir / f"week_{scoring_period}" / f"{self.league_id}-positional_ratings.json",
+            lambda: self.league_get(params=params)
+        )
+
+
 # noinspection DuplicatedCode
 class LeagueWrapper(League):
 
-    def __init__(self, league_id: int, year: int, espn_s2=None, swid=None):
-        super().__init__(league_id, year, espn_s2, swid)
-        self.box_data_json = None
+    def __init__(self, league_id: int, year: int, espn_s2=None, swid=None, league_data_dir: Path = None,
+                 save_data: bool = False, offline: bool = False):
+        super().__init__(league_id, year, espn_s2, swid, fetch_league=False)
+
+        self.espn_request = EspnFantasyRequestsWrapper(
+            sport="nfl",
+            year=year,
+            league_id=league_id,
+            league_data_dir=league_data_dir,
+            cookies=self.espn_request.cookies,
+            espn_logger=self.logger,
+            save_data=save_data,
+            offline=offline
+        )
+        # week -> raw box score JSON of the matchups of the week
+        self.box_data_json_by_week: Dict[int, List[Dict[str, Any]]] = {}
+
+        self.fetch_league()
 
     def _fetch_league(self):
         data = super(League, self)._fetch_league(SettingsClass=Settings)
@@ -671,14 +775,7 @@ class LeagueWrapper(League):
                     matchup_period = matchup_id
                     break
 
-        params = {
-            'view': ['mMatchupScore', 'mScoreboard'],
-            'scoringPeriodId': scoring_period,
-        }
-
-        filters = {"schedule": {"filterMatchupPeriodIds": {"value": [matchup_period]}}}
-        headers = {'x-fantasy-filter': json.dumps(filters)}
-        data = self.espn_request.league_get(params=params, headers=headers)
+        data = self.espn_request.get_box_scores(scoring_period, matchup_period)
 
         schedule = data['schedule']
         pro_schedule = self._get_pro_schedule(scoring_period)
@@ -687,7 +784,7 @@ class LeagueWrapper(League):
         # # # # # # # # # # # # # # # # # # #
         # # # # # # RAW JSON ACCESS # # # # #
         # # # # # # # # # # # # # # # # # # #
-        self.box_data_json = [matchup for matchup in schedule]
+        self.box_data_json_by_week[week] = [matchup for matchup in schedule]
         # # # # # # # # # # # # # # # # # # #
         # # # # # # # # # # # # # # # # # # #
         # # # # # # # # # # # # # # # # # # #
@@ -704,6 +801,18 @@ class LeagueWrapper(League):
                     matchup.away_team = team
         return box_data
 
+    def _get_positional_ratings(self, week: int):
+        data = self.espn_request.get_positional_ratings(week)
+        ratings = data.get('positionAgainstOpponent', {}).get('positionalRatings', {})
+
+        positional_ratings = {}
+        for pos, rating in ratings.items():
+            teams_rating = {}
+            for team, team_data in rating['ratingsByOpponent'].items():
+                teams_rating[team] = team_data['rank']
+            positional_ratings[pos] = teams_rating
+        return positional_ratings
+
 
 if __name__ == '__main__':
 
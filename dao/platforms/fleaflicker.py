@@ -3,21 +3,22 @@ __email__ = "uberfastman@uberfastman.dev"
 
 import datetime
 import logging
-import os
 import re
 import sys
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from statistics import median
 from typing import Dict, Callable, Union
 
-import requests
 from bs4 import BeautifulSoup
 
 from dao.base import BaseMatchup, BaseTeam, BaseRecord, BaseManager, BasePlayer, BaseStat
 from dao.platforms.base.league import BaseLeagueData
+from utilities.http_client import get_http_session
 from utilities.logger import get_logger
 from utilities.settings import settings
+from utilities.utils import open_for_atomic_write
 
 logger = get_logger(__name__, propagate=False)
 
@@ -61,7 +62,7 @@ class LeagueData(BaseLeagueData):
                 "Safari/605.1.15"
             )
             headers = {"user-agent": user_agent}
-            response = requests.get(url, headers)
+            response = get_http_session().get(url, headers=headers)
 
             html_soup = BeautifulSoup(response.text, "html.parser")
             logger.debug(f"Response (HTML): {html_soup}")
@@ -77,10 +78,7 @@ class LeagueData(BaseLeagueData):
 
         if self.league.save_data:
             logger.debug(f"Saving Fleaflicker data scraped from endpoint: {url}")
-            if not Path(file_dir).exists():
-                os.makedirs(file_dir)
-
-            with open(file_path, "w", encoding="utf-8") as data_out:
+            with open_for_atomic_write(file_path) as data_out:
                 data_out.write(html_soup.prettify())
 
         return html_soup
@@ -173,17 +171,41 @@ class LeagueData(BaseLeagueData):
             key=lambda x: x.get("recordOverall").get("rank") if x.get("recordOverall").get("rank") else 0
         )
 
+        # FLEAFLICKER API QUERY: run queries to retrieve the scoreboards by week for the entire season and the team
+        # rosters by week for the season up to the week for the report concurrently
+        with ThreadPoolExecutor(max_workers=settings.platform_settings.fleaflicker_fetch_workers) as executor:
+            matchups_by_week_futures = {
+                str(wk): executor.submit(
+                    self.query,
+                    (f"https://www.fleaflicker.com/api/FetchLeagueScoreboard"
+                     f"?leagueId={self.league.league_id}&scoringPeriod={wk}"
+                     f"{f'&season={self.league.season}' if self.league.season else ''}"),
+                    (Path(self.league.data_dir) / str(self.league.season) / str(self.league.league_id) / f"week_{wk}"
+                     / f"week_{wk}-scoreboard.json")
+                ) for wk in range(self.start_week, int(self.league.num_regular_season_weeks) + 1)
+            }
+            rosters_by_week_futures = {
+                str(wk): {
+                    str(team.get("id")): executor.submit(
+                        self.query,
+                        (f"https://www.fleaflicker.com/api/FetchRoster"
+                         f"?leagueId={self.league.league_id}&teamId={team.get('id')}&scoringPeriod={wk}"
+                         f"{f'&season={self.league.season}' if self.league.season else ''}"),
+                        (Path(self.league.data_dir) / str(self.league.season) / str(self.league.league_id)
+                         / f"week_{wk}" / "rosters"
+                         / f"{team.get('id')}-{team.get('name').replace(' ', '_')}-roster.json")
+                    ) for team in ranked_league_teams
+                } for wk in range(self.start_week, self.league.week_for_report + 1)
+            }
+
+            matchups_by_week = {week: future.result() for week, future in matchups_by_week_futures.items()}
+            rosters_by_week = {
+                week: {team_id: future.result() for team_id, future in team_futures.items()}
+                for week, team_futures in rosters_by_week_futures.items()
+            }
+
         median_score_by_week = {}
-        matchups_by_week = {}
         for wk in range(self.start_week, int(self.league.num_regular_season_weeks) + 1):
-            matchups_by_week[str(wk)] = self.query(
-                (f"https://www.fleaflicker.com/api/FetchLeagueScoreboard"
-                 f"?leagueId={self.league.league_id}&scoringPeriod={wk}"
-                 f"{f'&season={self.league.season}' if self.league.season else ''}"),
-                (Path(self.league.data_dir) / str(self.league.season) / str(self.league.league_id) / f"week_{wk}"
-                 / f"week_{wk}-scoreboard.json")
-            )
-
             if int(wk) <= self.league.week_for_report:
                 scores = []
                 for matchup in matchups_by_week[str(wk)].get("games"):
@@ -199,18 +221,6 @@ class LeagueData(BaseLeagueData):
                 else:
                     median_score_by_week[str(wk)] = 0
 
-        rosters_by_week = {}
-        for wk in range(self.start_week, self.league.week_for_report + 1):
-            rosters_by_week[str(wk)] = {
-                str(team.get("id")): self.query(
-                    (f"https://www.fleaflicker.com/api/FetchRoster"
-                     f"?leagueId={self.league.league_id}&teamId={team.get('id')}&scoringPeriod={wk}"
-                     f"{f'&season={self.league.season}' if self.league.season else ''}"),
-                    (Path(self.league.data_dir) / str(self.league.season) / str(self.league.league_id) / f"week_{wk}"
-                     / "rosters" / f"{team.get('id')}-{team.get('name').replace(' ', '_')}-roster.json")
-                ) for team in ranked_league_teams
-            }
-
         # TODO: how to get transactions for LAST YEAR from Fleaflicker API...?
         league_activity = self.query(
             f"https://www.fleaflicker.com/api/FetchLeagueActivity?leagueId={self.league.league_id}",
@@ -497,6 +507,9 @@ class LeagueData(BaseLeagueData):
                             for flex_position, positions in self.league.get_flex_positions_dict().items():
                                 if base_position in positions:
                                     base_player.eligible_positions.add(flex_position)
+                        base_player.eligible_positions_mask = self.league.get_positions_mask(
+                            base_player.eligible_positions
+                        )
 
                         base_player.selected_position = self.get_mapped_position(flea_player_position.get("label"))
                         base_player.selected_position_is_flex = (
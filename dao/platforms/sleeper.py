@@ -4,18 +4,21 @@ __email__ = "uberfastman@uberfastman.dev"
 import datetime
 import json
 import logging
-from collections import defaultdict, Counter
-from copy import deepcopy
+from collections import defaultdict, Counter, ChainMap
 from datetime import datetime, timedelta
 from itertools import groupby
 from pathlib import Path
 from statistics import median
-from typing import Union, Callable
+from typing import Union, Callable, Dict, Any, Optional, TYPE_CHECKING
 
 from dao.base import BaseMatchup, BaseTeam, BaseRecord, BaseManager, BasePlayer, BaseStat
 from dao.platforms.base.league import BaseLeagueData
 from utilities.logger import get_logger
 from utilities.settings import settings
+from utilities.utils import open_for_atomic_write
+
+if TYPE_CHECKING:
+    from report.batch import SharedReportResources
 
 logger = get_logger(__name__, propagate=False)
 
@@ -28,7 +31,8 @@ class LeagueData(BaseLeagueData):
 
     def __init__(self, base_dir: Union[Path, None], data_dir: Path, league_id: str,
                  season: int, start_week: int, week_for_report: int, get_current_nfl_week_function: Callable,
-                 week_validation_function: Callable, save_data: bool = True, offline: bool = False):
+                 week_validation_function: Callable, save_data: bool = True, offline: bool = False,
+                 shared_resources: Optional["SharedReportResources"] = None):
         super().__init__(
             "Sleeper",
             f"https://api.sleeper.app",
@@ -47,8 +51,16 @@ class LeagueData(BaseLeagueData):
         self.api_base_url = f"{self.base_url}/v1"
         self.api_stats_and_projections_base_url = self.base_url
 
+        self.shared_resources: Optional["SharedReportResources"] = shared_resources
+        self.player_data_file_path: Path = (
+            Path(self.league.data_dir) / str(self.league.season) / self.league.league_id
+            / f"{self.league.league_id}-player_data.json"
+        )
+
         self.league_scoring = None
         self.standings = None
+        self.standings_by_roster_id: Optional[Dict[int, Dict[str, Any]]] = None
+        self.standings_rank_by_roster_id: Optional[Dict[int, int]] = None
         self.player_data = None
         self.player_stats_data_by_week = None
         self.player_projected_stats_data_by_week = None
@@ -83,24 +95,42 @@ class LeagueData(BaseLeagueData):
         response_json = self.query(url, save_file)
         return response_json
 
+    def get_player_data(self) -> Dict[str, Dict[str, Any]]:
+        return self.query_with_delayed_refresh(
+            f"{self.api_base_url}/players/nfl",
+            self.player_data_file_path,
+            check_for_saved_data=True,
+            refresh_days_delay=7
+        )
+
+    def save_player_data(self, player_data: Dict[str, Dict[str, Any]]) -> None:
+        with open_for_atomic_write(self.player_data_file_path) as data_out:
+            json.dump(player_data, data_out, ensure_ascii=False, indent=2)
+
     def _fetch_player_data(self, player_id, week, starter=False):
         # handle the move of the Raiders from Oakland (OAK) to Las Vegas (LV) between the 2019 and 2020 seasons
         if player_id == "OAK":
             player_id = "LV"
-        player = deepcopy(self.player_data.get(str(player_id)))
+        player_record = self.player_data.get(str(player_id))
+        if player_record is None:
+            return None
+
+        # the roster mapping only adds keys to each weekly player, so instead of copying the shared player record and
+        # the stats of the week, each weekly player is a copy-on-write view that keeps its own keys in a separate dict
+        player = ChainMap({}, player_record)
         if int(week) <= self.league.week_for_report:
-            player["stats"] = deepcopy(self.player_stats_data_by_week.get(str(week)).get(str(player_id)))
-            player["projected"] = deepcopy(self.player_projected_stats_data_by_week[str(week)].get(str(player_id)))
+            player["stats"] = self.player_stats_data_by_week.get(str(week)).get(str(player_id))
+            player["projected"] = self.player_projected_stats_data_by_week[str(week)].get(str(player_id))
             player["starter"] = starter
         return player
 
     def _map_player_data_to_matchup(self, matchup, week):
         for team in matchup:
-            for ranked_team in self.standings:
-                if ranked_team.get("roster_id") == team.get("roster_id"):
-                    team["info"] = {
-                        k: v for k, v in ranked_team.items() if k not in ["taxi", "starters", "reserve", "players"]
-                    }
+            ranked_team = self.standings_by_roster_id.get(int(team.get("roster_id")))
+            if ranked_team:
+                team["info"] = {
+                    k: v for k, v in ranked_team.items() if k not in ["taxi", "starters", "reserve", "players"]
+                }
 
             if team["starters"] and team["players"]:
                 team["roster"] = [
@@ -178,13 +208,17 @@ class LeagueData(BaseLeagueData):
             team["co_owners"] = [league_managers.get(co_owner) for co_owner in team.get("co_owners")] if team.get(
                 "co_owners") else []
 
-        self.player_data = self.query_with_delayed_refresh(
-            f"{self.api_base_url}/players/nfl",
-            (Path(self.league.data_dir) / str(self.league.season) / self.league.league_id
-             / f"{self.league.league_id}-player_data.json"),
-            check_for_saved_data=True,
-            refresh_days_delay=7
-        )
+        self.standings_by_roster_id = {int(team.get("roster_id")): team for team in self.standings}
+        self.standings_rank_by_roster_id = {
+            int(team.get("roster_id")): rank for rank, team in enumerate(self.standings, start=1)
+        }
+
+        # the NFL player dump is the same for every league and only read by the player mapping, so it is shared by all
+        # leagues run in the same process when there are shared report resources
+        if self.shared_resources:
+            self.player_data = self.shared_resources.get_sleeper_player_data(self)
+        else:
+            self.player_data = self.get_player_data()
 
         self.player_stats_data_by_week = {}
         self.player_projected_stats_data_by_week = {}
@@ -383,15 +417,11 @@ class LeagueData(BaseLeagueData):
                     base_team.team_id = team.get("roster_id")
 
                     opposite_key = 1 if matchup.index(team) == 0 else 0
-                    team_standings_info = None
-                    opposite_team_standings_info = None
-                    team_rank = None
-                    for roster in self.standings:
-                        if int(roster.get("roster_id")) == int(base_team.team_id):
-                            team_standings_info = roster
-                            team_rank = int(self.standings.index(roster) + 1)
-                        elif int(roster.get("roster_id")) == int(matchup[opposite_key].get("roster_id")):
-                            opposite_team_standings_info = roster
+                    team_standings_info = self.standings_by_roster_id.get(int(base_team.team_id))
+                    opposite_team_standings_info = self.standings_by_roster_id.get(
+                        int(matchup[opposite_key].get("roster_id"))
+                    )
+                    team_rank = self.standings_rank_by_roster_id.get(int(base_team.team_id))
 
                     team_division = None
                     if self.league.has_divisions:
@@ -613,6 +643,9 @@ class LeagueData(BaseLeagueData):
                             for flex_position, positions in self.league.get_flex_positions_dict().items():
                                 if base_position in positions:
                                     base_player.eligible_positions.add(flex_position)
+                        base_player.eligible_positions_mask = self.league.get_positions_mask(
+                            base_player.eligible_positions
+                        )
 
                         if player["starter"]:
 
@@ -691,7 +724,7 @@ class LeagueData(BaseLeagueData):
                                 team_filled_positions.pop(team_filled_positions.index(base_player.selected_position))
 
                             else:
-                                logger.debug(f"\n{json.dumps(player, indent=2)}")
+                                logger.debug(f"\n{json.dumps(dict(player), indent=2)}")
                                 raise ValueError("Player position missing! Check data!")
                             league_team.projected_points += base_player.projected_points
                         else:
@@ -2,20 +2,25 @@ __author__ = "Wren J. R. (uberfastman)"
 __email__ = "uberfastman@uberfastman.dev"
 
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-# from collections import defaultdict
-# from concurrent.futures import ThreadPoolExecutor
 from statistics import median
-from typing import Union, List, Callable
+from typing import Union, List, Callable, Dict, Any, Type
 
+from camel_converter import to_snake
+from requests.exceptions import HTTPError
 from yfpy.data import Data
-from yfpy.models import League, Manager, Matchup, Team, Player, RosterPosition
+from yfpy.models import League, Manager, Matchup, Team, Player, RosterPosition, YahooFantasyObject
 from yfpy.query import YahooFantasySportsQuery
+from yfpy.utils import jsonify_data_to_file
 
 from dao.base import BaseMatchup, BaseTeam, BaseRecord, BaseManager, BasePlayer, BaseStat
 from dao.platforms.base.league import BaseLeagueData
+from utilities.http_client import get_rate_limiter
 from utilities.logger import get_logger
 from utilities.settings import settings
+from utilities.utils import open_for_atomic_write
 
 logger = get_logger(__name__, propagate=False)
 
@@ -23,6 +28,11 @@ logger = get_logger(__name__, propagate=False)
 logging.getLogger("yfpy.query").setLevel(level=logging.INFO)
 logging.getLogger("yfpy.data").setLevel(level=logging.INFO)
 
+# number of times a Yahoo query is retried after Yahoo throttles it with a 999 status code
+YAHOO_RATE_LIMIT_RETRIES = 3
+# number of seconds all Yahoo queries are held back after Yahoo throttles a query (doubled for every retry)
+YAHOO_RATE_LIMIT_PAUSE_SECONDS = 15
+
 
 # noinspection DuplicatedCode
 class LeagueData(BaseLeagueData):
@@ -48,8 +58,13 @@ class LeagueData(BaseLeagueData):
 
         self.game_id = game_id or settings.platform_settings.yahoo_game_id
 
-        self.yahoo_data = Data(self.league.data_dir, save_data=self.league.save_data, dev_offline=self.league.offline)
+        # Yahoo queries of every league in the process share one rate limit to avoid Yahoo 999 rate limiting errors
+        self.rate_limiter = get_rate_limiter(
+            "fantasysports.yahooapis.com", settings.platform_settings.yahoo_requests_per_second
+        )
         self.yahoo_query = None
+        # the YFPY query is shared by every Yahoo query thread, so only one of them refreshes its access token
+        self.authentication_lock: threading.Lock = threading.Lock()
 
         self._authenticate()
 
@@ -80,13 +95,66 @@ class LeagueData(BaseLeagueData):
             save_json_to_var_only=True
         )
 
+    def _refresh_access_token(self) -> None:
+        """Re-authenticate the shared YFPY query once when its access token has expired (or is about to expire) instead
+        of letting every concurrent query get an unauthorized response and re-authenticate it at the same time.
+        """
+        with self.authentication_lock:
+            if not self.yahoo_query.oauth.token_is_valid():
+                logger.debug("Refreshing expired Yahoo access token.")
+                # YFPY replaces the OAuth session of the query with one using a refreshed access token
+                self.yahoo_query._authenticate()
+
+    def _fetch(self, query_name: str, yf_query: Callable, params: Dict[str, Any] = None) -> Any:
+        """Run a YFPY query through the rate limiter shared by all Yahoo queries with a valid access token, retrying it
+        after Yahoo rate limiting errors.
+        """
+        for attempt in range(YAHOO_RATE_LIMIT_RETRIES + 1):
+            self.rate_limiter.acquire()
+            self._refresh_access_token()
+            try:
+                return Data.fetch(yf_query, params)
+            except HTTPError as e:
+                # YFPY raises an HTTP error about rate limiting when Yahoo responds with a 999 status code
+                if "rate limiting" not in str(e) or attempt == YAHOO_RATE_LIMIT_RETRIES:
+                    raise
+                pause_seconds = YAHOO_RATE_LIMIT_PAUSE_SECONDS * 2 ** attempt
+                logger.warning(
+                    f"Yahoo rate limiting query for \"{query_name}\". Retrying in {pause_seconds} seconds..."
+                )
+                self.rate_limiter.pause(pause_seconds)
+
+    def _retrieve(self, file_name: str, yf_query: Callable, params: Dict[str, str] = None,
+                  data_type_class: Type[YahooFantasyObject] = None, new_data_dir: Path = None) -> Any:
+        """Thread-safe replacement for the YFPY Data.retrieve method that rate limits Yahoo queries (retrying them after
+        Yahoo rate limiting errors) and saves the retrieved data atomically.
+        """
+        data_dir = Path(new_data_dir or self.league.data_dir)
+
+        if self.league.offline:
+            # a new YFPY data object is used for every load since it keeps the data directory of its last load
+            return Data(data_dir, dev_offline=True).load(file_name, data_type_class=data_type_class)
+
+        data = self._fetch(file_name, yf_query, params)
+
+        if self.league.save_data:
+            with open_for_atomic_write(data_dir / f"{file_name}.json") as data_out:
+                # save lists of objects as lists of single-key dictionaries with object values like YFPY does
+                jsonify_data_to_file(
+                    [{to_snake(el.__class__.__name__): el} for el in data] if isinstance(data, list) else data,
+                    data_out
+                )
+            logger.debug(f"Data saved locally to: {data_dir / f'{file_name}.json'}")
+
+        return data
+
     def get_player_data(self, player_key: str, week: int = None):
         # YAHOO API QUERY: run query to retrieve stats for specific player for chosen week if supplied, else for season
         params = {"player_key": player_key}
         if week:
             params["chosen_week"] = week
 
-            return self.yahoo_data.retrieve(
+            return self._retrieve(
                 player_key,
                 self.yahoo_query.get_player_stats_by_week,
                 params=params,
@@ -97,7 +165,7 @@ class LeagueData(BaseLeagueData):
                 data_type_class=Player
             )
         else:
-            return self.yahoo_data.retrieve(
+            return self._retrieve(
                 player_key,
                 self.yahoo_query.get_player_stats_for_season,
                 params=params,
@@ -105,12 +173,33 @@ class LeagueData(BaseLeagueData):
                 data_type_class=Player
             )
 
+    def get_player_points_by_week(self, player_keys: List[str], week: int) -> Dict[str, float]:
+        # YAHOO API QUERY: run query to retrieve stats for multiple players (up to the Yahoo limit of 25 players per
+        # request) for chosen week
+        league_players = self._fetch(
+            f"week_{week}-player_points",
+            self.yahoo_query.query,
+            params={
+                "url": (
+                    f"https://fantasysports.yahooapis.com/fantasy/v2/league/{self.yahoo_query.get_league_key()}/"
+                    f"players;player_keys={','.join(player_keys)}/stats;type=week;week={week}"
+                ),
+                "data_key_list": ["league", "players"]
+            }
+        )
+
+        player_points = {}
+        for league_player in (league_players if isinstance(league_players, list) else [league_players]):
+            player: Player = league_player.get("player") if isinstance(league_player, dict) else league_player
+            player_points[str(player.player_key)] = player.player_points_value or 0.0
+        return player_points
+
     # noinspection PyTypeChecker
     def map_data_to_base(self):
         logger.debug(f"Retrieving {self.platform_display} league data and mapping it to base objects.")
 
         # YAHOO API QUERY: run query to retrieve all league information, including current standings
-        league_info: League = self.yahoo_data.retrieve(
+        league_info: League = self._retrieve(
             f"{self.league.league_id}-league_info",
             self.yahoo_query.get_league_info,
             data_type_class=League,
@@ -156,6 +245,8 @@ class LeagueData(BaseLeagueData):
 
         self.league.player_data_by_week_function = self.get_player_data
         self.league.player_data_by_week_key = "player_points_value"
+        self.league.player_points_by_week_batch_function = self.get_player_points_by_week
+        self.league.player_points_by_week_batch_size = 25
 
         position: RosterPosition
         for position in league_info.settings.roster_positions:
@@ -177,21 +268,44 @@ class LeagueData(BaseLeagueData):
                 else []
             )
 
-        logger.debug("Getting Yahoo matchups by week data.")
-        # TODO: figure out how to write to json files (json.dump) in a thread-safe manner
-        # YAHOO API QUERY: run yahoo queries to retrieve matchups by week for the entire season
-        matchups_by_week = {}
+        logger.debug("Getting Yahoo matchups by week and rosters by week data.")
+        # YAHOO API QUERY: run yahoo queries to retrieve matchups by week for the entire season and team rosters by week
+        # for the season up to the current week concurrently (with all queries sharing the Yahoo rate limit)
+        with ThreadPoolExecutor(max_workers=settings.platform_settings.yahoo_fetch_workers) as executor:
+            matchups_by_week_futures = {
+                str(wk): executor.submit(
+                    self._retrieve,
+                    f"week_{wk}-matchups_by_week",
+                    self.yahoo_query.get_league_matchups_by_week,
+                    params={"chosen_week": str(wk)},
+                    new_data_dir=(
+                            self.league.data_dir / str(self.league.season) / self.league.league_id / f"week_{str(wk)}"
+                    )
+                ) for wk in range(self.start_week, self.league.num_regular_season_weeks + 1)
+            }
+            rosters_by_week_futures = {
+                str(wk): {
+                    str(team.team_id): executor.submit(
+                        self._retrieve,
+                        f"{team.team_id}-{str(team.name.decode('utf-8')).replace(' ', '_')}-roster",
+                        self.yahoo_query.get_team_roster_player_info_by_week,
+                        params={"team_id": str(team.team_id), "chosen_week": str(wk)},
+                        new_data_dir=(
+                                self.league.data_dir / str(self.league.season) / self.league.league_id
+                                / f"week_{str(wk)}" / "rosters"
+                        )
+                    ) for team in league_info.standings.teams
+                } for wk in range(self.start_week, self.league.week_for_report + 1)
+            }
+
+            matchups_by_week = {week: future.result() for week, future in matchups_by_week_futures.items()}
+            rosters_by_week = {
+                week: {team_id: future.result() for team_id, future in team_futures.items()}
+                for week, team_futures in rosters_by_week_futures.items()
+            }
+
         median_score_by_week = {}
         for wk in range(self.start_week, self.league.num_regular_season_weeks + 1):
-            matchups_by_week[str(wk)] = self.yahoo_data.retrieve(
-                f"week_{wk}-matchups_by_week",
-                self.yahoo_query.get_league_matchups_by_week,
-                params={"chosen_week": str(wk)},
-                new_data_dir=(
-                        self.league.data_dir / str(self.league.season) / self.league.league_id / f"week_{str(wk)}"
-                )
-            )
-
             if wk <= self.league.week_for_report:
                 scores = []
                 matchup: Matchup
@@ -350,24 +464,6 @@ class LeagueData(BaseLeagueData):
                 # add matchup to league matchups by week
                 self.league.matchups_by_week[str(week)].append(base_matchup)
 
-        logger.debug("Getting Yahoo rosters by week data.")
-        # YAHOO API QUERY: run yahoo queries to retrieve team rosters by week for the season up to the current week
-        rosters_by_week = {}
-        for wk in range(self.start_week, self.league.week_for_report + 1):
-            rosters_by_week[str(wk)] = {
-                str(team.team_id):
-                    self.yahoo_data.retrieve(
-                        f"{team.team_id}-{str(team.name.decode('utf-8')).replace(' ', '_')}-roster",
-                        self.yahoo_query.get_team_roster_player_info_by_week,
-                        params={"team_id": str(team.team_id), "chosen_week": str(wk)},
-                        new_data_dir=(
-                                self.league.data_dir / str(
-                            self.league.season) / self.league.league_id / f"week_{str(wk)}"
-                                / "rosters"
-                        )
-                    ) for team in league_info.standings.teams
-            }
-
         for week, rosters in rosters_by_week.items():
             self.league.players_by_week[str(week)] = {}
             roster: List[Player]
@@ -417,6 +513,7 @@ class LeagueData(BaseLeagueData):
                         for flex_position, positions in self.league.get_flex_positions_dict().items():
                             if base_position in positions:
                                 base_player.eligible_positions.add(flex_position)
+                    base_player.eligible_positions_mask = self.league.get_positions_mask(base_player.eligible_positions)
 
                     for stat in player.stats:
                         base_stat = BaseStat()
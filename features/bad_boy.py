@@ -9,11 +9,11 @@ from pathlib import Path
 from string import capwords
 from typing import Dict, Any, Union, Optional
 
-import requests
 from bs4 import BeautifulSoup
 
 from features.base.feature import BaseFeature
 from utilities.constants import nfl_team_abbreviations, nfl_team_abbreviation_conversions
+from utilities.http_client import get_http_session
 from utilities.logger import get_logger
 
 logger = get_logger(__name__, propagate=False)
@@ -58,7 +58,7 @@ class BadBoyFeature(BaseFeature):
     def _get_feature_data(self) -> None:
         logger.debug("Retrieving bad boy feature data from the web.")
 
-        res = requests.get(self.feature_web_base_url)
+        res = get_http_session().get(self.feature_web_base_url)
         soup = BeautifulSoup(res.text, "html.parser")
         cdata = re.search("var sitedata = (.*);", soup.find(string=re.compile("CDATA"))).group(1)
         ajax_nonce = json.loads(cdata)["ajax_nonce"]
@@ -94,7 +94,7 @@ class BadBoyFeature(BaseFeature):
                 f"&searches={{\"Team\":\"{team}\"}}"
             )
 
-            res_json = requests.post(usa_today_nfl_arrest_url, data=body, headers=headers).json()
+            res_json = get_http_session().post(usa_today_nfl_arrest_url, data=body, headers=headers).json()
 
             arrests_data = res_json["data"]["Result"]
 
@@ -135,7 +135,7 @@ class BadBoyFeature(BaseFeature):
                         f"&searches={{\"Team\":\"{team}\"}}"
                     )
 
-                    r = requests.post(usa_today_nfl_arrest_url, data=body, headers=headers)
+                    r = get_http_session().post(usa_today_nfl_arrest_url, data=body, headers=headers)
                     resp_json = r.json()
 
                     arrests_data = resp_json["data"]["Result"]
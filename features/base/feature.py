@@ -6,9 +6,10 @@ import os
 from abc import ABC, abstractmethod
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from utilities.logger import get_logger
+from utilities.utils import open_for_atomic_write
 
 logger = get_logger(__name__, propagate=False)
 
@@ -49,7 +50,7 @@ class BaseFeature(ABC):
                 data_retrieved_from_web = True
 
                 if self.save_data:
-                    self._save_feature_data()
+                    self.save_feature_data()
             else:
                 # load saved feature data (must have previously run application with -s flag)
                 self._load_feature_data()
@@ -87,21 +88,25 @@ class BaseFeature(ABC):
                 f"SAVED DATA!"
             )
 
-    def _save_feature_data(self) -> None:
-        logger.debug(f"Saving {self.feature_type_title} data...")
+    def save_feature_data(self, data_dir: Optional[Path] = None) -> None:
+        """Save the feature data to its own data directory, or to the given data directory of another league.
+        """
+        data_dir = Path(data_dir) if data_dir else self.data_dir
+
+        logger.debug(f"Saving {self.feature_type_title} data to {data_dir}...")
 
         # create output data directory if it does not exist
-        if not self.data_dir.is_dir():
-            os.makedirs(self.data_dir, exist_ok=True)
+        if not data_dir.is_dir():
+            os.makedirs(data_dir, exist_ok=True)
 
         # save feature data locally
         if self.feature_data:
-            with open(self.feature_data_file_path, "w", encoding="utf-8") as feature_data_out:
+            with open_for_atomic_write(data_dir / self.feature_data_file_path.name) as feature_data_out:
                 json.dump(self.feature_data, feature_data_out, ensure_ascii=False, indent=2)
 
         # save raw feature data locally
         if self.raw_feature_data:
-            with open(self.raw_feature_data_file_path, "w", encoding="utf-8") as feature_raw_data_out:
+            with open_for_atomic_write(data_dir / self.raw_feature_data_file_path.name) as feature_raw_data_out:
                 json.dump(self.raw_feature_data, feature_raw_data_out, ensure_ascii=False, indent=2)
 
     @abstractmethod
@@ -6,10 +6,9 @@ from collections import OrderedDict
 from pathlib import Path
 from typing import List
 
-import requests
-
 from features.base.feature import BaseFeature
 from utilities.constants import nfl_team_abbreviations, nfl_team_abbreviation_conversions
+from utilities.http_client import get_http_session
 from utilities.logger import get_logger
 
 logger = get_logger(__name__, propagate=False)
@@ -37,7 +36,7 @@ class BeefFeature(BaseFeature):
     def _get_feature_data(self):
         logger.debug("Retrieving beef feature data from the web.")
 
-        nfl_player_data = requests.get(self.feature_web_base_url).json()
+        nfl_player_data = get_http_session().get(self.feature_web_base_url).json()
         for player_sleeper_key, player_data_json in nfl_player_data.items():
 
             player_full_name = player_data_json.get("full_name", "")
@@ -5,11 +5,11 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, Union, Type
 
-import requests
 from bs4 import BeautifulSoup
 
 from features.base.feature import BaseFeature
 from utilities.constants import nfl_team_abbreviations, nfl_team_abbreviation_conversions
+from utilities.http_client import get_http_session
 from utilities.logger import get_logger
 from utilities.utils import normalize_player_name
 
@@ -66,7 +66,7 @@ class HighRollerFeature(BaseFeature):
             "user-agent": user_agent
         }
 
-        response = requests.get(self.feature_web_base_url, headers=headers)
+        response = get_http_session().get(self.feature_web_base_url, headers=headers)
 
         html_soup = BeautifulSoup(response.text, "html.parser")
         logger.debug(f"Response URL: {response.url}")
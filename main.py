@@ -17,7 +17,9 @@ from integrations.discord import DiscordIntegration
 from integrations.drive import GoogleDriveIntegration
 from integrations.groupme import GroupMeIntegration
 from integrations.slack import SlackIntegration
+from report.batch import BatchReportRunner
 from report.builder import FantasyFootballReport
+from report.service import ReportService
 from utilities.app import check_github_for_updates
 from utilities.logger import get_logger
 from utilities.settings import settings
@@ -80,6 +82,9 @@ def main(argv):
         "      -p, --playoff-prob-sims               Number of Monte Carlo playoff probability simulations to run.\n"
         "      -b, --break-ties                      Break ties in metric rankings.\n"
         "      -q, --disqualify-ce                   Automatically disqualify teams ineligible for coaching efficiency metric.\n"
+        "      -j, --batch-jobs <jobs_file>          Generate the reports of every league in a JSON file of jobs (each with \"platform\", \"league_id\", \"season\", and \"week\") concurrently instead of a single report.\n"
+        "      -a, --report-service                  Run a local report service that queues report jobs submitted over HTTP (see REPORT_SERVICE_* settings) instead of a single report.\n"
+        "      -x, --what-if <scenario>              Calculate playoff chances for a what-if scenario instead of generating the report (repeatable), formatted as \"[NAME=]TEAM:W|L[:WEEK][,...]\" where TEAM is a team ID or name and omitting WEEK applies to all remaining weeks.\n"
         "\n"
         "    For Developers:\n"
         "      -o, --offline                         Run OFFLINE for development. Must have previously run report with -s option.\n"
@@ -87,7 +92,7 @@ def main(argv):
     )
 
     try:
-        opts, args = getopt.getopt(argv, "hdf:l:w:k:g:y:srp:bqout")
+        opts, args = getopt.getopt(argv, "hdf:l:w:k:g:y:srp:bqj:ax:out")
     except getopt.GetoptError:
         print(usage_str)
         sys.exit(2)
@@ -132,6 +137,12 @@ def main(argv):
             options_dict["break_ties"] = True
         elif opt in ("-q", "--disqualify-ce"):
             options_dict["dq_ce"] = True
+        elif opt in ("-j", "--batch-jobs"):
+            options_dict["batch_jobs"] = arg
+        elif opt in ("-a", "--report-service"):
+            options_dict["report_service"] = True
+        elif opt in ("-x", "--what-if"):
+            options_dict.setdefault("playoff_scenarios", []).append(arg)
 
         # for developers
         elif opt in ("-o", "--offline"):
@@ -292,6 +303,34 @@ if __name__ == "__main__":
         # check to see if the current app is behind any commits, and provide option to update and re-run if behind
         up_to_date = check_github_for_updates(options.get("use_default", False))
 
+    if options.get("batch_jobs"):
+        batch_report_runner = BatchReportRunner(
+            BatchReportRunner.load_jobs(options.get("batch_jobs")),
+            refresh_web_data=options.get("refresh_web_data", False),
+            playoff_prob_sims=options.get("playoff_prob_sims", None),
+            break_ties=options.get("break_ties", False),
+            dq_ce=options.get("dq_ce", False),
+            save_data=options.get("save_data", False),
+            offline=options.get("offline", False),
+            test=options.get("test", False)
+        )
+        batch_report_runner.run()
+        # exit with an error if the report of any league in the batch failed
+        sys.exit(1 if batch_report_runner.batch_summary["num_failed"] > 0 else 0)
+
+    if options.get("report_service"):
+        report_service = ReportService(
+            refresh_web_data=options.get("refresh_web_data", False),
+            playoff_prob_sims=options.get("playoff_prob_sims", None),
+            break_ties=options.get("break_ties", False),
+            dq_ce=options.get("dq_ce", False),
+            save_data=options.get("save_data", False),
+            offline=options.get("offline", False),
+            test=options.get("test", False)
+        )
+        report_service.serve_forever()
+        sys.exit(0)
+
     report = select_league(
         options.get("use_default", False),
         options.get("week", None),
@@ -307,6 +346,11 @@ if __name__ == "__main__":
         options.get("save_data", False),
         options.get("offline", False),
         options.get("test", False))
+
+    if options.get("playoff_scenarios"):
+        report.calculate_playoff_scenarios(options.get("playoff_scenarios"))
+        sys.exit(0)
+
     report_pdf: Path = report.create_pdf_report()
 
     upload_message = ""
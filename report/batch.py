@@ -0,0 +1,294 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "uberfastman@uberfastman.dev"
+
+import json
+import os
+import shutil
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Any, Callable, Tuple, Union, Optional, Set
+
+from dao.base import BaseLeague
+from dao.platforms.sleeper import LeagueData as SleeperLeagueData
+from features.bad_boy import BadBoyFeature
+from features.beef import BeefFeature
+from features.high_roller import HighRollerFeature
+from report.builder import FantasyFootballReport
+from utilities.app import get_inactive_players
+from utilities.logger import get_logger
+from utilities.settings import settings
+
+logger = get_logger(__name__, propagate=False)
+
+
+class SharedReportResources(object):
+    """League-independent report resources (feature data by season, inactive players by season and week, and the Sleeper
+    NFL player dump by season) that are retrieved once and shared by every league report run in the same process.
+
+    When saving data, each shared resource is also saved to the data directory of every league that uses it, so that
+    any of those leagues can later be run offline on its own.
+    """
+
+    def __init__(self, refresh_web_data: bool = False, save_data: bool = False, offline: bool = False,
+                 max_age: Optional[timedelta] = None):
+        logger.debug("Initializing shared report resources.")
+
+        self.refresh_web_data: bool = refresh_web_data
+        self.save_data: bool = save_data
+        self.offline: bool = offline
+        # resources older than the max age are retrieved again (for long-running processes)
+        self.max_age: Optional[timedelta] = max_age
+
+        # resource key -> (time of retrieval, resource, data directory of the league for which it was retrieved)
+        self.resources: Dict[Tuple[Any, ...], Tuple[datetime, Any, Path]] = {}
+        # resource key -> data directories of the leagues to which the resource has been saved
+        self.resource_league_data_dirs: Dict[Tuple[Any, ...], Set[Path]] = defaultdict(set)
+        # one lock per resource so concurrent reports wait for a resource being retrieved instead of retrieving it again
+        self.resource_locks: Dict[Tuple[Any, ...], threading.Lock] = defaultdict(threading.Lock)
+        self.resource_locks_lock: threading.Lock = threading.Lock()
+
+    @staticmethod
+    def _get_league_data_dir(league: BaseLeague) -> Path:
+        return Path(league.data_dir) / str(league.season) / str(league.league_id)
+
+    def _get_resource(self, key: Tuple[Any, ...], league: BaseLeague, retrieve_resource: Callable[[], Any],
+                      save_resource: Callable[[Any, Path], None]) -> Any:
+        """Get a shared resource, retrieving it for the league if it has not been retrieved yet (or has expired), and
+        otherwise saving the shared resource (retrieved for the league with the given data directory) for the league.
+        """
+        with self.resource_locks_lock:
+            resource_lock = self.resource_locks[key]
+
+        league_data_dir = self._get_league_data_dir(league)
+        with resource_lock:
+            if key in self.resources and (
+                    not self.max_age or datetime.now() - self.resources[key][0] <= self.max_age):
+                logger.debug(f"Using shared report resource: {key}")
+
+                if self.save_data and not self.offline and league_data_dir not in self.resource_league_data_dirs[key]:
+                    save_resource(self.resources[key][1], self.resources[key][2])
+            else:
+                self.resources[key] = (datetime.now(), retrieve_resource(), league_data_dir)
+                self.resource_league_data_dirs[key].clear()
+
+            self.resource_league_data_dirs[key].add(league_data_dir)
+            return self.resources[key][1]
+
+    def get_bad_boy_stats(self, league: BaseLeague) -> BadBoyFeature:
+        return self._get_resource(
+            ("bad_boy", league.season),
+            league,
+            lambda: league.get_bad_boy_stats(self.refresh_web_data, self.save_data, self.offline),
+            lambda feature, _: feature.save_feature_data(self._get_league_data_dir(league))
+        )
+
+    def get_beef_stats(self, league: BaseLeague) -> BeefFeature:
+        return self._get_resource(
+            ("beef", league.season),
+            league,
+            lambda: league.get_beef_stats(self.refresh_web_data, self.save_data, self.offline),
+            lambda feature, _: feature.save_feature_data(self._get_league_data_dir(league))
+        )
+
+    def get_high_roller_stats(self, league: BaseLeague) -> HighRollerFeature:
+        return self._get_resource(
+            ("high_roller", league.season),
+            league,
+            lambda: league.get_high_roller_stats(self.refresh_web_data, self.save_data, self.offline),
+            lambda feature, _: feature.save_feature_data(self._get_league_data_dir(league))
+        )
+
+    def get_inactive_players(self, week: int, league: BaseLeague) -> List[str]:
+        def save_inactive_players_data(_, source_league_data_dir: Path) -> None:
+            # copy the saved injury report and player pages (see get_inactive_players) of the week
+            source_week_data_dir = source_league_data_dir / f"week_{week}"
+            week_data_dir = self._get_league_data_dir(league) / f"week_{week}"
+            if not week_data_dir.is_dir():
+                os.makedirs(week_data_dir, exist_ok=True)
+
+            injury_report_file_path = source_week_data_dir / f"week_{week}-player_status_data.html"
+            if injury_report_file_path.is_file():
+                shutil.copy2(injury_report_file_path, week_data_dir / injury_report_file_path.name)
+            if (source_week_data_dir / "player_statuses").is_dir():
+                shutil.copytree(
+                    source_week_data_dir / "player_statuses", week_data_dir / "player_statuses", dirs_exist_ok=True
+                )
+
+        return self._get_resource(
+            ("inactive_players", league.season, int(week)),
+            league,
+            lambda: get_inactive_players(week, league),
+            save_inactive_players_data
+        )
+
+    def get_sleeper_player_data(self, sleeper_league_data: SleeperLeagueData) -> Dict[str, Dict[str, Any]]:
+        return self._get_resource(
+            ("sleeper_player_data", sleeper_league_data.league.season),
+            sleeper_league_data.league,
+            sleeper_league_data.get_player_data,
+            lambda player_data, _: sleeper_league_data.save_player_data(player_data)
+        )
+
+
+def validate_report_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    if not isinstance(job, dict):
+        raise ValueError(f"Report job {job} must be a JSON object.")
+
+    missing_job_keys = [key for key in ["platform", "league_id", "season", "week"] if job.get(key) is None]
+    if missing_job_keys:
+        raise ValueError(f"Report job {job} is missing required key(s): {', '.join(missing_job_keys)}")
+
+    if job["platform"] not in settings.supported_platforms_list:
+        raise ValueError(f"Report job {job} has unsupported platform: {job['platform']}")
+
+    return job
+
+
+def run_report_job(job: Dict[str, Any], shared_resources: SharedReportResources, playoff_prob_sims: int = None,
+                   break_ties: bool = False, dq_ce: bool = False, test: bool = False) -> Dict[str, Any]:
+    """Generate the report of a job (with the job overriding the given report options with any of its own
+    "playoff_prob_sims", "break_ties", "dq_ce", and "test" values) using the shared report resources, and summarize
+    its timings and failure instead of raising it.
+    """
+    job_summary = {
+        "platform": job["platform"],
+        "league_id": str(job["league_id"]),
+        "season": int(job["season"]),
+        "week": int(job["week"]),
+        "success": False,
+        "report": None,
+        "error": None,
+        "setup_seconds": None,
+        "report_seconds": None,
+        "total_seconds": None
+    }
+
+    begin = datetime.now()
+    try:
+        report = FantasyFootballReport(
+            week_for_report=int(job["week"]),
+            platform=job["platform"],
+            league_id=str(job["league_id"]),
+            game_id=job.get("game_id"),
+            season=int(job["season"]),
+            start_week=job.get("start_week"),
+            refresh_web_data=shared_resources.refresh_web_data,
+            playoff_prob_sims=job.get("playoff_prob_sims", playoff_prob_sims),
+            break_ties=job.get("break_ties", break_ties),
+            dq_ce=job.get("dq_ce", dq_ce),
+            save_data=shared_resources.save_data,
+            offline=shared_resources.offline,
+            test=job.get("test", test),
+            shared_resources=shared_resources
+        )
+        job_summary["setup_seconds"] = round((datetime.now() - begin).total_seconds(), 3)
+
+        report_begin = datetime.now()
+        job_summary["report"] = str(report.create_pdf_report())
+        job_summary["report_seconds"] = round((datetime.now() - report_begin).total_seconds(), 3)
+        job_summary["success"] = True
+
+    # a failed league must not stop the reports of any other leagues run in the same process
+    except (Exception, SystemExit) as e:
+        logger.exception(f"Report for {job['platform']} league {job['league_id']} failed: {repr(e)}")
+        job_summary["error"] = repr(e)
+
+    job_summary["total_seconds"] = round((datetime.now() - begin).total_seconds(), 3)
+
+    return job_summary
+
+
+class BatchReportRunner(object):
+    """Runner of the reports of several leagues in one process, which share league-independent resources and run
+    concurrently in a thread pool.
+
+    Each job is a dict with the "platform", "league_id", "season", and "week" of a report, and optionally its
+    "game_id" and "start_week".
+    """
+
+    def __init__(self, jobs: List[Dict[str, Any]], workers: int = None, refresh_web_data: bool = False,
+                 playoff_prob_sims: int = None, break_ties: bool = False, dq_ce: bool = False,
+                 save_data: bool = False, offline: bool = False, test: bool = False):
+        logger.debug("Initializing batch report runner.")
+
+        self.jobs: List[Dict[str, Any]] = jobs
+        self.workers: int = workers or settings.batch_report_workers
+        self.playoff_prob_sims: int = playoff_prob_sims
+        self.break_ties: bool = break_ties
+        self.dq_ce: bool = dq_ce
+        self.test: bool = test
+
+        self.shared_resources: SharedReportResources = SharedReportResources(refresh_web_data, save_data, offline)
+        # summary of the timings and failures of the last run
+        self.batch_summary: Optional[Dict[str, Any]] = None
+
+    @staticmethod
+    def load_jobs(jobs_file_path: Union[Path, str]) -> List[Dict[str, Any]]:
+        with open(jobs_file_path, "r", encoding="utf-8") as jobs_in:
+            jobs = json.load(jobs_in)
+
+        for job in jobs:
+            validate_report_job(job)
+
+        return jobs
+
+    def _run_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        return run_report_job(
+            job,
+            self.shared_resources,
+            playoff_prob_sims=self.playoff_prob_sims,
+            break_ties=self.break_ties,
+            dq_ce=self.dq_ce,
+            test=self.test
+        )
+
+    def run(self) -> Path:
+        """Run every job of the batch and write a summary of the timings and failures of each league report.
+
+        :return: path to the batch report summary file
+        """
+        logger.info(f"Running batch of {len(self.jobs)} league report(s) with {self.workers} worker(s)...")
+
+        begin = datetime.now()
+        if self.workers > 1 and len(self.jobs) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(self.jobs))) as executor:
+                job_summaries = list(executor.map(self._run_job, self.jobs))
+        else:
+            job_summaries = [self._run_job(job) for job in self.jobs]
+
+        self.batch_summary = batch_summary = {
+            "started": f"{begin:%Y-%m-%d %H:%M:%S}",
+            "total_seconds": round((datetime.now() - begin).total_seconds(), 3),
+            "num_jobs": len(job_summaries),
+            "num_failed": len([job_summary for job_summary in job_summaries if not job_summary["success"]]),
+            "jobs": job_summaries
+        }
+
+        if not settings.output_dir_path.is_dir():
+            os.makedirs(settings.output_dir_path)
+
+        batch_summary_file_path = settings.output_dir_path / f"batch_report_summary-{begin:%Y%m%d_%H%M%S}.json"
+        with open(batch_summary_file_path, "w", encoding="utf-8") as batch_summary_out:
+            json.dump(batch_summary, batch_summary_out, ensure_ascii=False, indent=2)
+
+        for job_summary in job_summaries:
+            if job_summary["success"]:
+                logger.info(
+                    f"    {job_summary['platform']} league {job_summary['league_id']} week {job_summary['week']}: "
+                    f"{job_summary['total_seconds']}s -> {job_summary['report']}"
+                )
+            else:
+                logger.error(
+                    f"    {job_summary['platform']} league {job_summary['league_id']} week {job_summary['week']}: "
+                    f"FAILED after {job_summary['total_seconds']}s with {job_summary['error']}"
+                )
+
+        logger.info(
+            f"...completed batch of {batch_summary['num_jobs']} league report(s) ({batch_summary['num_failed']} "
+            f"failed) in {batch_summary['total_seconds']}s. Summary saved to {batch_summary_file_path}"
+        )
+
+        return batch_summary_file_path
@@ -3,22 +3,27 @@ __email__ = "uberfastman@uberfastman.dev"
 
 import os
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Any, Tuple, Optional, TYPE_CHECKING
 
 from calculate.coaching_efficiency import CoachingEfficiency
-from calculate.metrics import CalculateMetrics
+from calculate.metrics import CalculateMetrics, ZScoreAccumulator
 from calculate.points_by_position import PointsByPosition
 from calculate.season_averages import SeasonAverageCalculator
 from dao.base import BaseLeague, BaseTeam
 from report.data import ReportData
 from report.pdf.generator import PdfGenerator
-from utilities.app import league_data_factory, patch_http_connection_pool
+from report.snapshots import ReportDataSnapshots
+from utilities.app import league_data_factory, patch_http_connection_pool, get_inactive_players
 from utilities.logger import get_logger
 from utilities.settings import settings
 from utilities.utils import format_platform_display
 
+if TYPE_CHECKING:
+    from report.batch import SharedReportResources
+
 logger = get_logger(__name__, propagate=False)
 
 
@@ -36,11 +41,13 @@ class FantasyFootballReport(object):
                  dq_ce=False,
                  save_data=False,
                  offline=False,
-                 test=False):
+                 test=False,
+                 shared_resources: Optional["SharedReportResources"] = None):
 
         logger.debug("Instantiating fantasy football report.")
 
-        patch_http_connection_pool(maxsize=100)
+        # size the connection pools of platform libraries that do not use the shared HTTP session like its own pools
+        patch_http_connection_pool(maxsize=settings.http_pool_maxsize)
 
         # settings
         base_dir = Path(__file__).parent.parent
@@ -74,6 +81,10 @@ class FantasyFootballReport(object):
 
         self.offline = offline
         self.test = test
+        # league-independent resources shared with the reports of other leagues run in the same process
+        self.shared_resources = shared_resources
+        # inactive players by week retrieved for this report when there are no shared report resources
+        self.inactive_players_by_week: Dict[str, List[str]] = {}
 
         f_str_newline = '\n'
         # verification output message
@@ -111,7 +122,8 @@ class FantasyFootballReport(object):
             start_week=start_week,
             week_for_report=week_for_report,
             save_data=self.save_data,
-            offline=self.offline
+            offline=self.offline,
+            shared_resources=self.shared_resources
         )
 
         delta = datetime.now() - begin
@@ -127,19 +139,28 @@ class FantasyFootballReport(object):
             self.playoff_probs = None
 
         if settings.report_settings.league_bad_boy_rankings_bool:
-            self.bad_boy_stats = self.league.get_bad_boy_stats(self.refresh_web_data, self.save_data, self.offline)
+            if self.shared_resources:
+                self.bad_boy_stats = self.shared_resources.get_bad_boy_stats(self.league)
+            else:
+                self.bad_boy_stats = self.league.get_bad_boy_stats(self.refresh_web_data, self.save_data, self.offline)
         else:
             self.bad_boy_stats = None
 
         if settings.report_settings.league_beef_rankings_bool:
-            self.beef_stats = self.league.get_beef_stats(self.refresh_web_data, self.save_data, self.offline)
+            if self.shared_resources:
+                self.beef_stats = self.shared_resources.get_beef_stats(self.league)
+            else:
+                self.beef_stats = self.league.get_beef_stats(self.refresh_web_data, self.save_data, self.offline)
         else:
             self.beef_stats = None
 
         if settings.report_settings.league_high_roller_rankings_bool:
-            self.high_roller_stats = self.league.get_high_roller_stats(
-                self.refresh_web_data, self.save_data, self.offline
-            )
+            if self.shared_resources:
+                self.high_roller_stats = self.shared_resources.get_high_roller_stats(self.league)
+            else:
+                self.high_roller_stats = self.league.get_high_roller_stats(
+                    self.refresh_web_data, self.save_data, self.offline
+                )
         else:
             self.high_roller_stats = None
 
@@ -149,6 +170,47 @@ class FantasyFootballReport(object):
             f"\"{self.league.name.upper()}\" ({self.league_id}) week {self.league.week_for_report} report."
         )
 
+    def get_inactive_players(self, week: int, league: BaseLeague) -> List[str]:
+        # retrieve the inactive players of each week once per report (or once per process with shared report resources)
+        # since they are used both to hash the inputs of report data snapshots and to disqualify teams from coaching
+        # efficiency
+        if self.shared_resources:
+            return self.shared_resources.get_inactive_players(week, league)
+
+        if str(week) not in self.inactive_players_by_week:
+            self.inactive_players_by_week[str(week)] = get_inactive_players(week, league)
+        return self.inactive_players_by_week[str(week)]
+
+    def get_weeks_teams_results(self, weeks: List[int], weekly_metrics: Dict[int, Dict[str, Any]]
+                                ) -> Dict[int, Tuple[Dict[str, BaseTeam], List[List[Any]]]]:
+        logger.debug(f"Calculating team results for {len(weeks)} week(s).")
+
+        # index every roster slot position of the league before the weeks are split across threads so that the
+        # concurrent weeks only read the league roster slot index
+        self.league.get_positions_mask(
+            list(self.league.roster_position_counts.keys()) + self.league.bench_positions + [
+                position for flex_position, flex_positions in self.league.get_flex_positions_dict().items()
+                for position in [flex_position] + flex_positions
+            ]
+        )
+
+        def get_week_teams_results(week: int) -> Tuple[Dict[str, BaseTeam], List[List[Any]]]:
+            return ReportData.get_week_teams_results(
+                self.league,
+                week,
+                CalculateMetrics(self.league_id, self.league.num_playoff_slots, self.playoff_prob_sims),
+                weekly_metrics[week],
+                self.dq_ce,
+                self.get_inactive_players
+            )
+
+        workers = settings.report_weekly_metrics_workers
+        if workers > 1 and len(weeks) > 1:
+            with ThreadPoolExecutor(max_workers=min(workers, len(weeks))) as executor:
+                return dict(zip(weeks, executor.map(get_week_teams_results, weeks)))
+        else:
+            return {week: get_week_teams_results(week) for week in weeks}
+
     def create_pdf_report(self) -> Path:
         logger.debug("Creating fantasy football report PDF.")
 
@@ -169,7 +231,59 @@ class FantasyFootballReport(object):
         season_weekly_top_scorers = []
         season_weekly_low_scorers = []
         season_weekly_highest_ce = []
-        season_weekly_teams_results = []
+        z_score_accumulator = ZScoreAccumulator()
+
+        # reuse the report data of completed weeks whose inputs have not changed since it was calculated (the week for
+        # the report is always calculated since its full report data is used to create the report), hashing the inputs
+        # of every week before they are modified by the report calculations
+        report_data_snapshots = None
+        week_report_data_snapshots = {}
+        if settings.report_data_snapshots_bool:
+            report_data_snapshots = ReportDataSnapshots(
+                self.league, self.break_ties, self.dq_ce, self.get_inactive_players
+            )
+            for week in range(self.league.start_week, self.league.week_for_report):
+                week_report_data_snapshot = report_data_snapshots.load(week)
+                if week_report_data_snapshot:
+                    week_report_data_snapshots[week] = week_report_data_snapshot
+        weeks_to_calculate = [
+            week for week in range(self.league.start_week, self.league.week_for_report + 1)
+            if week not in week_report_data_snapshots
+        ]
+
+        # calculate the optimal points and coaching efficiency of every team for every week at once with a shared
+        # roster slot model so each week of report data only looks up its results
+        coaching_efficiency = CoachingEfficiency(self.league)
+        coaching_efficiency.execute_season_coaching_efficiency(
+            {str(week): self.league.teams_by_week.get(str(week)) for week in weeks_to_calculate},
+            workers=settings.coaching_efficiency_workers
+        )
+
+        # calculate luck for every week at once from the season score matrix
+        season_custom_weekly_matchups = {
+            str(week): self.league.get_custom_weekly_matchups(week)
+            for week in range(self.league.start_week, self.league.week_for_report + 1)
+        }
+        season_luck = CalculateMetrics.calculate_season_luck(
+            weeks_to_calculate, self.league, season_custom_weekly_matchups
+        )
+
+        # metrics of each week that do not carry over from previous weeks
+        weekly_metrics: Dict[int, Dict[str, Any]] = {
+            week: {
+                "coaching_efficiency": coaching_efficiency,
+                "luck": season_luck[str(week)],
+                "playoff_probs": self.playoff_probs,
+                "bad_boy_stats": self.bad_boy_stats,
+                "beef_stats": self.beef_stats,
+                "high_roller_stats": self.high_roller_stats
+            } for week in weeks_to_calculate
+        }
+
+        # calculate the team stats and points by position of every week up front (concurrently, since each week only
+        # updates its own teams and players), which leaves only the records, standings, z-scores, and time series that
+        # carry over from week to week to be combined in week order below
+        weeks_teams_results = self.get_weeks_teams_results(weeks_to_calculate, weekly_metrics)
 
         week_counter = self.league.start_week
         while week_counter <= self.league.week_for_report:
@@ -177,67 +291,70 @@ class FantasyFootballReport(object):
             week_for_report = self.league.week_for_report
             metrics_calculator = CalculateMetrics(self.league_id, self.league.num_playoff_slots, self.playoff_prob_sims)
 
-            custom_weekly_matchups = self.league.get_custom_weekly_matchups(week_counter)
-
-            report_data = ReportData(
-                league=self.league,
-                season_weekly_teams_results=season_weekly_teams_results,
-                week_counter=week_counter,
-                week_for_report=week_for_report,
-                season=self.season,
-                metrics_calculator=metrics_calculator,
-                metrics={
-                    "coaching_efficiency": CoachingEfficiency(self.league),
-                    "luck": metrics_calculator.calculate_luck(
-                        week_counter,
-                        self.league,
-                        custom_weekly_matchups
-                    ),
-                    "records": metrics_calculator.calculate_records(
-                        week_counter,
-                        self.league,
-                        custom_weekly_matchups
-                    ),
-                    "playoff_probs": self.playoff_probs,
-                    "bad_boy_stats": self.bad_boy_stats,
-                    "beef_stats": self.beef_stats,
-                    "high_roller_stats": self.high_roller_stats
-                },
-                break_ties=self.break_ties,
-                dq_ce=self.dq_ce,
-                testing=self.test
-            )
+            custom_weekly_matchups = season_custom_weekly_matchups[str(week_counter)]
+
+            if week_counter in week_report_data_snapshots:
+                week_report_data = week_report_data_snapshots[week_counter]
 
-            for team_id, team_result in report_data.teams_results.items():
-                for weekly_team_points_by_position in report_data.data_for_weekly_points_by_position:
-                    if weekly_team_points_by_position[0] == team_id:
-                        season_avg_points_by_position[team_id].append(weekly_team_points_by_position[1])
-
-            top_scorer = {
-                "week": week_counter,
-                "team": report_data.data_for_scores[0][1],
-                "manager": report_data.data_for_scores[0][2],
-                "score": report_data.data_for_scores[0][3],
-            }
-            season_weekly_top_scorers.append(top_scorer)
-
-            low_scorer = {
-                "week": week_counter,
-                "team": report_data.data_for_scores[-1][1],
-                "manager": report_data.data_for_scores[-1][2],
-                "score": report_data.data_for_scores[-1][3],
-            }
-            season_weekly_low_scorers.append(low_scorer)
-
-            highest_ce = {
-                "week": week_counter,
-                "team": report_data.data_for_coaching_efficiency[0][1],
-                "manager": report_data.data_for_coaching_efficiency[0][2],
-                "ce": report_data.data_for_coaching_efficiency[0][3],
-            }
-            season_weekly_highest_ce.append(highest_ce)
-
-            season_weekly_teams_results.append(report_data.teams_results)
+                # keep the cumulative records, standings, and z-scores used by the following weeks up to date
+                metrics_calculator.calculate_records(week_counter, self.league, custom_weekly_matchups)
+                self.league.standings = ReportData.get_week_standings(self.league, week_counter)
+                z_score_accumulator.add_week(self.league.teams_by_week.get(str(week_counter)))
+            else:
+                report_data = ReportData(
+                    league=self.league,
+                    z_score_accumulator=z_score_accumulator,
+                    week_counter=week_counter,
+                    week_for_report=week_for_report,
+                    season=self.season,
+                    metrics_calculator=metrics_calculator,
+                    metrics={
+                        **weekly_metrics[week_counter],
+                        "records": metrics_calculator.calculate_records(
+                            week_counter,
+                            self.league,
+                            custom_weekly_matchups
+                        )
+                    },
+                    break_ties=self.break_ties,
+                    dq_ce=self.dq_ce,
+                    testing=self.test,
+                    week_teams_results=weeks_teams_results[week_counter]
+                )
+
+                week_report_data = {
+                    "data_for_teams": report_data.data_for_teams,
+                    "data_for_weekly_points_by_position": report_data.data_for_weekly_points_by_position,
+                    "top_scorer": {
+                        "week": week_counter,
+                        "team": report_data.data_for_scores[0][1],
+                        "manager": report_data.data_for_scores[0][2],
+                        "score": report_data.data_for_scores[0][3],
+                    },
+                    "low_scorer": {
+                        "week": week_counter,
+                        "team": report_data.data_for_scores[-1][1],
+                        "manager": report_data.data_for_scores[-1][2],
+                        "score": report_data.data_for_scores[-1][3],
+                    },
+                    "highest_ce": {
+                        "week": week_counter,
+                        "team": report_data.data_for_coaching_efficiency[0][1],
+                        "manager": report_data.data_for_coaching_efficiency[0][2],
+                        "ce": report_data.data_for_coaching_efficiency[0][3],
+                    }
+                }
+
+                # only save the snapshots of completed weeks when saving data in an online run
+                if report_data_snapshots and self.save_data and not self.offline and week_counter < week_for_report:
+                    report_data_snapshots.save(week_counter, week_report_data)
+
+            for team_id, weekly_team_points_by_position in week_report_data["data_for_weekly_points_by_position"]:
+                season_avg_points_by_position[team_id].append(weekly_team_points_by_position)
+
+            season_weekly_top_scorers.append(week_report_data["top_scorer"])
+            season_weekly_low_scorers.append(week_report_data["low_scorer"])
+            season_weekly_highest_ce.append(week_report_data["highest_ce"])
 
             ordered_team_names = []
             ordered_team_managers = []
@@ -249,7 +366,7 @@ class FantasyFootballReport(object):
             weekly_power_rank_data = []
 
             team: List
-            for team in report_data.data_for_teams:
+            for team in week_report_data["data_for_teams"]:
                 ordered_team_names.append(team[1])
                 ordered_team_managers.append(team[2])
                 weekly_points_data.append([week_counter, float(team[3])])
@@ -409,3 +526,53 @@ class FantasyFootballReport(object):
         )
 
         return file_for_upload
+
+    def calculate_playoff_scenarios(self, scenarios: List[str]) -> Dict[str, Dict[str, float]]:
+        """Calculate the playoff chances of every team for a list of what-if scenario strings (see
+        PlayoffProbabilities.parse_scenario for the format) in one batched simulation pass.
+        """
+        logger.debug("Calculating what-if playoff scenarios.")
+
+        if not self.playoff_probs:
+            logger.warning("What-if playoff scenarios cannot be calculated for leagues without playoff slots.")
+            return {}
+
+        week_for_report = self.league.week_for_report
+
+        # calculate league records through the week for the report to get the current standings
+        metrics_calculator = CalculateMetrics(self.league_id, self.league.num_playoff_slots, self.playoff_prob_sims)
+        for week in range(self.league.start_week, week_for_report + 1):
+            metrics_calculator.calculate_records(week, self.league, self.league.get_custom_weekly_matchups(week))
+
+        standings = sorted(
+            self.league.standings if self.league.standings else self.league.current_standings,
+            key=lambda x: self.league.records_by_week[str(week_for_report)][x.team_id].rank
+        )
+
+        scenario_playoff_chances = self.playoff_probs.calculate_scenarios(
+            standings,
+            self.league.get_remaining_matchups(week_for_report),
+            dict(self.playoff_probs.parse_scenario(scenario) for scenario in scenarios),
+            self.league.get_team_weekly_points(week_for_report)
+        )
+
+        # output a team x scenario table of playoff chances
+        team_name_width = max(len(team.name) for team in standings)
+        scenario_widths = [max(len(scenario_name), 7) for scenario_name in scenario_playoff_chances.keys()]
+        scenario_table_rows = [
+            f"{'Team':<{team_name_width}}  " + "  ".join(
+                f"{scenario_name:>{scenario_width}}"
+                for scenario_name, scenario_width in zip(scenario_playoff_chances.keys(), scenario_widths)
+            )
+        ]
+        for team in standings:
+            scenario_table_rows.append(
+                f"{team.name:<{team_name_width}}  " + "  ".join(
+                    f"{f'{playoff_chances[team.team_id]:.2f}%':>{scenario_width}}"
+                    for playoff_chances, scenario_width in zip(scenario_playoff_chances.values(), scenario_widths)
+                )
+            )
+        scenario_table = "\n".join(scenario_table_rows)
+        logger.info(f"What-if playoff scenario playoff chances for week {week_for_report}:\n{scenario_table}\n")
+
+        return scenario_playoff_chances
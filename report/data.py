@@ -2,11 +2,11 @@ __author__ = "Wren J. R. (uberfastman)"
 __email__ = "uberfastman@uberfastman.dev"
 
 import itertools
-from typing import List
+from typing import List, Dict, Any, Optional, Tuple, Callable
 
-from calculate.metrics import CalculateMetrics
+from calculate.metrics import CalculateMetrics, ZScoreAccumulator
 from calculate.points_by_position import PointsByPosition
-from dao.base import BaseLeague, BaseMatchup, BaseTeam
+from dao.base import BaseLeague, BaseTeam
 from utilities.app import add_report_team_stats, get_inactive_players
 from utilities.logger import get_logger
 from utilities.settings import settings
@@ -17,9 +17,10 @@ logger = get_logger(__name__, propagate=False)
 
 class ReportData(object):
 
-    def __init__(self, league: BaseLeague, season_weekly_teams_results, week_counter: int,
+    def __init__(self, league: BaseLeague, z_score_accumulator: ZScoreAccumulator, week_counter: int,
                  week_for_report: int, season: int, metrics_calculator: CalculateMetrics, metrics,
-                 break_ties: bool = False, dq_ce: bool = False, testing: bool = False):
+                 break_ties: bool = False, dq_ce: bool = False, testing: bool = False,
+                 week_teams_results: Optional[Tuple[Dict[str, BaseTeam], List[List[Any]]]] = None):
         logger.debug("Instantiating report data.")
 
         self.league: BaseLeague = league
@@ -31,33 +32,16 @@ class ReportData(object):
         self.has_waiver_priorities: bool = league.has_waiver_priorities
         self.is_faab: bool = league.is_faab
 
-        inactive_players = []
-        if dq_ce:
-            inactive_players = get_inactive_players(week_counter, league)
-
-        self.teams_results = {
-            team.team_id: add_report_team_stats(
-                team,
-                league,
-                week_counter,
-                metrics_calculator,
-                metrics,
-                dq_ce,
-                inactive_players
-            ) for team in league.teams_by_week.get(str(week_counter)).values()
-        }
+        # the team results of the week only depend on the rosters of that week, so they can be calculated ahead of the
+        # records and z-scores that carry over from the previous weeks
+        if week_teams_results is None:
+            week_teams_results = self.get_week_teams_results(league, week_counter, metrics_calculator, metrics, dq_ce)
+        self.teams_results, self.data_for_weekly_points_by_position = week_teams_results
 
-        records = {}
         for team_id, team in self.teams_results.items():
-            records[team_id] = team.record
+            team.record = metrics.get("records").get(team_id)
 
-        league.standings = sorted(
-            league.teams_by_week.get(str(week_counter)).values(),
-            key=lambda x: (
-                league.records_by_week[str(week_counter)][x.team_id].rank,
-                -league.records_by_week[str(week_counter)][x.team_id].get_points_for()
-            )
-        )
+        league.standings = self.get_week_standings(league, week_counter)
 
         # option to disqualify team(s) manually entered in the .env file for current week of coaching efficiency
         self.coaching_efficiency_dqs = {}
@@ -73,19 +57,11 @@ class ReportData(object):
             metrics_calculator.test_ties(self.teams_results)
 
         # get remaining matchups for Monte Carlo playoff simulations
-        remaining_matchups = {}
-        for week, matchups in league.matchups_by_week.items():
-            if int(week) > week_for_report:
-                remaining_matchups[str(week)] = []
-                matchup: BaseMatchup
-                for matchup in matchups:
-                    matchup_teams = []
-                    for team in matchup.teams:
-                        matchup_teams.append(team.team_id)
-                    remaining_matchups[str(week)].append(tuple(matchup_teams))
-
-        # calculate z-scores (dependent on all previous weeks scores)
-        z_score_results = metrics_calculator.calculate_z_scores(season_weekly_teams_results + [self.teams_results])
+        remaining_matchups = league.get_remaining_matchups(week_for_report)
+
+        # calculate z-scores (dependent on all previous weeks scores) and add this week's scores for the following weeks
+        z_score_results = z_score_accumulator.get_z_scores(self.teams_results)
+        z_score_accumulator.add_week(self.teams_results)
 
         # ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~
         # ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ REPORT DATA ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~
@@ -112,9 +88,10 @@ class ReportData(object):
         self.data_for_current_median_standings = metrics_calculator.get_median_standings_data(league)
 
         if league.num_playoff_slots > 0:
-            # playoff probabilities data
+            # playoff probabilities data (with weekly points through the current week for score-based simulations)
             self.data_for_playoff_probs = metrics.get("playoff_probs").calculate(
-                week_counter, week_for_report, league.standings, remaining_matchups
+                week_counter, week_for_report, league.standings, remaining_matchups,
+                league.get_team_weekly_points(week_counter)
             )
         else:
             self.data_for_playoff_probs = None
@@ -159,10 +136,6 @@ class ReportData(object):
                 )
                 z_score_rank += 1
 
-        # points by position data
-        points_by_position = PointsByPosition(league, week_for_report)
-        self.data_for_weekly_points_by_position = points_by_position.get_weekly_points_by_position(self.teams_results)
-
         # teams data and season average points by position data
         self.data_for_teams = []
         team_result: BaseTeam
@@ -189,7 +162,9 @@ class ReportData(object):
             sorted(self.teams_results.values(), key=lambda x: float(
                 x.coaching_efficiency) if x.coaching_efficiency != "DQ" else 0, reverse=True))
         self.num_coaching_efficiency_dqs = metrics_calculator.coaching_efficiency_dq_count
-        self.coaching_efficiency_dqs.update(metrics.get("coaching_efficiency").coaching_efficiency_dqs)
+        self.coaching_efficiency_dqs.update(
+            metrics.get("coaching_efficiency").get_coaching_efficiency_dqs(week_counter)
+        )
 
         # luck data
         self.data_for_luck = metrics_calculator.get_luck_data(
@@ -348,3 +323,41 @@ class ReportData(object):
             f"{f' with the following coaching efficiency DQs: {ce_dq_str})' if ce_dq_str else ''}"
             f"."
         )
+
+    @staticmethod
+    def get_week_teams_results(league: BaseLeague, week: int, metrics_calculator: CalculateMetrics,
+                               metrics: Dict[str, Any], dq_ce: bool = False,
+                               inactive_players_function: Callable[[int, BaseLeague], List[str]] = get_inactive_players
+                               ) -> Tuple[Dict[str, BaseTeam], List[List[Any]]]:
+        """Calculate the team stats and points by position of a week, which only read and update the teams and players
+        of that week and can therefore be calculated for different weeks concurrently.
+        """
+        inactive_players = []
+        if dq_ce:
+            inactive_players = inactive_players_function(week, league)
+
+        teams_results = {
+            team.team_id: add_report_team_stats(
+                team,
+                league,
+                week,
+                metrics_calculator,
+                metrics,
+                dq_ce,
+                inactive_players
+            ) for team in league.teams_by_week.get(str(week)).values()
+        }
+
+        points_by_position = PointsByPosition(league, league.week_for_report)
+
+        return teams_results, points_by_position.get_weekly_points_by_position(teams_results)
+
+    @staticmethod
+    def get_week_standings(league: BaseLeague, week: int) -> List[BaseTeam]:
+        return sorted(
+            league.teams_by_week.get(str(week)).values(),
+            key=lambda x: (
+                league.records_by_week[str(week)][x.team_id].rank,
+                -league.records_by_week[str(week)][x.team_id].get_points_for()
+            )
+        )
@@ -104,6 +104,12 @@ def get_player_image(url: str, data_dir: Path, week: int, image_quality: int, wi
     return scaled_img
 
 
+def register_font(font_name: str, font_file_path: str) -> None:
+    # fonts are only loaded once per process so later reports generated in the same process reuse them
+    if font_name not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(TTFont(font_name, font_file_path))
+
+
 # noinspection PyPep8Naming
 class HyperlinkedImage(ReportLabImage, object):
     """Class written by Dennis Golomazov on stackoverflow here: https://stackoverflow.com/a/39134216
@@ -278,10 +284,10 @@ class PdfGenerator(object):
             self.font_bold_italic = "Helvetica-BoldOblique"
 
         if use_custom_font:
-            pdfmetrics.registerFont(TTFont(self.font, "resources/fonts/" + self.font + ".ttf"))
-            pdfmetrics.registerFont(TTFont(self.font_bold, "resources/fonts/" + self.font + ".ttf"))
-            pdfmetrics.registerFont(TTFont(self.font_italic, "resources/fonts/" + self.font + ".ttf"))
-            pdfmetrics.registerFont(TTFont(self.font_bold_italic, "resources/fonts/" + self.font + ".ttf"))
+            register_font(self.font, "resources/fonts/" + self.font + ".ttf")
+            register_font(self.font_bold, "resources/fonts/" + self.font + ".ttf")
+            register_font(self.font_italic, "resources/fonts/" + self.font + ".ttf")
+            register_font(self.font_bold_italic, "resources/fonts/" + self.font + ".ttf")
 
         styles._baseFontName = self.font
         self.stylesheet = styles.getSampleStyleSheet()
@@ -1125,6 +1131,16 @@ class PdfGenerator(object):
 
         return horizontal_bar_chart
 
+    @staticmethod
+    def get_playoff_round_headers(num_playoff_round_cols: int) -> List[str]:
+        """Headers of the odds of reaching each playoff round after the first, the last of which is the championship.
+        """
+        num_rounds = num_playoff_round_cols
+        round_names = {num_rounds: "Final", num_rounds - 1: "Semis", num_rounds - 2: "Quarters"}
+        return [
+            round_names.get(playoff_round, f"Rd {playoff_round}") for playoff_round in range(2, num_rounds + 1)
+        ] + ["Champ"]
+
     @staticmethod
     def get_img(path: Union[Path, str], width: int = 1 * inch, hyperlink: str = None) -> ReportLabImage:
         img = ImageReader(path)
@@ -1558,6 +1574,21 @@ class PdfGenerator(object):
                 )
 
             data_for_playoff_probs = self.report_data.data_for_playoff_probs
+
+            # odds of reaching each playoff round after the first (and of winning the championship) follow the finish
+            # positions when the playoff bracket was simulated, and share the width of the finish positions with them
+            num_playoff_round_cols = (
+                len(data_for_playoff_probs[0]) - len(self.playoff_probs_headers[0]) if data_for_playoff_probs else 0
+            )
+            if num_playoff_round_cols > 0:
+                self.playoff_probs_headers[0].extend(self.get_playoff_round_headers(num_playoff_round_cols))
+                if not self.report_data.has_divisions:
+                    playoff_probs_style.add("FONTSIZE", (0, 0), (-1, -1), self.font_size - 2)
+                num_finish_cols = self.playoff_slots + num_playoff_round_cols
+                self.widths_n_cols_no_1 = (
+                    self.widths_n_cols_no_1[:-self.playoff_slots] +
+                    [round(3.4 / num_finish_cols, 2) * inch] * num_finish_cols
+                )
             team_num = 1
             if data_for_playoff_probs:
                 for team in data_for_playoff_probs:
@@ -1611,6 +1642,13 @@ class PdfGenerator(object):
                     subtitle_text_for_divisions = ""
                     footer_text_for_divisions = None
 
+                if num_playoff_round_cols > 0:
+                    subtitle_text_for_playoff_rounds = (
+                        "\nPlayoff round odds simulate a single elimination bracket with byes for the top seeds."
+                    )
+                else:
+                    subtitle_text_for_playoff_rounds = ""
+
                 elements.append(self.create_section(
                     "Playoff Probabilities",
                     "metrics",
@@ -1623,6 +1661,7 @@ class PdfGenerator(object):
                         f"Playoff probabilities were calculated using {num_playoff_simulations:,} Monte Carlo "
                         f"simulations to predict team performances through the end of the regular fantasy season."
                         f"{subtitle_text_for_divisions}"
+                        f"{subtitle_text_for_playoff_rounds}"
                     ),
                     metric_type="playoffs",
                     footer_text=footer_text_for_divisions
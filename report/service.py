@@ -0,0 +1,251 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "uberfastman@uberfastman.dev"
+
+import json
+import queue
+import threading
+from datetime import datetime, timedelta
+from http import HTTPStatus
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+from urllib.parse import urlparse, parse_qs
+from uuid import uuid4
+
+from report.batch import SharedReportResources, validate_report_job, run_report_job
+from utilities.logger import get_logger
+from utilities.settings import settings
+
+logger = get_logger(__name__, propagate=False)
+
+
+class ReportJob(object):
+
+    def __init__(self, job: Dict[str, Any]):
+        self.job_id: str = uuid4().hex
+        self.job: Dict[str, Any] = job
+        self.status: str = "queued"
+        self.summary: Optional[Dict[str, Any]] = None
+        self.created: datetime = datetime.now()
+        self.started: Optional[datetime] = None
+        self.finished: Optional[datetime] = None
+        # set when the job has either succeeded or failed
+        self.done: threading.Event = threading.Event()
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "job": self.job,
+            "status": self.status,
+            "created": f"{self.created:%Y-%m-%d %H:%M:%S}",
+            "started": f"{self.started:%Y-%m-%d %H:%M:%S}" if self.started else None,
+            "finished": f"{self.finished:%Y-%m-%d %H:%M:%S}" if self.finished else None,
+            "summary": self.summary
+        }
+
+
+class ReportService(object):
+    """Long-running local report service that queues report jobs submitted over HTTP and runs them on a bounded pool of
+    worker threads, which share the league-independent report resources (feature data, inactive players, and the parsed
+    Sleeper NFL player dump) and fonts kept in memory between jobs.
+
+    API:
+        POST /jobs                      submit a report job (JSON object with the "platform", "league_id", "season",
+                                        and "week" of the report, and optionally its "game_id", "start_week",
+                                        "playoff_prob_sims", "break_ties", "dq_ce", and "test")
+        GET  /jobs                      list all jobs
+        GET  /jobs/<job_id>[?wait=<s>]  get the status of a job, optionally waiting up to the given seconds for it
+        GET  /jobs/<job_id>/report      download the report PDF of a succeeded job
+    """
+
+    def __init__(self, host: str = None, port: int = None, workers: int = None, queue_size: int = None,
+                 refresh_web_data: bool = False, playoff_prob_sims: int = None, break_ties: bool = False,
+                 dq_ce: bool = False, save_data: bool = False, offline: bool = False, test: bool = False):
+        logger.debug("Initializing report service.")
+
+        self.host: str = host or settings.report_service_host
+        self.port: int = port if port is not None else settings.report_service_port
+        self.workers: int = workers or settings.report_service_workers
+        self.playoff_prob_sims: int = playoff_prob_sims
+        self.break_ties: bool = break_ties
+        self.dq_ce: bool = dq_ce
+        self.test: bool = test
+
+        self.shared_resources: SharedReportResources = SharedReportResources(
+            refresh_web_data,
+            save_data,
+            offline,
+            max_age=timedelta(hours=settings.report_service_resources_max_age_hours)
+        )
+
+        self.jobs: Dict[str, ReportJob] = {}
+        self.jobs_lock: threading.Lock = threading.Lock()
+        self.job_queue: queue.Queue = queue.Queue(maxsize=queue_size or settings.report_service_queue_size)
+        self.worker_threads: List[threading.Thread] = []
+
+        self.server: ThreadingHTTPServer = ThreadingHTTPServer((self.host, self.port), ReportServiceRequestHandler)
+        self.server.daemon_threads = True
+        self.server.report_service = self
+
+    def submit(self, job: Dict[str, Any]) -> ReportJob:
+        """Queue a report job.
+
+        :raises ValueError: if the job is invalid
+        :raises queue.Full: if the job queue is full
+        """
+        report_job = ReportJob(validate_report_job(job))
+        with self.jobs_lock:
+            self.job_queue.put_nowait(report_job)
+            self.jobs[report_job.job_id] = report_job
+
+        logger.info(f"Queued report job {report_job.job_id}: {job}")
+        return report_job
+
+    def get_job(self, job_id: str) -> Optional[ReportJob]:
+        with self.jobs_lock:
+            return self.jobs.get(job_id)
+
+    def get_jobs(self) -> List[ReportJob]:
+        with self.jobs_lock:
+            return list(self.jobs.values())
+
+    def _work(self) -> None:
+        while True:
+            report_job: Optional[ReportJob] = self.job_queue.get()
+            # a queued None stops the worker
+            if report_job is None:
+                self.job_queue.task_done()
+                break
+
+            report_job.status = "running"
+            report_job.started = datetime.now()
+            logger.info(f"Running report job {report_job.job_id}...")
+
+            report_job.summary = run_report_job(
+                report_job.job,
+                self.shared_resources,
+                playoff_prob_sims=self.playoff_prob_sims,
+                break_ties=self.break_ties,
+                dq_ce=self.dq_ce,
+                test=self.test
+            )
+
+            report_job.finished = datetime.now()
+            report_job.status = "succeeded" if report_job.summary["success"] else "failed"
+            report_job.done.set()
+            logger.info(f"...report job {report_job.job_id} {report_job.status}.")
+
+            self.job_queue.task_done()
+
+    def start(self) -> None:
+        for _ in range(self.workers):
+            worker_thread = threading.Thread(target=self._work, daemon=True)
+            worker_thread.start()
+            self.worker_threads.append(worker_thread)
+
+        logger.info(
+            f"Report service listening on http://{self.host}:{self.server.server_address[1]} with {self.workers} "
+            f"worker(s)..."
+        )
+
+    def serve_forever(self) -> None:
+        self.start()
+        try:
+            self.server.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("Stopping report service...")
+        finally:
+            self.shutdown()
+
+    def shutdown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        for _ in self.worker_threads:
+            # block until there is room in the queue so that every worker is stopped
+            self.job_queue.put(None)
+        for worker_thread in self.worker_threads:
+            worker_thread.join()
+
+
+class ReportServiceRequestHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+    def _send_json(self, status: HTTPStatus, body: Any) -> None:
+        response = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def _send_error_json(self, status: HTTPStatus, message: str) -> None:
+        self._send_json(status, {"error": message})
+
+    def do_POST(self) -> None:
+        report_service: ReportService = self.server.report_service
+
+        if urlparse(self.path).path.rstrip("/") != "/jobs":
+            self._send_error_json(HTTPStatus.NOT_FOUND, f"Unknown path: {self.path}")
+            return
+
+        try:
+            job = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"null")
+            report_job = report_service.submit(job)
+        except (json.JSONDecodeError, ValueError) as e:
+            self._send_error_json(HTTPStatus.BAD_REQUEST, str(e))
+            return
+        except queue.Full:
+            self._send_error_json(HTTPStatus.SERVICE_UNAVAILABLE, "Report job queue is full. Retry later.")
+            return
+
+        self._send_json(HTTPStatus.ACCEPTED, report_job.to_json())
+
+    def do_GET(self) -> None:
+        report_service: ReportService = self.server.report_service
+
+        url = urlparse(self.path)
+        path_parts = [part for part in url.path.split("/") if part]
+
+        if path_parts == ["jobs"]:
+            self._send_json(HTTPStatus.OK, [report_job.to_json() for report_job in report_service.get_jobs()])
+            return
+
+        if len(path_parts) not in [2, 3] or path_parts[0] != "jobs":
+            self._send_error_json(HTTPStatus.NOT_FOUND, f"Unknown path: {self.path}")
+            return
+
+        report_job = report_service.get_job(path_parts[1])
+        if not report_job:
+            self._send_error_json(HTTPStatus.NOT_FOUND, f"Unknown report job: {path_parts[1]}")
+            return
+
+        if len(path_parts) == 2:
+            wait = parse_qs(url.query).get("wait")
+            if wait:
+                try:
+                    report_job.done.wait(timeout=float(wait[0]))
+                except ValueError:
+                    self._send_error_json(HTTPStatus.BAD_REQUEST, f"Invalid wait seconds: {wait[0]}")
+                    return
+            self._send_json(HTTPStatus.OK, report_job.to_json())
+
+        elif path_parts[2] == "report":
+            if report_job.status != "succeeded":
+                self._send_error_json(
+                    HTTPStatus.CONFLICT, f"Report job {report_job.job_id} has not succeeded ({report_job.status})."
+                )
+                return
+
+            report_file_path = Path(report_job.summary["report"])
+            report = report_file_path.read_bytes()
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", "application/pdf")
+            self.send_header("Content-Disposition", f"attachment; filename=\"{report_file_path.name}\"")
+            self.send_header("Content-Length", str(len(report)))
+            self.end_headers()
+            self.wfile.write(report)
+
+        else:
+            self._send_error_json(HTTPStatus.NOT_FOUND, f"Unknown path: {self.path}")
@@ -0,0 +1,127 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "uberfastman@uberfastman.dev"
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Callable
+
+from dao.base import BaseLeague, BaseTeam, BasePlayer
+from utilities.app import get_inactive_players
+from utilities.logger import get_logger
+from utilities.utils import open_for_atomic_write
+
+logger = get_logger(__name__, propagate=False)
+
+# version of the report data snapshot format, which must be incremented whenever a change to the report calculations
+# would produce different weekly report data from the same inputs so that stale snapshots are not reused
+REPORT_DATA_SNAPSHOT_VERSION = 1
+
+
+class ReportDataSnapshots(object):
+    """Store of the computed report data of completed weeks in the league data directory.
+
+    Each snapshot is keyed by a hash of every input of its week (chained with the hash of the previous week, since
+    z-scores and records depend on earlier weeks), so a report only computes the weeks whose inputs have changed.
+    """
+
+    def __init__(self, league: BaseLeague, break_ties: bool = False, dq_ce: bool = False,
+                 inactive_players_function: Callable[[int, BaseLeague], List[str]] = get_inactive_players):
+        logger.debug("Initializing report data snapshots.")
+
+        self.league: BaseLeague = league
+        self.dq_ce: bool = dq_ce
+        self.inactive_players_function: Callable[[int, BaseLeague], List[str]] = inactive_players_function
+        self.snapshots_dir: Path = (
+            Path(league.data_dir) / str(league.season) / str(league.league_id) / "report_data_snapshots"
+        )
+        self.report_options: Dict[str, Any] = {
+            "break_ties": break_ties,
+            "dq_ce": dq_ce,
+            "roster_position_counts": dict(league.roster_position_counts),
+            "bench_positions": list(league.bench_positions),
+            "flex_positions": league.get_flex_positions_dict()
+        }
+        self.input_hashes_by_week: Dict[str, str] = {}
+
+    @staticmethod
+    def _get_player_inputs(player: BasePlayer) -> List[Any]:
+        return [
+            str(player.player_id),
+            player.full_name,
+            player.points,
+            player.primary_position,
+            player.selected_position,
+            sorted(player.eligible_positions),
+            player.status,
+            player.bye_week
+        ]
+
+    def _get_team_inputs(self, team: BaseTeam) -> List[Any]:
+        return [
+            str(team.team_id),
+            team.name,
+            team.manager_str,
+            team.points,
+            team.home_field_advantage_points,
+            sorted(
+                (self._get_player_inputs(player) for player in team.roster),
+                key=lambda x: (x[0], str(x[4]))
+            )
+        ]
+
+    def get_input_hash(self, week: int) -> str:
+        """Create a stable hash of every input that affects the report data of a week, chained with the hash of the
+        previous week.
+        """
+        if str(week) not in self.input_hashes_by_week:
+            week_inputs = {
+                "version": REPORT_DATA_SNAPSHOT_VERSION,
+                "previous_week": self.get_input_hash(week - 1) if week > self.league.start_week else None,
+                "report_options": self.report_options,
+                "teams": sorted(
+                    (self._get_team_inputs(team) for team in self.league.teams_by_week.get(str(week), {}).values()),
+                    key=lambda x: x[0]
+                ),
+                "matchups": self.league.get_custom_weekly_matchups(week),
+                # inactive players decide which teams are disqualified from coaching efficiency when dq_ce is set
+                "inactive_players": (
+                    sorted(self.inactive_players_function(week, self.league)) if self.dq_ce else None
+                )
+            }
+            self.input_hashes_by_week[str(week)] = hashlib.sha256(
+                json.dumps(
+                    week_inputs, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str
+                ).encode("utf-8")
+            ).hexdigest()
+
+        return self.input_hashes_by_week[str(week)]
+
+    def _get_snapshot_file_path(self, week: int) -> Path:
+        return self.snapshots_dir / f"week_{week}-report_data.json"
+
+    def load(self, week: int) -> Optional[Dict[str, Any]]:
+        input_hash = self.get_input_hash(week)
+
+        snapshot_file_path = self._get_snapshot_file_path(week)
+        if not snapshot_file_path.exists():
+            return None
+
+        with open(snapshot_file_path, "r", encoding="utf-8") as snapshot_in:
+            snapshot = json.load(snapshot_in)
+
+        if snapshot.get("input_hash") != input_hash:
+            logger.debug(f"Discarding week {week} report data snapshot with changed inputs.")
+            return None
+
+        logger.debug(f"Using week {week} report data snapshot.")
+        return snapshot.get("report_data")
+
+    def save(self, week: int, week_report_data: Dict[str, Any]) -> None:
+        with open_for_atomic_write(self._get_snapshot_file_path(week)) as snapshot_out:
+            json.dump(
+                {"input_hash": self.get_input_hash(week), "report_data": week_report_data},
+                snapshot_out,
+                ensure_ascii=False,
+                indent=2
+            )
@@ -0,0 +1,91 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "uberfastman@uberfastman.dev"
+
+import random
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+
+from calculate.coaching_efficiency import get_optimal_slot_assignments  # noqa: E402
+from utilities.logger import get_logger  # noqa: E402
+
+logger = get_logger(__file__)
+
+# roster slot index bits
+qb, rb, wr, te, k, flex, superflex = (1 << bit for bit in range(7))
+
+# active roster slot positions and counts of a superflex league (without a kicker slot, so kickers cannot be assigned)
+slot_bits = [qb, rb, wr, te, flex, superflex]
+slot_counts = [1, 2, 2, 1, 2, 1]
+flex_slots_mask = flex | superflex
+
+# eligible positions bitmask of each player position
+position_masks = [
+    qb | superflex,
+    rb | flex | superflex,
+    wr | flex | superflex,
+    te | flex | superflex,
+    wr | rb | flex | superflex,
+    k
+]
+
+
+def get_best_lineup(player_points: List[float], player_masks: List[int]) -> Tuple[int, float]:
+    """Exhaustively search every lineup for the most filled slots and then the most points.
+    """
+
+    @lru_cache(maxsize=None)
+    def search(player_ndx: int, remaining_slot_counts: Tuple[int, ...]) -> Tuple[int, float]:
+        if player_ndx == len(player_points):
+            return 0, 0.0
+
+        # bench the player
+        best_lineup = search(player_ndx + 1, remaining_slot_counts)
+        for slot_ndx, slot_bit in enumerate(slot_bits):
+            if player_masks[player_ndx] & slot_bit and remaining_slot_counts[slot_ndx] > 0:
+                filled_slots, points = search(
+                    player_ndx + 1,
+                    remaining_slot_counts[:slot_ndx] + (remaining_slot_counts[slot_ndx] - 1,)
+                    + remaining_slot_counts[slot_ndx + 1:]
+                )
+                best_lineup = max(best_lineup, (filled_slots + 1, points + player_points[player_ndx]))
+        return best_lineup
+
+    return search(0, tuple(slot_counts))
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_optimal_slot_assignments_match_exhaustive_search(seed):
+    rng = random.Random(seed)
+    num_players = rng.randint(0, 16)
+    player_points = [round(rng.uniform(-3, 35), 2) for _ in range(num_players)]
+    player_masks = [rng.choice(position_masks) for _ in range(num_players)]
+
+    assignments = get_optimal_slot_assignments(player_points, player_masks, slot_bits, slot_counts, flex_slots_mask)
+
+    # every player fills at most one eligible slot and no slot position is filled beyond its count
+    assigned_player_ndxs = [player_ndx for player_ndx, _ in assignments]
+    assert len(assigned_player_ndxs) == len(set(assigned_player_ndxs))
+    for player_ndx, slot_ndx in assignments:
+        assert player_masks[player_ndx] & slot_bits[slot_ndx]
+    for slot_ndx, slot_count in enumerate(slot_counts):
+        assert sum(1 for _, assigned_slot_ndx in assignments if assigned_slot_ndx == slot_ndx) <= slot_count
+
+    best_filled_slots, best_points = get_best_lineup(player_points, player_masks)
+    assert len(assignments) == best_filled_slots
+    assert sum(player_points[player_ndx] for player_ndx, _ in assignments) == pytest.approx(best_points)
+
+
+def test_optimal_slot_assignments_favor_primary_positions():
+    # a running back and a flex-eligible wide receiver with equal points fill the RB and WR slots before the flex slot
+    assignments = get_optimal_slot_assignments(
+        [10.0, 10.0], [rb | flex, wr | flex], [rb, wr, flex], [1, 1, 1], flex
+    )
+
+    assert sorted(assignments) == [(0, 0), (1, 1)]
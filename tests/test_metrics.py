@@ -0,0 +1,170 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "uberfastman@uberfastman.dev"
+
+import random
+import sys
+from collections import defaultdict
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List, Dict, Any
+
+import numpy as np
+import pytest
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+
+from calculate.metrics import CalculateMetrics, ZScoreAccumulator  # noqa: E402
+from dao.base import BaseTeam, BaseRecord  # noqa: E402
+from utilities.logger import get_logger  # noqa: E402
+
+logger = get_logger(__file__)
+
+num_teams = 10
+num_weeks = 13
+
+
+def get_teams_by_week(seed: int) -> Dict[str, Dict[str, BaseTeam]]:
+    rng = random.Random(seed)
+
+    teams_by_week = {}
+    for week in range(1, num_weeks + 1):
+        teams_by_week[str(week)] = {}
+        for team_ndx in range(num_teams):
+            team = BaseTeam()
+            team.team_id = str(team_ndx + 1)
+            team.name = f"Team {team_ndx + 1}"
+            # scores drawn from a small set of values so that teams often tie
+            team.points = rng.choice([80.5, 95.0, 101.25, 101.25, 110.0, 120.75, 133.5])
+            teams_by_week[str(week)][team.team_id] = team
+
+    return teams_by_week
+
+
+def get_custom_weekly_matchups(teams: Dict[str, BaseTeam]) -> List[Dict[str, Dict[str, Any]]]:
+    team_ids = list(teams.keys())
+
+    custom_weekly_matchups = []
+    for team_1_id, team_2_id in zip(team_ids[::2], team_ids[1::2]):
+        team_1_points = teams[team_1_id].points
+        team_2_points = teams[team_2_id].points
+        custom_weekly_matchups.append({
+            team_1_id: {
+                "result": "W" if team_1_points > team_2_points else "L" if team_1_points < team_2_points else "T"
+            },
+            team_2_id: {
+                "result": "W" if team_2_points > team_1_points else "L" if team_2_points < team_1_points else "T"
+            }
+        })
+
+    return custom_weekly_matchups
+
+
+def get_pairwise_luck(teams: Dict[str, BaseTeam],
+                      custom_weekly_matchups: List[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """Luck calculated by comparing the score of every team against every other team (the original luck calculation).
+    """
+    luck_results = defaultdict(defaultdict)
+
+    matchups = {
+        str(team_id): value["result"] for pair in custom_weekly_matchups for team_id, value in list(pair.items())
+    }
+
+    for team_1 in teams.values():
+        luck_record = BaseRecord()
+
+        for team_2 in teams.values():
+            if team_1.team_id == team_2.team_id:
+                continue
+
+            if float(team_1.points) > float(team_2.points):
+                luck_record.add_win()
+            elif float(team_1.points) < float(team_2.points):
+                luck_record.add_loss()
+            else:
+                luck_record.add_tie()
+
+        luck_results[team_1.team_id]["luck_record"] = luck_record
+
+        luck = 0.0
+        # number of teams excluding current team
+        num_other_teams = float(len(teams)) - 1
+
+        if luck_record.get_wins() != 0 and luck_record.get_losses() != 0:
+            matchup_result = matchups[str(team_1.team_id)]
+            if matchup_result == "W" or matchup_result == "T":
+                luck = (luck_record.get_losses() + luck_record.get_ties()) / num_other_teams
+            else:
+                luck = 0 - (luck_record.get_wins() + luck_record.get_ties()) / num_other_teams
+
+        luck_results[team_1.team_id]["luck"] = luck * 100
+
+    return luck_results
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_season_luck_matches_pairwise_luck(seed):
+    teams_by_week = get_teams_by_week(seed)
+    league = SimpleNamespace(teams_by_week=teams_by_week)
+    custom_weekly_matchups_by_week = {
+        week: get_custom_weekly_matchups(teams) for week, teams in teams_by_week.items()
+    }
+
+    season_luck = CalculateMetrics.calculate_season_luck(
+        list(range(1, num_weeks + 1)), league, custom_weekly_matchups_by_week
+    )
+
+    assert season_luck.keys() == teams_by_week.keys()
+    for week, teams in teams_by_week.items():
+        pairwise_luck = get_pairwise_luck(teams, custom_weekly_matchups_by_week[week])
+
+        assert season_luck[week].keys() == pairwise_luck.keys()
+        for team_id, team_pairwise_luck in pairwise_luck.items():
+            team_season_luck = season_luck[week][team_id]
+            assert team_season_luck["luck_record"].get_wins() == team_pairwise_luck["luck_record"].get_wins()
+            assert team_season_luck["luck_record"].get_losses() == team_pairwise_luck["luck_record"].get_losses()
+            assert team_season_luck["luck_record"].get_ties() == team_pairwise_luck["luck_record"].get_ties()
+            assert team_season_luck["luck"] == pytest.approx(team_pairwise_luck["luck"])
+
+
+def get_numpy_z_scores(weekly_teams_results: List[Dict[str, BaseTeam]]) -> Dict[str, Any]:
+    """Z-scores of the last week of scores calculated with np.mean and np.std of all previous weeks of scores (the
+    original z-score calculation).
+    """
+    results = {}
+    for team_id in weekly_teams_results[0].keys():
+        z_score = None
+
+        if len(weekly_teams_results) > 2:
+            scores = [week[team_id].points for week in weekly_teams_results]
+            standard_deviation = np.std(scores[:-1])
+            mean_score = np.mean(scores[:-1])
+            z_score = (float(scores[-1]) - float(mean_score)) / float(
+                standard_deviation) if standard_deviation != 0 else 0
+
+        results[team_id] = z_score
+
+    return results
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_z_score_accumulator_matches_numpy(seed):
+    teams_by_week = get_teams_by_week(seed)
+    weekly_teams_results = [teams_by_week[str(week)] for week in range(1, num_weeks + 1)]
+    # a team that scores the same every week has no standard deviation
+    for teams in weekly_teams_results:
+        teams["1"].points = 100.0
+
+    z_score_accumulator = ZScoreAccumulator()
+    for week_ndx, teams_results in enumerate(weekly_teams_results):
+        z_scores = z_score_accumulator.get_z_scores(teams_results)
+        numpy_z_scores = get_numpy_z_scores(weekly_teams_results[:week_ndx + 1])
+
+        assert z_scores.keys() == numpy_z_scores.keys()
+        for team_id, numpy_z_score in numpy_z_scores.items():
+            if numpy_z_score is None:
+                assert z_scores[team_id] is None
+            else:
+                assert z_scores[team_id] == pytest.approx(numpy_z_score, rel=1e-9, abs=1e-9)
+
+        z_score_accumulator.add_week(teams_results)
@@ -0,0 +1,69 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "uberfastman@uberfastman.dev"
+
+import json
+import sys
+from pathlib import Path
+from typing import List, Dict
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+
+from dao.base import BaseLeague, BasePlayer  # noqa: E402
+from utilities.logger import get_logger  # noqa: E402
+
+logger = get_logger(__file__)
+
+num_weeks = 3
+
+
+def get_league(data_dir: Path) -> BaseLeague:
+    league = BaseLeague(root_dir, data_dir, "1", 2023, num_weeks)
+    for week in range(1, num_weeks + 1):
+        rostered_player = BasePlayer()
+        rostered_player.player_id = "rostered"
+        rostered_player.points = float(week)
+        league.players_by_week[str(week)] = {rostered_player.player_id: rostered_player}
+    league.player_points_by_week_batch_size = 2
+    return league
+
+
+def test_prefetched_player_points_are_batched_and_cached(tmp_path):
+    requests = []
+
+    def get_player_points_by_week(player_ids: List[str], week: int) -> Dict[str, float]:
+        requests.append((list(player_ids), week))
+        # the platform leaves players without any stats that week out of its response
+        return {player_id: week * 1.5 for player_id in player_ids if player_id != "inactive"}
+
+    league = get_league(tmp_path)
+    league.player_points_by_week_batch_function = get_player_points_by_week
+
+    player_ids = ["rostered", "player_1", "player_2", "inactive"]
+    league.prefetch_player_points_by_week(
+        [(player_id, week) for player_id in player_ids for week in range(1, num_weeks + 1)], workers=2
+    )
+
+    # rostered players are not requested and the other players are requested in batches of two per week
+    assert sorted(requests) == sorted(
+        (batch_player_ids, week) for week in range(1, num_weeks + 1)
+        for batch_player_ids in [["player_1", "player_2"], ["inactive"]]
+    )
+
+    for week in range(1, num_weeks + 1):
+        assert league.get_player_points_by_week("rostered", week) == float(week)
+        assert league.get_player_points_by_week("player_2", week) == week * 1.5
+        assert league.get_player_points_by_week("inactive", week) == 0.0
+    # reading the prefetched points never requests them again
+    assert len(requests) == num_weeks * 2
+
+    with open(tmp_path / "2023" / "1" / "player_points_by_week.json", "r", encoding="utf-8") as player_points_in:
+        assert json.load(player_points_in)["2"] == {"player_1": 3.0, "player_2": 3.0, "inactive": 0.0}
+
+    # a later run uses the cached points, including those of players missing from the responses
+    cached_league = get_league(tmp_path)
+    cached_league.player_points_by_week_batch_function = get_player_points_by_week
+    cached_league.prefetch_player_points_by_week(
+        [(player_id, week) for player_id in player_ids for week in range(1, num_weeks + 1)]
+    )
+    assert len(requests) == num_weeks * 2
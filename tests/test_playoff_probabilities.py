@@ -0,0 +1,423 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "uberfastman@uberfastman.dev"
+
+import json
+import random
+import sys
+from copy import deepcopy
+from pathlib import Path
+from typing import List, Dict, Tuple
+
+import numpy as np
+import pytest
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+
+from calculate.playoff_probabilities import (  # noqa: E402
+    PlayoffProbabilities, PlayoffSimulationTallies, VectorizedPlayoffSimulator
+)
+from dao.base import BaseTeam, BaseRecord  # noqa: E402
+from utilities.logger import get_logger  # noqa: E402
+from utilities.settings import settings  # noqa: E402
+
+logger = get_logger(__file__)
+
+num_teams = 12
+num_regular_season_weeks = 14
+num_weeks_played = 8
+num_playoff_slots = 6
+
+# the loop and vectorized engines draw different random numbers, so their probabilities can only agree within the
+# sampling error of the simulations (the standard error of the difference of two 20,000 simulation percentages is at
+# most ~0.5 percentage points)
+num_simulations = 20000
+max_percentage_difference = 2.5
+
+
+def get_league(num_divisions: int = 0, seed: int = 1) -> Tuple[List[BaseTeam], Dict[str, List[Tuple[str, str]]]]:
+    rng = random.Random(seed)
+
+    teams = []
+    for team_ndx in range(num_teams):
+        team = BaseTeam()
+        team.team_id = str(team_ndx + 1)
+        team.name = f"Team {team_ndx + 1}"
+        team.manager_str = f"Manager {team_ndx + 1}"
+        team.division = str(team_ndx % num_divisions + 1) if num_divisions else None
+        wins = rng.randint(0, num_weeks_played)
+        division_wins = rng.randint(0, 2)
+        team.record = BaseRecord(
+            wins=wins,
+            losses=num_weeks_played - wins,
+            points_for=rng.uniform(800, 1200),
+            division=team.division,
+            division_wins=division_wins,
+            division_losses=2 - division_wins,
+            division_points_for=rng.uniform(100, 300)
+        )
+        teams.append(team)
+
+    team_ids = [team.team_id for team in teams]
+    remaining_matchups = {}
+    for week in range(num_weeks_played + 1, num_regular_season_weeks + 1):
+        rng.shuffle(team_ids)
+        remaining_matchups[str(week)] = [
+            (team_ids[team_ndx], team_ids[team_ndx + 1]) for team_ndx in range(0, len(team_ids), 2)
+        ]
+
+    return teams, remaining_matchups
+
+
+def get_playoff_probs(tmp_path: Path, engine: str, teams: List[BaseTeam],
+                      remaining_matchups: Dict[str, List[Tuple[str, str]]], num_divisions: int = 0,
+                      team_weekly_points: Dict[str, List[float]] = None, **kwargs) -> Dict[str, List]:
+    playoff_probs = PlayoffProbabilities(
+        num_simulations,
+        num_regular_season_weeks,
+        num_playoff_slots,
+        tmp_path,
+        num_divisions=num_divisions,
+        recalculate=True,
+        engine=engine,
+        **kwargs
+    )
+    playoff_probs_data = playoff_probs.calculate(
+        num_weeks_played, num_weeks_played, teams, remaining_matchups, team_weekly_points
+    )
+
+    assert playoff_probs_data
+    return playoff_probs_data
+
+
+@pytest.fixture(autouse=True)
+def playoff_simulation_settings(monkeypatch):
+    monkeypatch.setattr(settings, "playoff_simulation_cache_bool", False)
+    monkeypatch.setattr(settings, "playoff_simulation_model", "coin_flip")
+    monkeypatch.setattr(settings, "playoff_simulation_bracket_bool", False)
+    monkeypatch.setattr(settings, "playoff_simulation_convergence_bool", False)
+
+
+@pytest.mark.parametrize("num_divisions, num_playoff_slots_per_division", [(0, 1), (2, 2), (3, 1)])
+def test_vectorized_engine_matches_loop_engine(tmp_path, monkeypatch, num_divisions, num_playoff_slots_per_division):
+    monkeypatch.setattr(settings, "num_playoff_slots_per_division", num_playoff_slots_per_division)
+    teams, remaining_matchups = get_league(num_divisions)
+
+    random.seed(1)
+    loop_playoff_probs = get_playoff_probs(tmp_path, "loop", teams, remaining_matchups, num_divisions)
+    vectorized_playoff_probs = get_playoff_probs(
+        tmp_path, "vectorized", teams, remaining_matchups, num_divisions, seed=1
+    )
+
+    assert loop_playoff_probs.keys() == vectorized_playoff_probs.keys()
+    for team_id, loop_team_playoff_probs in loop_playoff_probs.items():
+        vectorized_team_playoff_probs = vectorized_playoff_probs[team_id]
+        logger.info(
+            f"\n{loop_team_playoff_probs[0]} playoff chance: {loop_team_playoff_probs[1]:.2f}% (loop) vs. "
+            f"{vectorized_team_playoff_probs[1]:.2f}% (vectorized)"
+        )
+
+        # playoff chance
+        assert loop_team_playoff_probs[1] == pytest.approx(
+            vectorized_team_playoff_probs[1], abs=max_percentage_difference
+        )
+        # chance of finishing in each playoff place
+        np.testing.assert_allclose(
+            loop_team_playoff_probs[2], vectorized_team_playoff_probs[2], atol=max_percentage_difference
+        )
+        # wins needed to clinch a playoff spot are deterministic
+        assert loop_team_playoff_probs[3] == vectorized_team_playoff_probs[3]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_vectorized_engine_seed_is_reproducible(tmp_path, workers):
+    teams, remaining_matchups = get_league()
+
+    playoff_probs = get_playoff_probs(tmp_path, "vectorized", teams, remaining_matchups, seed=7, workers=workers)
+    seeded_playoff_probs = get_playoff_probs(
+        tmp_path, "vectorized", teams, remaining_matchups, seed=7, workers=workers
+    )
+    reseeded_playoff_probs = get_playoff_probs(
+        tmp_path, "vectorized", teams, remaining_matchups, seed=8, workers=workers
+    )
+
+    assert playoff_probs == seeded_playoff_probs
+    assert playoff_probs != reseeded_playoff_probs
+
+
+@pytest.mark.parametrize("num_bracket_slots", [4, 6, 7, 8])
+def test_bracket_gives_byes_to_top_seeds(tmp_path, num_bracket_slots):
+    teams, remaining_matchups = get_league()
+    playoff_probs = PlayoffProbabilities(num_simulations, num_regular_season_weeks, num_bracket_slots, tmp_path)
+    simulator = VectorizedPlayoffSimulator(
+        list(playoff_probs._get_teams_for_playoff_probs(teams).values()),
+        [matchup for matchups in remaining_matchups.values() for matchup in matchups],
+        num_bracket_slots,
+        simulate_bracket=True
+    )
+    num_bracket_rounds = int(np.ceil(np.log2(num_bracket_slots)))
+    num_byes = 2 ** num_bracket_rounds - num_bracket_slots
+    assert simulator.num_bracket_rounds == num_bracket_rounds
+
+    # the same teams are seeded in the same order in every simulation
+    num_bracket_simulations = 1000
+    seeds = np.tile(np.arange(num_bracket_slots), (num_bracket_simulations, 1))
+    tallies = PlayoffSimulationTallies(num_teams, num_bracket_slots, num_bracket_rounds)
+    simulator._simulate_bracket_batch(np.random.default_rng(1), seeds, tallies)
+
+    # every seeded team makes the bracket, the top seeds advance past the first round with a bye, and the other seeded
+    # teams only advance when they win their first round matchup
+    assert tallies.bracket_stats[:num_bracket_slots, 0].tolist() == [num_bracket_simulations] * num_bracket_slots
+    assert tallies.bracket_stats[:num_byes, 1].tolist() == [num_bracket_simulations] * num_byes
+    assert all(0 < count < num_bracket_simulations for count in tallies.bracket_stats[num_byes:num_bracket_slots, 1])
+    assert not tallies.bracket_stats[num_bracket_slots:].any()
+
+    # the number of teams left in each round halves down to a single champion in every simulation
+    assert tallies.bracket_stats.sum(axis=0).tolist() == [
+        num_bracket_slots * num_bracket_simulations,
+        *[2 ** (num_bracket_rounds - bracket_round) * num_bracket_simulations
+          for bracket_round in range(1, num_bracket_rounds + 1)]
+    ]
+
+
+@pytest.mark.parametrize("num_divisions, num_playoff_slots_per_division", [(0, 1), (2, 2)])
+def test_bracket_round_odds(tmp_path, monkeypatch, num_divisions, num_playoff_slots_per_division):
+    monkeypatch.setattr(settings, "playoff_simulation_bracket_bool", True)
+    monkeypatch.setattr(settings, "num_playoff_slots_per_division", num_playoff_slots_per_division)
+    teams, remaining_matchups = get_league(num_divisions)
+
+    playoff_probs = get_playoff_probs(tmp_path, "vectorized", teams, remaining_matchups, num_divisions, seed=1)
+
+    # six playoff slots are placed into an eight team bracket, so the first round leaves four teams (two of them with
+    # byes), the second round leaves two teams, and the third round leaves the champion
+    num_teams_by_round = [num_playoff_slots, 4, 2, 1]
+    bracket_stats = np.array([team_playoff_probs[6] for team_playoff_probs in playoff_probs.values()])
+    assert bracket_stats.shape == (num_teams, len(num_teams_by_round))
+
+    # each team's odds are rounded to hundredths of a percent
+    np.testing.assert_allclose(
+        bracket_stats.sum(axis=0), [100.0 * num_round_teams for num_round_teams in num_teams_by_round],
+        atol=0.005 * num_teams
+    )
+    assert bracket_stats[:, -1].sum() == pytest.approx(100.0, abs=0.005 * num_teams)
+    for team_playoff_probs in playoff_probs.values():
+        # making the bracket is making the playoffs, and teams can only reach a round by reaching every earlier round
+        assert team_playoff_probs[6][0] == team_playoff_probs[1]
+        assert team_playoff_probs[6] == sorted(team_playoff_probs[6], reverse=True)
+
+
+@pytest.mark.parametrize("scenario_str, expected_scenario", [
+    ("1:W", ("1:W", [("1", "W", None)])),
+    ("Team 1 wins out=Team 1:w", ("Team 1 wins out", [("Team 1", "W", None)])),
+    ("Upset = 3:L:9, 4:W:10", ("Upset", [("3", "L", 9), ("4", "W", 10)]))
+])
+def test_parse_scenario(scenario_str, expected_scenario):
+    assert PlayoffProbabilities.parse_scenario(scenario_str) == expected_scenario
+
+
+@pytest.mark.parametrize("scenario_str", ["1", "1:T", "1:W:9:10", "1:W:next", "Upset=1:W,2", "Upset="])
+def test_parse_scenario_rejects_invalid_constraints(scenario_str):
+    with pytest.raises(ValueError):
+        PlayoffProbabilities.parse_scenario(scenario_str)
+
+
+def get_scenario_playoff_probs(tmp_path: Path, seed: int = 1) -> PlayoffProbabilities:
+    return PlayoffProbabilities(
+        num_simulations, num_regular_season_weeks, num_playoff_slots, tmp_path, recalculate=True, seed=seed
+    )
+
+
+def test_scenarios_reject_invalid_teams_and_weeks(tmp_path):
+    teams, remaining_matchups = get_league()
+    team_1_id, team_2_id = remaining_matchups[str(num_weeks_played + 1)][0]
+
+    for scenario_constraints in [
+        # team that is not in the league
+        [(str(num_teams + 1), "W", None)],
+        # weeks that were already played or are after the regular season
+        [("1", "W", num_weeks_played)],
+        [("1", "W", num_regular_season_weeks + 1)],
+        # both teams of the same matchup forced to win it
+        [(team_1_id, "W", num_weeks_played + 1), (team_2_id, "W", num_weeks_played + 1)],
+        # a team forced to win out while its opponent in one of those matchups is forced to win that week
+        [(team_1_id, "W", None), (team_2_id, "W", num_weeks_played + 1)]
+    ]:
+        with pytest.raises(ValueError):
+            get_scenario_playoff_probs(tmp_path).calculate_scenarios(
+                teams, remaining_matchups, {"Invalid": scenario_constraints}
+            )
+
+
+def test_scenarios_force_matchup_outcomes(tmp_path):
+    teams, remaining_matchups = get_league()
+
+    scenario_team_ids = [team.team_id for team in teams]
+    scenarios = {
+        **{f"{team_id} wins out": [(team_id, "W", None)] for team_id in scenario_team_ids},
+        **{f"{team_id} loses out": [(team_id, "L", None)] for team_id in scenario_team_ids},
+        # teams can be referenced by name (ignoring case) instead of by ID
+        "Team 1 loses out": [("team 1", "L", None)]
+    }
+    scenario_playoff_probs = get_scenario_playoff_probs(tmp_path).calculate_scenarios(
+        teams, remaining_matchups, scenarios
+    )
+
+    # the baseline scenario is the same as the playoff probabilities calculated with the same seed
+    playoff_probs = get_playoff_probs(tmp_path, "vectorized", teams, remaining_matchups, seed=1)
+    assert scenario_playoff_probs["Baseline"] == {
+        team_id: team_playoff_probs[1] for team_id, team_playoff_probs in playoff_probs.items()
+    }
+
+    # every scenario shares the same random draws, so a team winning out never lowers its playoff chance and a team
+    # losing out never raises it
+    baseline_playoff_probs = scenario_playoff_probs["Baseline"]
+    for team_id in scenario_team_ids:
+        assert scenario_playoff_probs[f"{team_id} wins out"][team_id] >= baseline_playoff_probs[team_id]
+        assert scenario_playoff_probs[f"{team_id} loses out"][team_id] <= baseline_playoff_probs[team_id]
+    assert any(
+        scenario_playoff_probs[f"{team_id} loses out"][team_id] < baseline_playoff_probs[team_id]
+        for team_id in scenario_team_ids
+    )
+    assert scenario_playoff_probs["Team 1 loses out"] == scenario_playoff_probs["1 loses out"]
+
+
+def get_team_weekly_points(teams: List[BaseTeam], seed: int = 1) -> Dict[str, List[float]]:
+    rng = random.Random(seed)
+    return {
+        team.team_id: [round(rng.uniform(80, 140), 2) for _ in range(num_weeks_played)] for team in teams
+    }
+
+
+def test_cached_playoff_probs_are_reused(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "playoff_simulation_cache_bool", True)
+    teams, remaining_matchups = get_league()
+
+    playoff_probs = get_playoff_probs(tmp_path, "vectorized", teams, remaining_matchups, seed=1)
+    assert len(list((tmp_path / "playoff_probs_cache").iterdir())) == 1
+
+    def run_vectorized_simulations(*args, **kwargs):
+        raise AssertionError("Playoff simulations run despite cached playoff probabilities.")
+
+    monkeypatch.setattr(PlayoffProbabilities, "_run_vectorized_simulations", run_vectorized_simulations)
+    cached_playoff_probs = get_playoff_probs(tmp_path, "vectorized", teams, remaining_matchups, seed=1)
+
+    assert cached_playoff_probs == json.loads(json.dumps(playoff_probs))
+
+
+def test_cache_key_changes_with_playoff_simulation_inputs(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "playoff_simulation_cache_bool", True)
+    teams, remaining_matchups = get_league()
+    team_weekly_points = get_team_weekly_points(teams)
+
+    def get_cache_key(cache_teams: List[BaseTeam] = None, seed: int = 1, **kwargs) -> str:
+        playoff_probs = PlayoffProbabilities(
+            num_simulations, num_regular_season_weeks, num_playoff_slots, tmp_path, engine="vectorized", seed=seed,
+            **kwargs
+        )
+        cache_teams = cache_teams or teams
+        return playoff_probs.get_cache_key(
+            playoff_probs._get_teams_for_playoff_probs(cache_teams),
+            remaining_matchups,
+            playoff_probs._get_team_weekly_points_for_model(cache_teams, team_weekly_points, playoff_probs.engine)
+        )
+
+    changed_record_teams = deepcopy(teams)
+    changed_record_teams[0].record.add_win()
+
+    cache_key = get_cache_key()
+    assert get_cache_key() == cache_key
+    changed_cache_keys = [
+        get_cache_key(seed=2),
+        get_cache_key(model="scores"),
+        get_cache_key(bracket=True),
+        get_cache_key(convergence=True),
+        get_cache_key(cache_teams=changed_record_teams)
+    ]
+    assert cache_key not in changed_cache_keys
+    assert len(set(changed_cache_keys)) == len(changed_cache_keys)
+
+    # every changed input also results in a separate cache file
+    get_playoff_probs(tmp_path, "vectorized", teams, remaining_matchups, seed=1)
+    get_playoff_probs(tmp_path, "vectorized", teams, remaining_matchups, seed=2)
+    get_playoff_probs(tmp_path, "vectorized", teams, remaining_matchups, team_weekly_points=team_weekly_points, seed=1,
+                      model="scores")
+    get_playoff_probs(tmp_path, "vectorized", teams, remaining_matchups, seed=1, bracket=True)
+    get_playoff_probs(tmp_path, "vectorized", teams, remaining_matchups, seed=1, convergence=True)
+    get_playoff_probs(tmp_path, "vectorized", changed_record_teams, remaining_matchups, seed=1)
+    assert sorted(file_path.stem for file_path in (tmp_path / "playoff_probs_cache").iterdir()) == sorted(
+        [cache_key] + changed_cache_keys
+    )
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_convergence_stops_simulations_early(tmp_path, monkeypatch, workers):
+    convergence_tolerance = 5.0
+    min_simulations = 1000
+    monkeypatch.setattr(settings, "playoff_simulation_convergence_bool", True)
+    monkeypatch.setattr(settings, "playoff_simulation_convergence_tolerance", convergence_tolerance)
+    monkeypatch.setattr(settings, "playoff_simulation_convergence_min_simulations", min_simulations)
+    teams, remaining_matchups = get_league()
+
+    playoff_probs = PlayoffProbabilities(
+        num_simulations, num_regular_season_weeks, num_playoff_slots, tmp_path, recalculate=True, engine="vectorized",
+        seed=1, workers=workers
+    )
+    playoff_probs_data = playoff_probs.calculate(num_weeks_played, num_weeks_played, teams, remaining_matchups)
+
+    # the simulations stop in batches of the minimum simulation count once the playoff chances are precise enough
+    assert min_simulations <= playoff_probs.simulations_run < num_simulations
+    assert playoff_probs.simulations_run % min_simulations == 0
+    assert playoff_probs.confidence_interval_width <= convergence_tolerance
+    # playoff chances are percentages of the simulations that were run
+    assert sum(team_playoff_probs[1] for team_playoff_probs in playoff_probs_data.values()) == pytest.approx(
+        100.0 * num_playoff_slots, abs=0.005 * num_teams
+    )
+
+
+def test_score_model_favors_higher_scoring_teams(tmp_path):
+    teams, remaining_matchups = get_league()
+    team_weekly_points = get_team_weekly_points(teams)
+
+    # two teams with the same record and points for, where the first team scores more every week than the second
+    stronger_team, weaker_team = teams[0], teams[1]
+    weaker_team.record = deepcopy(stronger_team.record)
+    team_weekly_points[stronger_team.team_id] = [140.0] * num_weeks_played
+    team_weekly_points[weaker_team.team_id] = [80.0] * num_weeks_played
+
+    coin_flip_playoff_probs = get_playoff_probs(tmp_path, "vectorized", teams, remaining_matchups, seed=1)
+    score_playoff_probs = get_playoff_probs(
+        tmp_path, "vectorized", teams, remaining_matchups, team_weekly_points=team_weekly_points, seed=1,
+        model="scores"
+    )
+
+    assert coin_flip_playoff_probs[stronger_team.team_id][1] == pytest.approx(
+        coin_flip_playoff_probs[weaker_team.team_id][1], abs=max_percentage_difference
+    )
+    assert score_playoff_probs[stronger_team.team_id][1] > (
+        score_playoff_probs[weaker_team.team_id][1] + max_percentage_difference
+    )
+
+
+def test_score_model_falls_back_to_coin_flips(tmp_path):
+    teams, remaining_matchups = get_league()
+    team_weekly_points = get_team_weekly_points(teams)
+
+    # teams without any weekly points cannot have their scores resampled
+    vectorized_playoff_probs = get_playoff_probs(tmp_path, "vectorized", teams, remaining_matchups, seed=1)
+    for missing_team_weekly_points in [
+        {team_id: points for team_id, points in team_weekly_points.items() if team_id != teams[0].team_id},
+        {**team_weekly_points, teams[0].team_id: []},
+        None
+    ]:
+        assert get_playoff_probs(
+            tmp_path, "vectorized", teams, remaining_matchups, team_weekly_points=missing_team_weekly_points, seed=1,
+            model="scores"
+        ) == vectorized_playoff_probs
+
+    # the loop engine only simulates coin flips
+    random.seed(1)
+    loop_playoff_probs = get_playoff_probs(tmp_path, "loop", teams, remaining_matchups)
+    random.seed(1)
+    assert get_playoff_probs(
+        tmp_path, "loop", teams, remaining_matchups, team_weekly_points=team_weekly_points, model="scores"
+    ) == loop_playoff_probs
@@ -0,0 +1,206 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "uberfastman@uberfastman.dev"
+
+import random
+import sys
+from collections import defaultdict, OrderedDict
+from pathlib import Path
+from typing import List, Dict, Any, Tuple
+
+import pytest
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+
+from calculate.metrics import CalculateMetrics  # noqa: E402
+from dao.base import BaseLeague, BaseTeam, BaseRecord  # noqa: E402
+from utilities.logger import get_logger  # noqa: E402
+from utilities.settings import settings  # noqa: E402
+
+logger = get_logger(__file__)
+
+num_teams = 10
+num_weeks = 14
+
+
+def get_league(data_dir: Path, seed: int) -> Tuple[BaseLeague, Dict[str, List[Dict[str, Dict[str, Any]]]]]:
+    rng = random.Random(seed)
+
+    league = BaseLeague(root_dir, data_dir, "1", 2023, num_weeks)
+    league.start_week = 1
+
+    custom_weekly_matchups_by_week = {}
+    for week in range(1, num_weeks + 1):
+        league.teams_by_week[str(week)] = {}
+        for team_ndx in range(num_teams):
+            team = BaseTeam()
+            team.team_id = str(team_ndx + 1)
+            team.name = f"Team {team_ndx + 1}"
+            team.division = team_ndx % 2
+            # some scores are repeated so that teams tie their matchups and tie in the standings
+            team.points = rng.choice([100.0, round(rng.uniform(50, 150), 2)])
+            league.teams_by_week[str(week)][team.team_id] = team
+
+        team_ids = list(league.teams_by_week[str(week)].keys())
+        rng.shuffle(team_ids)
+        custom_weekly_matchups_by_week[str(week)] = []
+        for team_1_id, team_2_id in zip(team_ids[::2], team_ids[1::2]):
+            team_1 = league.teams_by_week[str(week)][team_1_id]
+            team_2 = league.teams_by_week[str(week)][team_2_id]
+            is_division_matchup = team_1.division == team_2.division
+            custom_weekly_matchups_by_week[str(week)].append({
+                team_1_id: {
+                    "result": "W" if team_1.points > team_2.points else "L" if team_1.points < team_2.points else "T",
+                    "points_for": team_1.points,
+                    "points_against": team_2.points,
+                    "division": is_division_matchup
+                },
+                team_2_id: {
+                    "result": "W" if team_2.points > team_1.points else "L" if team_2.points < team_1.points else "T",
+                    "points_for": team_2.points,
+                    "points_against": team_1.points,
+                    "division": is_division_matchup
+                }
+            })
+
+    return league, custom_weekly_matchups_by_week
+
+
+def get_original_records(week: int, league: BaseLeague,
+                         custom_weekly_matchups: List[Dict[str, Dict[str, Any]]]) -> Dict[str, BaseRecord]:
+    """League records calculated by copying and updating the records of the previous week (the original records
+    calculation).
+    """
+    records = defaultdict(BaseRecord)
+    for team in league.standings:
+        if week == league.start_week:
+            record = BaseRecord(week, team_id=team.team_id, team_name=team.name, division=team.division)
+        else:
+            previous_week_record: BaseRecord = league.records_by_week[str(week - 1)][team.team_id]
+            record = BaseRecord(
+                week,
+                wins=previous_week_record.get_wins(),
+                ties=previous_week_record.get_ties(),
+                losses=previous_week_record.get_losses(),
+                points_for=previous_week_record.get_points_for(),
+                points_against=previous_week_record.get_points_against(),
+                streak_type=previous_week_record.get_streak_type(),
+                streak_len=previous_week_record.get_streak_length(),
+                team_id=team.team_id,
+                team_name=team.name,
+                division=team.division,
+                division_wins=previous_week_record.get_division_wins(),
+                division_ties=previous_week_record.get_division_ties(),
+                division_losses=previous_week_record.get_division_losses(),
+                division_points_for=previous_week_record.get_division_points_for(),
+                division_points_against=previous_week_record.get_division_points_against(),
+                division_streak_type=previous_week_record.get_division_streak_type(),
+                division_streak_len=previous_week_record.get_division_streak_length()
+            )
+
+        for matchup in custom_weekly_matchups:
+            for team_id, matchup_result in matchup.items():
+                if str(team_id) == str(team.team_id):
+                    outcome = matchup_result["result"]
+                    if outcome == "W":
+                        record.add_win()
+                        if matchup_result["division"]:
+                            record.add_division_win()
+                    elif outcome == "L":
+                        record.add_loss()
+                        if matchup_result["division"]:
+                            record.add_division_loss()
+                    else:
+                        record.add_tie()
+                        if matchup_result["division"]:
+                            record.add_division_tie()
+                    record.add_points_for(matchup_result["points_for"])
+                    record.add_points_against(matchup_result["points_against"])
+                    if matchup_result["division"]:
+                        record.add_division_points_for(matchup_result["points_for"])
+                        record.add_division_points_against(matchup_result["points_against"])
+                    records[team.team_id] = record
+
+        team.record = record
+
+    ordered_records = OrderedDict()
+    standings_rank = 1
+    for team_id, record in sorted(
+            records.items(),
+            key=lambda x: (-x[1].get_wins(), -x[1].get_losses(), -x[1].get_ties(), -x[1].get_points_for())):
+        record.rank = standings_rank
+        ordered_records[team_id] = record
+        standings_rank += 1
+
+    league.records_by_week[str(week)] = ordered_records
+    return records
+
+
+def assert_records_equal(records: Dict[str, BaseRecord], expected_records: Dict[str, BaseRecord]) -> None:
+    # records are ordered by their rank in the standings
+    assert list(records.keys()) == list(expected_records.keys())
+    for team_id, expected_record in expected_records.items():
+        assert records[team_id].__dict__ == expected_record.__dict__
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_records_engine_matches_original_records(tmp_path, monkeypatch, seed):
+    monkeypatch.setattr(settings, "records_state_cache_bool", False)
+
+    original_league, custom_weekly_matchups_by_week = get_league(tmp_path, seed)
+    league, _ = get_league(tmp_path, seed)
+
+    for week in range(1, num_weeks + 1):
+        original_league.standings = list(original_league.teams_by_week[str(week)].values())
+        league.standings = list(league.teams_by_week[str(week)].values())
+
+        get_original_records(week, original_league, custom_weekly_matchups_by_week[str(week)])
+        CalculateMetrics.calculate_records(week, league, custom_weekly_matchups_by_week[str(week)])
+
+        assert_records_equal(league.records_by_week[str(week)], original_league.records_by_week[str(week)])
+
+    assert not (tmp_path / "2023" / "1" / "records_state.json").exists()
+
+
+def test_records_engine_resumes_from_persisted_state(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "records_state_cache_bool", True)
+
+    league, custom_weekly_matchups_by_week = get_league(tmp_path, 1)
+    for week in range(1, num_weeks + 1):
+        league.standings = list(league.teams_by_week[str(week)].values())
+        CalculateMetrics.calculate_records(week, league, custom_weekly_matchups_by_week[str(week)])
+
+    assert (tmp_path / "2023" / "1" / "records_state.json").exists()
+
+    # a later run loads the records of every week from the persisted state instead of replaying the season
+    resumed_league, _ = get_league(tmp_path, 1)
+    records_engine = CalculateMetrics.get_records_engine(resumed_league)
+    assert sorted(records_engine.snapshots_by_week.keys(), key=int) == [str(wk) for wk in range(1, num_weeks + 1)]
+
+    resumed_league.standings = list(resumed_league.teams_by_week[str(num_weeks)].values())
+    records = CalculateMetrics.calculate_records(
+        num_weeks, resumed_league, custom_weekly_matchups_by_week[str(num_weeks)]
+    )
+    assert_records_equal(records, league.records_by_week[str(num_weeks)])
+
+
+def test_records_engine_discards_later_weeks_when_matchups_change(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "records_state_cache_bool", False)
+
+    league, custom_weekly_matchups_by_week = get_league(tmp_path, 2)
+    records_engine = CalculateMetrics.get_records_engine(league)
+    for week in range(1, num_weeks + 1):
+        records_engine.update(week, custom_weekly_matchups_by_week[str(week)])
+
+    # a corrected score in week 5 changes the records of week 5 and invalidates the records built on them
+    changed_matchups = [
+        {team_id: dict(matchup_result) for team_id, matchup_result in matchup.items()}
+        for matchup in custom_weekly_matchups_by_week["5"]
+    ]
+    for matchup_result in changed_matchups[0].values():
+        matchup_result["points_for"] += 1.0
+    records_engine.update(5, changed_matchups)
+
+    assert sorted(records_engine.snapshots_by_week.keys(), key=int) == [str(wk) for wk in range(1, 6)]
+    with pytest.raises(ValueError):
+        records_engine.update(7, custom_weekly_matchups_by_week["7"])
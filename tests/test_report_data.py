@@ -0,0 +1,170 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "uberfastman@uberfastman.dev"
+
+import json
+import random
+import sys
+from pathlib import Path
+from typing import Dict, Any
+
+import pytest
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+
+import report.builder as builder  # noqa: E402
+from dao.base import BaseLeague, BaseMatchup, BasePlayer, BaseTeam  # noqa: E402
+from utilities.logger import get_logger  # noqa: E402
+from utilities.settings import settings  # noqa: E402
+from utilities.utils import normalize_player_name  # noqa: E402
+
+logger = get_logger(__file__)
+
+num_teams = 10
+num_weeks = 8
+roster_slots = ["QB", "RB", "RB", "WR", "WR", "TE", "FLEX", "K", "D/ST", "BN", "BN", "BN", "BN"]
+positions = ["QB", "RB", "WR", "TE", "K", "D/ST"]
+
+
+def get_league(data_dir: Path, seed: int = 1) -> BaseLeague:
+    rng = random.Random(seed)
+
+    league = BaseLeague(root_dir, data_dir, "1", 2023, num_weeks)
+    league.name = "Test League"
+    league.url = "https://example.com"
+    league.start_week = 1
+    league.num_teams = num_teams
+    league.num_regular_season_weeks = 14
+    league.num_playoff_slots = 0
+    league.roster_position_counts.update({"QB": 1, "RB": 2, "WR": 2, "TE": 1, "FLEX": 1, "K": 1, "D/ST": 1, "BN": 4})
+    league.roster_active_slots = [slot for slot in roster_slots if slot != "BN"]
+    league.bench_positions = ["BN", "IR"]
+    league.flex_positions_rb_te_wr = ["RB", "WR", "TE"]
+
+    for week in range(1, num_weeks + 1):
+        league.teams_by_week[str(week)] = {}
+        league.players_by_week[str(week)] = {}
+        for team_ndx in range(num_teams):
+            team = BaseTeam()
+            team.team_id = str(team_ndx + 1)
+            team.name = f"Team {team_ndx + 1}"
+            team.manager_str = f"Manager {team_ndx + 1}"
+            team.roster = []
+            for player_ndx, selected_position in enumerate(roster_slots):
+                player = BasePlayer()
+                player.player_id = f"{team.team_id}-{player_ndx}"
+                player.first_name = "Player"
+                player.last_name = f"{team.team_id}-{player_ndx}"
+                player.full_name = f"Player {team.team_id}-{player_ndx}"
+                player.primary_position = (
+                    "RB" if selected_position == "FLEX" else
+                    rng.choice(positions) if selected_position == "BN" else
+                    selected_position
+                )
+                player.selected_position = selected_position
+                player.eligible_positions = {player.primary_position} | (
+                    {"FLEX"} if player.primary_position in league.flex_positions_rb_te_wr else set()
+                )
+                player.points = round(rng.uniform(0, 30), 2)
+                team.roster.append(player)
+                league.players_by_week[str(week)][player.player_id] = player
+            team.points = round(
+                sum(player.points for player in team.roster if player.selected_position not in league.bench_positions),
+                2
+            )
+            league.teams_by_week[str(week)][team.team_id] = team
+
+        league.matchups_by_week[str(week)] = []
+        teams = list(league.teams_by_week[str(week)].values())
+        rng.shuffle(teams)
+        for team_1, team_2 in zip(teams[::2], teams[1::2]):
+            matchup = BaseMatchup()
+            matchup.week = week
+            matchup.complete = True
+            matchup.teams = [team_1, team_2]
+            matchup.winner, matchup.loser = (team_1, team_2) if team_1.points >= team_2.points else (team_2, team_1)
+            league.matchups_by_week[str(week)].append(matchup)
+
+    league.current_standings = list(league.teams_by_week["1"].values())
+
+    return league
+
+
+def get_report_data(data_dir: Path, monkeypatch) -> Dict[str, Any]:
+    league = get_league(data_dir)
+    generated_report_data = {}
+
+    class PdfGenerator(object):
+        def __init__(self, report_data, **kwargs):
+            generated_report_data["report_data"] = report_data
+
+        def generate_pdf(self, filename_with_path: Path, line_chart_data_list):
+            generated_report_data["line_chart_data"] = line_chart_data_list
+            return filename_with_path
+
+    # the benched players of the first team did not play in even weeks, so it is disqualified from coaching efficiency
+    inactive_players_by_week = {}
+    for week in range(2, num_weeks + 1, 2):
+        bench_players = [
+            player for player in league.teams_by_week[str(week)]["1"].roster if player.selected_position == "BN"
+        ]
+        for player in bench_players:
+            player.points = 0.0
+        inactive_players_by_week[week] = [normalize_player_name(player.full_name) for player in bench_players]
+
+    monkeypatch.setattr(builder, "league_data_factory", lambda **kwargs: league)
+    monkeypatch.setattr(builder, "PdfGenerator", PdfGenerator)
+    monkeypatch.setattr(builder, "get_inactive_players", lambda week, _: inactive_players_by_week.get(week, []))
+
+    builder.FantasyFootballReport(league_id="1", season=2023, playoff_prob_sims=100, dq_ce=True).create_pdf_report()
+
+    report_data = generated_report_data["report_data"]
+    return json.loads(json.dumps(
+        {
+            **{
+                attribute: getattr(report_data, attribute) for attribute in [
+                    "data_for_scores",
+                    "data_for_coaching_efficiency",
+                    "data_for_luck",
+                    "data_for_optimal_scores",
+                    "data_for_power_rankings",
+                    "data_for_z_scores",
+                    "data_for_current_standings",
+                    "data_for_season_avg_points_by_position",
+                    "data_for_season_weekly_top_scorers",
+                    "data_for_season_weekly_low_scorers",
+                    "data_for_season_weekly_highest_ce"
+                ]
+            },
+            "line_chart_data": generated_report_data["line_chart_data"]
+        },
+        default=str
+    ))
+
+
+@pytest.fixture(autouse=True)
+def report_settings(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "output_dir_path", tmp_path / "output")
+    monkeypatch.setattr(settings.report_settings, "league_bad_boy_rankings_bool", False)
+    monkeypatch.setattr(settings.report_settings, "league_beef_rankings_bool", False)
+    monkeypatch.setattr(settings.report_settings, "league_high_roller_rankings_bool", False)
+    monkeypatch.setattr(settings, "records_state_cache_bool", False)
+    monkeypatch.setattr(settings, "report_data_snapshots_bool", False)
+
+
+def test_report_data_is_independent_of_workers(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "report_weekly_metrics_workers", 1)
+    monkeypatch.setattr(settings, "coaching_efficiency_workers", 1)
+    report_data = get_report_data(tmp_path / "serial", monkeypatch)
+
+    monkeypatch.setattr(settings, "report_weekly_metrics_workers", 4)
+    monkeypatch.setattr(settings, "coaching_efficiency_workers", 4)
+    concurrent_report_data = get_report_data(tmp_path / "concurrent", monkeypatch)
+
+    # the coaching efficiency of the disqualified weeks is left out of the coaching efficiency time series
+    assert sorted(len(team_efficiency) for team_efficiency in report_data["line_chart_data"][3]) == (
+        [num_weeks // 2] + [num_weeks] * (num_teams - 1)
+    )
+    assert report_data.keys() == concurrent_report_data.keys()
+    for key, data in report_data.items():
+        assert data == concurrent_report_data[key], key
@@ -0,0 +1,153 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "uberfastman@uberfastman.dev"
+
+import random
+import sys
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+
+from dao.base import BaseLeague, BaseMatchup, BasePlayer, BaseTeam  # noqa: E402
+from report.snapshots import ReportDataSnapshots  # noqa: E402
+from utilities.logger import get_logger  # noqa: E402
+
+logger = get_logger(__file__)
+
+num_teams = 4
+num_weeks = 6
+changed_week = 4
+
+
+def get_league(data_dir: Path, seed: int = 1) -> BaseLeague:
+    rng = random.Random(seed)
+
+    league = BaseLeague(root_dir, data_dir, "1", 2023, num_weeks)
+    league.start_week = 1
+    league.roster_position_counts.update({"QB": 1, "BN": 1})
+
+    for week in range(1, num_weeks + 1):
+        league.teams_by_week[str(week)] = {}
+        for team_ndx in range(num_teams):
+            team = BaseTeam()
+            team.team_id = str(team_ndx + 1)
+            team.name = f"Team {team_ndx + 1}"
+            team.manager_str = f"Manager {team_ndx + 1}"
+            team.roster = []
+            for selected_position in ["QB", "BN"]:
+                player = BasePlayer()
+                player.player_id = f"{team.team_id}-{selected_position}"
+                player.full_name = f"Player {team.team_id} {selected_position}"
+                player.primary_position = "QB"
+                player.selected_position = selected_position
+                player.eligible_positions = {"QB"}
+                player.points = round(rng.uniform(0, 30), 2)
+                team.roster.append(player)
+            team.points = team.roster[0].points
+            league.teams_by_week[str(week)][team.team_id] = team
+
+        league.matchups_by_week[str(week)] = []
+        teams = list(league.teams_by_week[str(week)].values())
+        for team_1, team_2 in zip(teams[::2], teams[1::2]):
+            matchup = BaseMatchup()
+            matchup.week = week
+            matchup.complete = True
+            matchup.teams = [team_1, team_2]
+            matchup.winner, matchup.loser = (team_1, team_2) if team_1.points >= team_2.points else (team_2, team_1)
+            league.matchups_by_week[str(week)].append(matchup)
+
+    return league
+
+
+def change_week_inputs(league: BaseLeague, week: int) -> None:
+    # a stat correction to a benched player changes the inputs of the week without changing any matchup result
+    league.teams_by_week[str(week)]["1"].roster[1].points += 1.0
+
+
+def test_input_hashes_are_stable(tmp_path):
+    snapshots = ReportDataSnapshots(get_league(tmp_path))
+    same_snapshots = ReportDataSnapshots(get_league(tmp_path))
+
+    for week in range(1, num_weeks + 1):
+        assert snapshots.get_input_hash(week) == same_snapshots.get_input_hash(week)
+    assert len({snapshots.get_input_hash(week) for week in range(1, num_weeks + 1)}) == num_weeks
+
+
+def test_input_hashes_are_chained_to_previous_weeks(tmp_path):
+    snapshots = ReportDataSnapshots(get_league(tmp_path))
+
+    changed_league = get_league(tmp_path)
+    change_week_inputs(changed_league, changed_week)
+    changed_snapshots = ReportDataSnapshots(changed_league)
+
+    # the weeks before the changed week keep their hashes, while the changed week and every later week (which depend on
+    # it through z-scores and records) get new ones
+    for week in range(1, changed_week):
+        assert snapshots.get_input_hash(week) == changed_snapshots.get_input_hash(week)
+    for week in range(changed_week, num_weeks + 1):
+        assert snapshots.get_input_hash(week) != changed_snapshots.get_input_hash(week)
+
+
+def test_input_hashes_include_report_options(tmp_path):
+    snapshots = ReportDataSnapshots(get_league(tmp_path))
+    break_ties_snapshots = ReportDataSnapshots(get_league(tmp_path), break_ties=True)
+
+    for week in range(1, num_weeks + 1):
+        assert snapshots.get_input_hash(week) != break_ties_snapshots.get_input_hash(week)
+
+
+def test_input_hashes_include_inactive_players_with_dq_ce(tmp_path):
+    inactive_players_by_week = {week: ["Player 2 QB", "Player 1 BN"] for week in range(1, num_weeks + 1)}
+    changed_inactive_players_by_week = {week: list(players) for week, players in inactive_players_by_week.items()}
+    changed_inactive_players_by_week[changed_week].append("Player 3 QB")
+
+    snapshots = ReportDataSnapshots(
+        get_league(tmp_path), dq_ce=True, inactive_players_function=lambda wk, _: inactive_players_by_week[wk]
+    )
+    reordered_snapshots = ReportDataSnapshots(
+        get_league(tmp_path), dq_ce=True, inactive_players_function=lambda wk, _: inactive_players_by_week[wk][::-1]
+    )
+    changed_snapshots = ReportDataSnapshots(
+        get_league(tmp_path), dq_ce=True, inactive_players_function=lambda wk, _: changed_inactive_players_by_week[wk]
+    )
+
+    # a player becoming inactive can disqualify a team from coaching efficiency in the changed week, which changes the
+    # hashes of that week and every later week, while the order of the inactive players does not change any hash
+    for week in range(1, num_weeks + 1):
+        assert snapshots.get_input_hash(week) == reordered_snapshots.get_input_hash(week)
+    for week in range(1, changed_week):
+        assert snapshots.get_input_hash(week) == changed_snapshots.get_input_hash(week)
+    for week in range(changed_week, num_weeks + 1):
+        assert snapshots.get_input_hash(week) != changed_snapshots.get_input_hash(week)
+
+
+def test_inactive_players_are_only_retrieved_with_dq_ce(tmp_path):
+    def get_inactive_players(week, league):
+        raise AssertionError(f"Inactive players retrieved for week {week} without dq_ce.")
+
+    snapshots = ReportDataSnapshots(get_league(tmp_path), inactive_players_function=get_inactive_players)
+    for week in range(1, num_weeks + 1):
+        assert snapshots.get_input_hash(week)
+
+
+def test_snapshots_are_only_loaded_for_unchanged_weeks(tmp_path):
+    snapshots = ReportDataSnapshots(get_league(tmp_path))
+    for week in range(1, num_weeks + 1):
+        snapshots.save(week, {"week": week})
+
+    # snapshots are written atomically without leaving any temporary files behind
+    assert sorted(file_path.name for file_path in snapshots.snapshots_dir.iterdir()) == sorted(
+        f"week_{week}-report_data.json" for week in range(1, num_weeks + 1)
+    )
+
+    unchanged_snapshots = ReportDataSnapshots(get_league(tmp_path))
+    for week in range(1, num_weeks + 1):
+        assert unchanged_snapshots.load(week) == {"week": week}
+
+    changed_league = get_league(tmp_path)
+    change_week_inputs(changed_league, changed_week)
+    changed_snapshots = ReportDataSnapshots(changed_league)
+    for week in range(1, changed_week):
+        assert changed_snapshots.load(week) == {"week": week}
+    for week in range(changed_week, num_weeks + 1):
+        assert changed_snapshots.load(week) is None
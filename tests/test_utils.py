@@ -0,0 +1,54 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "uberfastman@uberfastman.dev"
+
+import stat
+import sys
+from pathlib import Path
+
+import pytest
+
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+
+from utilities.logger import get_logger  # noqa: E402
+from utilities.utils import open_for_atomic_write  # noqa: E402
+
+logger = get_logger(__file__)
+
+
+def test_open_for_atomic_write_creates_file(tmp_path):
+    file_path = tmp_path / "week_1" / "data.json"
+
+    with open_for_atomic_write(file_path) as data_out:
+        data_out.write("{\"points\": 100.0}")
+
+    assert file_path.read_text(encoding="utf-8") == "{\"points\": 100.0}"
+    # the file is readable by everyone like a file created with open instead of only by its owner like a temporary file
+    assert stat.S_IMODE(file_path.stat().st_mode) == 0o644
+    assert list(file_path.parent.iterdir()) == [file_path]
+
+
+def test_open_for_atomic_write_replaces_file(tmp_path):
+    file_path = tmp_path / "data.json"
+    file_path.write_text("old", encoding="utf-8")
+
+    with open_for_atomic_write(file_path) as data_out:
+        data_out.write("new")
+        # the file keeps its old content until the new content has been completely written
+        assert file_path.read_text(encoding="utf-8") == "old"
+
+    assert file_path.read_text(encoding="utf-8") == "new"
+    assert list(tmp_path.iterdir()) == [file_path]
+
+
+def test_open_for_atomic_write_keeps_file_on_failure(tmp_path):
+    file_path = tmp_path / "data.json"
+    file_path.write_text("old", encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        with open_for_atomic_write(file_path) as data_out:
+            data_out.write("partial")
+            raise ValueError("interrupted write")
+
+    assert file_path.read_text(encoding="utf-8") == "old"
+    assert list(tmp_path.iterdir()) == [file_path]
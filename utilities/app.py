@@ -8,10 +8,9 @@ import sys
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Union, Any
+from typing import List, Dict, Union, Any, Optional, TYPE_CHECKING
 
 import colorama
-import requests
 from bs4 import BeautifulSoup
 from colorama import Fore, Style
 from git import Repo, TagReference, cmd
@@ -28,10 +27,14 @@ from features.bad_boy import BadBoyFeature
 from features.beef import BeefFeature
 from features.high_roller import HighRollerFeature
 from utilities.constants import prohibited_statuses
+from utilities.http_client import get_http_session
 from utilities.logger import get_logger
 from utilities.settings import settings
 from utilities.utils import format_platform_display, normalize_player_name, get_data_from_web
 
+if TYPE_CHECKING:
+    from report.batch import SharedReportResources
+
 logger = get_logger(__name__, propagate=False)
 
 colorama.init()
@@ -123,7 +126,7 @@ def get_current_nfl_week(offline: bool) -> int:
         logger.debug("Retrieving current NFL week from the Sleeper API.")
 
         try:
-            nfl_weekly_info = requests.get(api_url).json()
+            nfl_weekly_info = get_http_session().get(api_url).json()
             current_nfl_week = nfl_weekly_info.get("leg")
         except (KeyError, ValueError) as e:
             logger.warning("Unable to retrieve current NFL week. Defaulting to value set in \".env\" file.")
@@ -138,7 +141,8 @@ def get_current_nfl_week(offline: bool) -> int:
 
 def league_data_factory(base_dir: Path, data_dir: Path, platform: str,
                         game_id: Union[str, int], league_id: str, season: int, start_week: int, week_for_report: int,
-                        save_data: bool, offline: bool) -> BaseLeague:
+                        save_data: bool, offline: bool,
+                        shared_resources: Optional["SharedReportResources"] = None) -> BaseLeague:
     if platform in settings.supported_platforms_list:
         if platform == "yahoo":
             yahoo_league = YahooLeagueData(
@@ -182,7 +186,8 @@ def league_data_factory(base_dir: Path, data_dir: Path, platform: str,
                 get_current_nfl_week,
                 user_week_input_validation,
                 save_data,
-                offline
+                offline,
+                shared_resources=shared_resources
             )
             return sleeper_league.map_data_to_base()
 
@@ -339,13 +344,13 @@ def add_report_team_stats(team: BaseTeam, league: BaseLeague, week_counter: int,
         team.positions_filled_active,
         int(week_counter),
         inactive_players,
-        dq_eligible=dq_ce
+        dq_eligible=dq_ce,
+        team_id=team.team_id
     )
 
-    # # retrieve luck and record
+    # # retrieve luck
     team.luck = metrics.get("luck").get(team.team_id).get("luck")
     team.weekly_overall_record = metrics.get("luck").get(team.team_id).get("luck_record")
-    team.record = metrics.get("records").get(team.team_id)
 
     return team
 
@@ -375,7 +380,7 @@ def get_inactive_players(week: int, league: BaseLeague) -> List[str]:
             "type": "reg"
         }
 
-        response = requests.get(
+        response = get_http_session().get(
             "https://www.footballdb.com/transactions/injuries.html", headers=headers, params=params
         )
 
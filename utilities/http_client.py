@@ -0,0 +1,112 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "uberfastman@uberfastman.dev"
+
+import threading
+import time
+from typing import Optional, Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utilities.logger import get_logger
+from utilities.settings import settings
+
+logger = get_logger(__name__, propagate=False)
+
+# response status codes of throttled or temporarily failed requests that are retried with backoff
+RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+
+_http_session: Optional[requests.Session] = None
+_http_session_lock = threading.Lock()
+
+_rate_limiters: Dict[str, "RateLimiter"] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTP adapter that applies a default timeout to every request sent without its own timeout.
+    """
+
+    def __init__(self, *args, timeout: Optional[float] = None, **kwargs):
+        self.timeout: Optional[float] = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def get_http_session() -> requests.Session:
+    """Get the HTTP session shared by all platform and feature web requests, which keeps connections alive in per-host
+    pools of up to HTTP_POOL_MAXSIZE connections and retries throttled and failed requests with exponential backoff.
+    """
+    global _http_session
+
+    with _http_session_lock:
+        if _http_session is None:
+            logger.debug("Creating shared HTTP session.")
+
+            retry = Retry(
+                total=settings.http_retries,
+                backoff_factor=settings.http_retry_backoff_factor,
+                status_forcelist=RETRY_STATUS_CODES,
+                # platform and feature POST requests only query data, so they are as safe to retry as GET requests
+                allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {"POST"},
+                respect_retry_after_header=True,
+                # return the last response once the retries are exhausted so callers handle it like any other response
+                raise_on_status=False
+            )
+            http_adapter = TimeoutHTTPAdapter(
+                timeout=settings.http_timeout_seconds,
+                max_retries=retry,
+                pool_connections=settings.http_pool_connections,
+                pool_maxsize=settings.http_pool_maxsize,
+                # wait for a free connection instead of opening connections beyond the per-host limit
+                pool_block=True
+            )
+
+            http_session = requests.Session()
+            http_session.mount("https://", http_adapter)
+            http_session.mount("http://", http_adapter)
+            _http_session = http_session
+
+        return _http_session
+
+
+class RateLimiter(object):
+    """Thread-safe limiter that spaces out the requests to a host to a maximum number of requests per second, and holds
+    back all of them for a while after the host throttles a request.
+    """
+
+    def __init__(self, requests_per_second: float):
+        self.interval: float = 1.0 / requests_per_second
+        self.next_request_time: float = 0.0
+        self.lock: threading.Lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Wait until the next request to the host is allowed.
+        """
+        with self.lock:
+            now = time.monotonic()
+            wait_seconds = self.next_request_time - now
+            self.next_request_time = max(now, self.next_request_time) + self.interval
+
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every request to the host that has not started yet for the given number of seconds.
+        """
+        with self.lock:
+            self.next_request_time = max(self.next_request_time, time.monotonic() + seconds)
+
+
+def get_rate_limiter(host: str, requests_per_second: float) -> RateLimiter:
+    """Get the rate limiter of a host, which is shared by every league retrieving data from that host in the process.
+    """
+    with _rate_limiters_lock:
+        if host not in _rate_limiters:
+            _rate_limiters[host] = RateLimiter(requests_per_second)
+        return _rate_limiters[host]
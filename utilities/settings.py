@@ -196,6 +196,21 @@ class PlatformSettings(CustomSettings):
         title=__qualname__,
         description="YAHOO LEAGUES ONLY: default FAAB since the initial/starting FAAB is not exposed in the API"
     )
+    yahoo_fetch_workers: int = Field(
+        4,
+        ge=1,
+        title=__qualname__,
+        description="YAHOO LEAGUES ONLY: number of concurrent Yahoo queries used to retrieve the weekly league data"
+    )
+    yahoo_requests_per_second: float = Field(
+        4.0,
+        gt=0,
+        title=__qualname__,
+        description=(
+            "YAHOO LEAGUES ONLY: maximum number of Yahoo queries started per second (shared by all leagues in the same "
+            "process), which can be lowered if Yahoo responds with 999 rate limiting errors"
+        )
+    )
 
     # espn
     espn_username: Optional[str] = Field(None, title=__qualname__)
@@ -214,11 +229,37 @@ class PlatformSettings(CustomSettings):
 
     espn_cookie_swid: Optional[str] = Field(None, title=__qualname__)
     espn_cookie_espn_s2: Optional[str] = Field(None, title=__qualname__)
+    espn_fetch_workers: int = Field(
+        4,
+        ge=1,
+        title=__qualname__,
+        description="ESPN LEAGUES ONLY: number of concurrent ESPN requests used to retrieve the weekly box scores"
+    )
+
+    # fleaflicker
+    fleaflicker_fetch_workers: int = Field(
+        4,
+        ge=1,
+        title=__qualname__,
+        description=(
+            "FLEAFLICKER LEAGUES ONLY: number of concurrent Fleaflicker queries used to retrieve the weekly "
+            "scoreboards and team rosters"
+        )
+    )
 
     # cbs
     cbs_username: Optional[str] = Field(None, title=__qualname__)
     cbs_password: Optional[str] = Field(None, title=__qualname__)
     cbs_auth_token: Optional[str] = Field(None, title=__qualname__)
+    cbs_fetch_workers: int = Field(
+        4,
+        ge=1,
+        title=__qualname__,
+        description=(
+            "CBS LEAGUES ONLY: number of concurrent CBS queries used to retrieve the weekly scoring of players who are "
+            "no longer rostered"
+        )
+    )
 
 
 class ReportSettings(CustomSettings):
@@ -429,6 +470,87 @@ class AppSettings(CustomSettings):
             "generation take longer to complete"
         )
     )
+    playoff_simulation_engine: str = Field(
+        "vectorized",
+        title=__qualname__,
+        description=(
+            "options for PLAYOFF_SIMULATION_ENGINE: vectorized (runs the Monte Carlo playoff simulations in batches "
+            "with NumPy array operations), loop (runs each Monte Carlo playoff simulation one at a time in Python)"
+        )
+    )
+    playoff_simulation_model: str = Field(
+        "coin_flip",
+        title=__qualname__,
+        description=(
+            "VECTORIZED PLAYOFF SIMULATION ENGINE ONLY: options for PLAYOFF_SIMULATION_MODEL: coin_flip (decides each "
+            "remaining matchup with a coin flip), scores (decides each remaining matchup with scores resampled from "
+            "each team's weekly points so far, which are also added to points for to break ties)"
+        )
+    )
+    playoff_simulation_seed: Optional[int] = Field(
+        None,
+        title=__qualname__,
+        description=(
+            "VECTORIZED PLAYOFF SIMULATION ENGINE ONLY: set an integer seed to make the Monte Carlo playoff "
+            "simulations reproducible (results are identical for the same seed and number of workers), or leave empty "
+            "to use a random seed for every run"
+        )
+    )
+    playoff_simulation_workers: int = Field(
+        1,
+        ge=1,
+        title=__qualname__,
+        description=(
+            "VECTORIZED PLAYOFF SIMULATION ENGINE ONLY: number of processes across which the Monte Carlo playoff "
+            "simulations are split into independently seeded shards (1 runs all simulations in the main process)"
+        )
+    )
+    playoff_simulation_convergence_bool: bool = Field(
+        False,
+        title=__qualname__,
+        description=(
+            "VECTORIZED PLAYOFF SIMULATION ENGINE ONLY: change PLAYOFF_SIMULATION_CONVERGENCE_BOOL to True/False to "
+            "turn on/off stopping the Monte Carlo playoff simulations early (in batches of "
+            "PLAYOFF_SIMULATION_CONVERGENCE_MIN_SIMULATIONS) once every team's playoff chance is precise enough, in "
+            "which case NUM_PLAYOFF_SIMULATIONS is the maximum number of simulations that will be run"
+        )
+    )
+    playoff_simulation_convergence_tolerance: float = Field(
+        1.0,
+        gt=0,
+        title=__qualname__,
+        description=(
+            "widest allowed 95% confidence interval (in percentage points) of any team's playoff chance before the "
+            "Monte Carlo playoff simulations are considered converged"
+        )
+    )
+    playoff_simulation_convergence_min_simulations: int = Field(
+        1000,
+        ge=1,
+        title=__qualname__,
+        description="minimum number of Monte Carlo playoff simulations to run before checking for convergence"
+    )
+    playoff_simulation_bracket_bool: bool = Field(
+        False,
+        title=__qualname__,
+        description=(
+            "VECTORIZED PLAYOFF SIMULATION ENGINE ONLY: change PLAYOFF_SIMULATION_BRACKET_BOOL to True/False to turn "
+            "on/off simulating the playoff bracket after each Monte Carlo playoff simulation to add the odds of every "
+            "team reaching each playoff round and winning the championship to the playoff probabilities table (the "
+            "bracket is a generic single elimination bracket sized to the next power of two above NUM_PLAYOFF_SLOTS "
+            "with byes for the top seeds and one game per round, NOT the bracket, byes, reseeding, or multi-week "
+            "rounds configured on the platform)"
+        )
+    )
+    playoff_simulation_cache_bool: bool = Field(
+        True,
+        title=__qualname__,
+        description=(
+            "change PLAYOFF_SIMULATION_CACHE_BOOL to True/False to turn on/off reusing previously calculated playoff "
+            "probabilities (stored in the league data directory) when the standings, remaining schedule, and playoff "
+            "simulation settings have not changed since they were calculated"
+        )
+    )
     num_playoff_slots: int = Field(
         6,
         title=__qualname__,
@@ -453,6 +575,138 @@ class AppSettings(CustomSettings):
             "COACHING_EFFICIENCY_DISQUALIFIED_TEAMS_LIST=\"Team One,Team Two\""
         )
     )
+    report_data_snapshots_bool: bool = Field(
+        True,
+        title=__qualname__,
+        description=(
+            "change REPORT_DATA_SNAPSHOTS_BOOL to True/False to turn on/off reusing the report data of completed weeks "
+            "(stored in the league data directory when saving data) when none of the inputs of the week or previous "
+            "weeks have changed"
+        )
+    )
+    http_timeout_seconds: int = Field(
+        30,
+        ge=1,
+        title=__qualname__,
+        description="number of seconds platform and feature web requests wait for a response before failing"
+    )
+    http_retries: int = Field(
+        3,
+        ge=0,
+        title=__qualname__,
+        description=(
+            "number of times platform and feature web requests are retried after connection errors or throttled (429) "
+            "and server error (5xx) responses"
+        )
+    )
+    http_retry_backoff_factor: float = Field(
+        0.5,
+        ge=0,
+        title=__qualname__,
+        description=(
+            "number of seconds multiplied by 2 to the power of the number of previous retries that a web request waits "
+            "before it is retried (unless the response sets how long to wait)"
+        )
+    )
+    http_pool_connections: int = Field(
+        10,
+        ge=1,
+        title=__qualname__,
+        description="number of hosts for which the shared HTTP session keeps a pool of open connections"
+    )
+    http_pool_maxsize: int = Field(
+        100,
+        ge=1,
+        title=__qualname__,
+        description="maximum number of open connections to each host (requests wait for a free connection beyond it)"
+    )
+    batch_report_workers: int = Field(
+        4,
+        ge=1,
+        title=__qualname__,
+        description=(
+            "number of league reports run concurrently by the batch report runner (main.py -j), which share the "
+            "league-independent feature data and inactive players"
+        )
+    )
+    report_service_host: str = Field(
+        "127.0.0.1",
+        title=__qualname__,
+        description="host on which the local report service (main.py -a) accepts report jobs"
+    )
+    report_service_port: int = Field(
+        8787,
+        title=__qualname__,
+        description="port on which the local report service (main.py -a) accepts report jobs"
+    )
+    report_service_workers: int = Field(
+        2,
+        ge=1,
+        title=__qualname__,
+        description="number of report jobs the local report service runs concurrently"
+    )
+    report_service_queue_size: int = Field(
+        100,
+        ge=1,
+        title=__qualname__,
+        description="maximum number of report jobs waiting in the queue of the local report service"
+    )
+    report_service_resources_max_age_hours: int = Field(
+        24,
+        ge=1,
+        title=__qualname__,
+        description=(
+            "number of hours the local report service keeps the feature data and inactive players shared by its report "
+            "jobs in memory before retrieving them again"
+        )
+    )
+    report_weekly_metrics_workers: int = Field(
+        4,
+        ge=1,
+        title=__qualname__,
+        description=(
+            "number of threads across which the team stats and points by position of each week of the report are "
+            "calculated before the records, z-scores, and time series are combined in week order, which mostly overlaps "
+            "retrieving the inactive players of each week when disqualifying teams from coaching efficiency since the "
+            "CPU-bound optimal lineups are calculated across COACHING_EFFICIENCY_WORKERS processes (1 calculates every "
+            "week in the main thread)"
+        )
+    )
+    records_state_cache_bool: bool = Field(
+        True,
+        title=__qualname__,
+        description=(
+            "change RECORDS_STATE_CACHE_BOOL to True/False to turn on/off persisting the cumulative league records of "
+            "every calculated week (stored in the league data directory) so later reports only calculate records for "
+            "weeks with new or changed matchup results"
+        )
+    )
+    player_points_prefetch_workers: int = Field(
+        4,
+        ge=1,
+        title=__qualname__,
+        description=(
+            "number of concurrent requests used to retrieve the weekly points of players needed to break coaching "
+            "efficiency ties (requests are batched by week where the platform allows)"
+        )
+    )
+    player_points_cache_bool: bool = Field(
+        True,
+        title=__qualname__,
+        description=(
+            "change PLAYER_POINTS_CACHE_BOOL to True/False to turn on/off reusing previously retrieved weekly player "
+            "points (stored in the league data directory) when breaking coaching efficiency ties"
+        )
+    )
+    coaching_efficiency_workers: int = Field(
+        min(os.cpu_count() or 1, 4),
+        ge=1,
+        title=__qualname__,
+        description=(
+            "number of processes across which the season coaching efficiency optimal lineups are calculated by week "
+            "(defaults to the number of CPU cores up to 4, and 1 calculates every week in the main process)"
+        )
+    )
 
     platform_settings: PlatformSettings = PlatformSettings()
     report_settings: ReportSettings = ReportSettings()
@@ -1,8 +1,12 @@
 __author__ = "Wren J. R. (uberfastman)"
 __email__ = "uberfastman@uberfastman.dev"
 
+import os
 import re
-from typing import List, Dict, Optional, Any, Union
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Dict, Optional, Any, Union, Iterator, TextIO
 
 from tornado.gen import coroutine, WaitIterator
 from tornado.httpclient import AsyncHTTPClient, HTTPRequest, HTTPResponse
@@ -18,6 +22,30 @@ def format_platform_display(platform: str) -> str:
     return platform.capitalize() if len(platform) > 4 else platform.upper()
 
 
+@contextmanager
+def open_for_atomic_write(file_path: Union[Path, str], encoding: str = "utf-8") -> Iterator[TextIO]:
+    """Open a temporary file in the directory of a file for writing, which only replaces the file once it has been
+    completely written so that concurrent or interrupted saves never leave a partially written file behind.
+    """
+    file_path = Path(file_path)
+    if not file_path.parent.exists():
+        os.makedirs(file_path.parent, exist_ok=True)
+
+    temp_file_descriptor, temp_file_path = tempfile.mkstemp(
+        prefix=f".{file_path.name}.", suffix=".tmp", dir=file_path.parent
+    )
+    try:
+        with os.fdopen(temp_file_descriptor, "w", encoding=encoding) as temp_file:
+            yield temp_file
+        # temporary files are only readable by their owner by default
+        os.chmod(temp_file_path, 0o644)
+        os.replace(temp_file_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
+        raise
+
+
 def truncate_cell_for_display(cell_text: str, max_chars: int, halve_max_chars: bool = False,
                               sesqui_max_chars: bool = False) -> str:
     if halve_max_chars and sesqui_max_chars: